@@ -1,5 +1,5 @@
 from django.contrib import admin
-from analytics.models import APIRequestLog
+from analytics.models import APIRequestLog, StudentCourseStats
 
 @admin.register(APIRequestLog)
 class APIRequestLogAdmin(admin.ModelAdmin):
@@ -12,4 +12,9 @@ class APIRequestLogAdmin(admin.ModelAdmin):
         return (obj.user_agent[:50] + '...') if obj.user_agent and len(obj.user_agent) > 50 else obj.user_agent
 
     short_ip.short_description = "IP Address"
-    short_user_agent.short_description = "User Agent"
\ No newline at end of file
+    short_user_agent.short_description = "User Agent"
+
+@admin.register(StudentCourseStats)
+class StudentCourseStatsAdmin(admin.ModelAdmin):
+    list_display = ('student', 'course', 'grade_count', 'grade_average', 'present_count', 'absent_count', 'updated_at')
+    list_select_related = ('student__user', 'course')
@@ -0,0 +1,23 @@
+from django.db.models import Count
+from django.http import JsonResponse
+from core.async_views import AsyncAPIView
+from analytics.models import APIRequestLog
+
+
+class AsyncAPIAnalyticsView(AsyncAPIView):
+    async def get(self, request):
+        user_id = request.GET.get('user_id')
+        method = request.GET.get('method')
+
+        logs = APIRequestLog.objects.all()
+
+        if user_id:
+            logs = logs.filter(user_id=user_id)
+        if method:
+            logs = logs.filter(method=method.upper())
+
+        analytics = logs.values('endpoint').annotate(
+            request_count=Count('id')
+        ).order_by('-request_count')
+
+        return JsonResponse([row async for row in analytics], safe=False)
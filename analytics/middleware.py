@@ -1,17 +1,66 @@
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction, sync_to_async
 from analytics.models import APIRequestLog
+from analytics.profiling import RequestProfiler, profiling_settings, should_profile, store_profile
+from core.logging import logger
 
 class LogAPIRequestsMiddleware:
+    sync_capable = True
+    async_capable = True
+
     def __init__(self, get_response):
         self.get_response = get_response
+        if iscoroutinefunction(self.get_response):
+            markcoroutinefunction(self)
 
     def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
         response = self.get_response(request)
+        if request.path.startswith('/api/'):
+            self.log_request(request, response)
+        return response
 
+    async def __acall__(self, request):
+        response = await self.get_response(request)
         if request.path.startswith('/api/'):
-            APIRequestLog.objects.create(
-                user=request.user if request.user.is_authenticated else None,
-                endpoint=request.path,
-                method=request.method,
-                status_code=response.status_code,
-            )
+            await sync_to_async(self.log_request)(request, response)
+        return response
+
+    def log_request(self, request, response):
+        APIRequestLog.objects.create(
+            user=request.user if request.user.is_authenticated else None,
+            endpoint=request.path,
+            method=request.method,
+            status_code=response.status_code,
+        )
+
+
+class ProfilingMiddleware:
+    """
+    Profiles sampled requests, or ones sent with the PROFILING_HEADER, when
+    PROFILING_ENABLED is on and keeps the slowest in the shared profile buffer.
+    Profiled responses carry an X-Profile-Id header. Async requests pass
+    through untouched since cProfile would also time unrelated event loop tasks.
+    """
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if iscoroutinefunction(self.get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.get_response(request)
+        config = profiling_settings()
+        if not should_profile(request, config):
+            return self.get_response(request)
+
+        with RequestProfiler() as profiler:
+            response = self.get_response(request)
+        profile = profiler.as_profile(request, response)
+        store_profile(profile, config['keep'], config['ttl'])
+        response['X-Profile-Id'] = profile['id']
+        logger.info("Profiled %s %s in %sms (%s queries)", request.method, request.path, profile['duration_ms'], profile['sql_count'])
         return response
@@ -0,0 +1,34 @@
+# Generated by Django 5.1.3 on 2026-10-19 14:28
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('analytics', '0003_apirequestlog_ip_address_apirequestlog_user_agent'),
+        ('courses', '0004_course_course_active_name_idx'),
+        ('students', '0003_alter_student_options'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='StudentCourseStats',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('grade_count', models.PositiveIntegerField(default=0)),
+                ('points_count', models.PositiveIntegerField(default=0)),
+                ('points_total', models.FloatField(default=0)),
+                ('present_count', models.PositiveIntegerField(default=0)),
+                ('absent_count', models.PositiveIntegerField(default=0)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('course', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='student_stats', to='courses.course')),
+                ('student', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='course_stats', to='students.student')),
+            ],
+            options={
+                'indexes': [models.Index(fields=['course', 'student'], name='stats_course_student_idx')],
+                'constraints': [models.UniqueConstraint(fields=('student', 'course'), name='unique_student_course_stats')],
+            },
+        ),
+    ]
@@ -17,3 +17,42 @@ class APIRequestLog(models.Model):
 
     def __str__(self):
         return f"{self.user} - {self.endpoint} - {self.method}"
+
+
+class StudentCourseStats(models.Model):
+    """
+    Summary of a student's grades and attendance in one course, kept up to date
+    on every Grade/Attendance write so dashboards don't aggregate raw records.
+    """
+    student = models.ForeignKey('students.Student', on_delete=models.CASCADE, related_name='course_stats')
+    course = models.ForeignKey('courses.Course', on_delete=models.CASCADE, related_name='student_stats')
+    grade_count = models.PositiveIntegerField(default=0)
+    points_count = models.PositiveIntegerField(default=0)
+    points_total = models.FloatField(default=0)
+    present_count = models.PositiveIntegerField(default=0)
+    absent_count = models.PositiveIntegerField(default=0)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['student', 'course'], name='unique_student_course_stats'),
+        ]
+        indexes = [
+            models.Index(fields=['course', 'student'], name='stats_course_student_idx'),
+        ]
+
+    @property
+    def grade_average(self):
+        if not self.points_count:
+            return None
+        return round(self.points_total / self.points_count, 2)
+
+    @property
+    def attendance_rate(self):
+        total = self.present_count + self.absent_count
+        if not total:
+            return None
+        return round(self.present_count / total, 4)
+
+    def __str__(self):
+        return f"Stats for student {self.student_id} in course {self.course_id}"
@@ -0,0 +1,180 @@
+"""
+Opt-in per-request profiling. A sampled or header-flagged request runs under
+cProfile while every SQL statement and cache call it makes is timed; the
+result is kept only if it is among the slowest PROFILING_KEEP seen so far.
+Profiles live in the shared cache so any worker can serve them to admins.
+Only staff and admins, or a sender whose header value is PROFILING_SECRET,
+can flag a request: profiling is far slower, so anyone else could use it to
+load the server.
+"""
+import cProfile
+import io
+import pstats
+import random
+import time
+import uuid
+from contextlib import ExitStack
+
+from django.conf import settings
+from django.core.cache import cache, caches
+from django.db import connections
+from django.utils import timezone
+from django.utils.crypto import constant_time_compare
+from rest_framework.exceptions import AuthenticationFailed
+from rest_framework_simplejwt.authentication import JWTAuthentication
+
+from users.access import get_access
+
+STORE_KEY = 'profiling_slowest'
+CACHE_METHODS = ['get', 'set', 'add', 'delete', 'get_many', 'set_many', 'delete_many', 'incr', 'decr', 'clear']
+MAX_SQL = 200
+MAX_CACHE_OPS = 200
+STATS_LINES = 40
+
+
+def profiling_settings():
+    return {
+        'enabled': getattr(settings, 'PROFILING_ENABLED', False),
+        'sample_rate': getattr(settings, 'PROFILING_SAMPLE_RATE', 0.0),
+        'header': getattr(settings, 'PROFILING_HEADER', 'X-Profile'),
+        'keep': getattr(settings, 'PROFILING_KEEP', 20),
+        'ttl': getattr(settings, 'PROFILING_TTL', 60 * 60 * 24),
+        'secret': getattr(settings, 'PROFILING_SECRET', None),
+    }
+
+
+def request_user(request):
+    """
+    The user sending a request, or None if anonymous. The profiler wraps the
+    authentication middleware and DRF, so the JWT is usually read here first.
+    """
+    user = getattr(request, 'user', None)
+    if user is not None and user.is_authenticated:
+        return user
+    try:
+        authenticated = JWTAuthentication().authenticate(request)
+    except AuthenticationFailed:
+        return None
+    return authenticated[0] if authenticated else None
+
+
+def may_flag(request, config):
+    value = request.headers.get(config['header'])
+    if not value:
+        return False
+    if config['secret'] and constant_time_compare(value, config['secret']):
+        return True
+    user = request_user(request)
+    return user is not None and (user.is_staff or get_access(user).is_admin)
+
+
+def should_profile(request, config):
+    if not config['enabled']:
+        return False
+    if may_flag(request, config):
+        return True
+    return config['sample_rate'] > 0 and random.random() < config['sample_rate']
+
+
+class RequestProfiler:
+    """Context manager collecting cProfile stats, SQL timings and cache calls for one request."""
+
+    def __init__(self):
+        self.queries = []
+        self.cache_ops = []
+        self.profiler = cProfile.Profile()
+        self._stack = ExitStack()
+
+    def __enter__(self):
+        for connection in connections.all():
+            self._stack.enter_context(connection.execute_wrapper(self._record_query))
+        self._patch_cache()
+        self.started = time.perf_counter()
+        self.profiler.enable()
+        return self
+
+    def __exit__(self, *exc_info):
+        self.profiler.disable()
+        self.duration_ms = (time.perf_counter() - self.started) * 1000
+        self._stack.close()
+        return False
+
+    def _record_query(self, execute, sql, params, many, context):
+        started = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            if len(self.queries) < MAX_SQL:
+                self.queries.append({
+                    'sql': sql,
+                    'alias': context['connection'].alias,
+                    'ms': round((time.perf_counter() - started) * 1000, 3),
+                })
+
+    def _patch_cache(self):
+        # caches[...] is per-thread, so shadowing its bound methods only affects this request.
+        backend = caches['default']
+        for name in CACHE_METHODS:
+            original = getattr(backend, name)
+            setattr(backend, name, self._timed_cache_call(name, original))
+            self._stack.callback(backend.__dict__.pop, name, None)
+
+    def _timed_cache_call(self, name, original):
+        def wrapper(*args, **kwargs):
+            started = time.perf_counter()
+            try:
+                return original(*args, **kwargs)
+            finally:
+                if len(self.cache_ops) < MAX_CACHE_OPS:
+                    key = args[0] if args and isinstance(args[0], str) else None
+                    self.cache_ops.append({
+                        'op': name,
+                        'key': key,
+                        'ms': round((time.perf_counter() - started) * 1000, 3),
+                    })
+        return wrapper
+
+    def stats_text(self):
+        stream = io.StringIO()
+        pstats.Stats(self.profiler, stream=stream).sort_stats('cumulative').print_stats(STATS_LINES)
+        return stream.getvalue()
+
+    def as_profile(self, request, response):
+        return {
+            'id': uuid.uuid4().hex,
+            'method': request.method,
+            'path': request.get_full_path(),
+            'status_code': response.status_code,
+            'user': request.user.username if getattr(request, 'user', None) and request.user.is_authenticated else None,
+            'recorded_at': timezone.now().isoformat(),
+            'duration_ms': round(self.duration_ms, 3),
+            'sql_count': len(self.queries),
+            'sql_ms': round(sum(query['ms'] for query in self.queries), 3),
+            'cache_count': len(self.cache_ops),
+            'queries': self.queries,
+            'cache_ops': self.cache_ops,
+            'stats': self.stats_text(),
+        }
+
+
+def store_profile(profile, keep, ttl):
+    """Adds a profile to the shared buffer, which only ever holds the ``keep`` slowest."""
+    profiles = cache.get(STORE_KEY) or []
+    if len(profiles) >= keep and profile['duration_ms'] <= profiles[-1]['duration_ms']:
+        return False
+    profiles.append(profile)
+    profiles.sort(key=lambda item: item['duration_ms'], reverse=True)
+    cache.set(STORE_KEY, profiles[:keep], timeout=ttl)
+    return True
+
+
+def get_profiles():
+    return cache.get(STORE_KEY) or []
+
+
+def get_profile(profile_id):
+    return next((profile for profile in get_profiles() if profile['id'] == profile_id), None)
+
+
+def clear_profiles():
+    cache.delete(STORE_KEY)
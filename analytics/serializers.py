@@ -1,5 +1,5 @@
 from rest_framework import serializers
-from analytics.models import APIRequestLog
+from analytics.models import APIRequestLog, StudentCourseStats
 
 class APIRequestLogSerializer(serializers.ModelSerializer):
     user = serializers.StringRelatedField()
@@ -8,3 +8,17 @@ class APIRequestLogSerializer(serializers.ModelSerializer):
         model = APIRequestLog
         fields = ['id', 'user', 'endpoint', 'method', 'timestamp', 'status_code']
         read_only_fields = ['timestamp']
+
+
+class StudentCourseStatsSerializer(serializers.ModelSerializer):
+    course_name = serializers.CharField(source='course.name', read_only=True)
+    grade_average = serializers.FloatField(read_only=True)
+    attendance_rate = serializers.FloatField(read_only=True)
+
+    class Meta:
+        model = StudentCourseStats
+        fields = [
+            'student', 'course', 'course_name', 'grade_count', 'grade_average',
+            'present_count', 'absent_count', 'attendance_rate', 'updated_at',
+        ]
+        read_only_fields = fields
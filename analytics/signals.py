@@ -0,0 +1,41 @@
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+from attendance.models import Attendance
+from courses.signals import previous_pair
+from grades.models import Grade
+from analytics.stats import (
+    record_new_attendance,
+    record_new_grade,
+    refresh_student_course_stats,
+)
+
+
+def refresh_changed_stats(instance):
+    # A row moved to another student or course must also be taken out of its old summary.
+    pair = (instance.student_id, instance.course_id)
+    refresh_student_course_stats(*pair)
+    previous = previous_pair(instance)
+    if previous and previous != pair:
+        refresh_student_course_stats(*previous, create=False)
+
+
+@receiver(post_save, sender=Grade)
+def update_stats_on_grade_save(sender, instance, created, **kwargs):
+    if created:
+        record_new_grade(instance)
+    else:
+        refresh_changed_stats(instance)
+
+
+@receiver(post_save, sender=Attendance)
+def update_stats_on_attendance_save(sender, instance, created, **kwargs):
+    if created:
+        record_new_attendance(instance)
+    else:
+        refresh_changed_stats(instance)
+
+
+@receiver(post_delete, sender=Grade)
+@receiver(post_delete, sender=Attendance)
+def update_stats_on_delete(sender, instance, **kwargs):
+    refresh_student_course_stats(instance.student_id, instance.course_id, create=False)
@@ -0,0 +1,108 @@
+from django.db import transaction
+from django.db.models import Case, Count, F, FloatField, Q, Sum, Value, When
+from django.db.models.functions import Trim, Upper
+from django.db.models.lookups import Exact
+from django.utils import timezone
+from attendance.models import Attendance
+from grades.models import Grade, GRADE_POINTS
+from analytics.models import StudentCourseStats
+
+
+def grade_points_expression():
+    """
+    SQL expression mapping Grade.grade to its numeric points (NULL for non-letter
+    grades), normalised the same way as ``Grade.points``: trimmed and upper-cased.
+    """
+    letter = Upper(Trim('grade'))
+    return Case(
+        *[When(Exact(letter, Value(grade)), then=Value(points)) for grade, points in GRADE_POINTS.items()],
+        default=None,
+        output_field=FloatField(),
+    )
+
+
+def _grade_aggregates():
+    return {
+        'grade_count': Count('id'),
+        'points_count': Count(grade_points_expression()),
+        'points_total': Sum(grade_points_expression()),
+    }
+
+
+def _attendance_aggregates():
+    return {
+        'present_count': Count('id', filter=Q(status=True)),
+        'absent_count': Count('id', filter=Q(status=False)),
+    }
+
+
+def refresh_student_course_stats(student_id, course_id, create=True):
+    """
+    Recomputes the summary row for one student/course pair from the raw records.
+    With ``create=False`` only an existing row is updated, which is what deletes
+    need: when a whole student or course is removed its summary row goes with it.
+    """
+    values = {
+        **Grade.objects.filter(student_id=student_id, course_id=course_id).aggregate(**_grade_aggregates()),
+        **Attendance.objects.filter(student_id=student_id, course_id=course_id).aggregate(**_attendance_aggregates()),
+    }
+    values['points_total'] = values['points_total'] or 0
+    if create:
+        StudentCourseStats.objects.update_or_create(student_id=student_id, course_id=course_id, defaults=values)
+    else:
+        StudentCourseStats.objects.filter(student_id=student_id, course_id=course_id).update(
+            updated_at=timezone.now(), **values
+        )
+
+
+def record_new_grade(grade):
+    """Applies a newly created grade to its summary row with a single UPDATE."""
+    updates = {'grade_count': F('grade_count') + 1, 'updated_at': timezone.now()}
+    if grade.points is not None:
+        updates['points_count'] = F('points_count') + 1
+        updates['points_total'] = F('points_total') + grade.points
+    if not StudentCourseStats.objects.filter(student_id=grade.student_id, course_id=grade.course_id).update(**updates):
+        refresh_student_course_stats(grade.student_id, grade.course_id)
+
+
+def record_new_attendance(attendance):
+    """Applies a newly created attendance record to its summary row with a single UPDATE."""
+    field = 'present_count' if attendance.status else 'absent_count'
+    updates = {field: F(field) + 1, 'updated_at': timezone.now()}
+    if not StudentCourseStats.objects.filter(
+        student_id=attendance.student_id, course_id=attendance.course_id
+    ).update(**updates):
+        refresh_student_course_stats(attendance.student_id, attendance.course_id)
+
+
+def rebuild_all_stats():
+    """
+    Recomputes every summary row from scratch with two grouped queries.
+    Used to backfill after bulk imports that bypass model signals.
+    """
+    rows = {}
+    grades = Grade.objects.order_by().values('student_id', 'course_id').annotate(**_grade_aggregates())
+    attendance = Attendance.objects.order_by().values('student_id', 'course_id').annotate(**_attendance_aggregates())
+    for totals in grades:
+        rows[(totals.pop('student_id'), totals.pop('course_id'))] = totals
+    for totals in attendance:
+        rows.setdefault((totals.pop('student_id'), totals.pop('course_id')), {}).update(totals)
+
+    now = timezone.now()
+    objects = [
+        StudentCourseStats(
+            student_id=student_id,
+            course_id=course_id,
+            grade_count=totals.get('grade_count', 0),
+            points_count=totals.get('points_count', 0),
+            points_total=totals.get('points_total') or 0,
+            present_count=totals.get('present_count', 0),
+            absent_count=totals.get('absent_count', 0),
+            updated_at=now,
+        )
+        for (student_id, course_id), totals in rows.items()
+    ]
+    with transaction.atomic():
+        StudentCourseStats.objects.all().delete()
+        StudentCourseStats.objects.bulk_create(objects, batch_size=1000)
+    return len(objects)
@@ -0,0 +1,12 @@
+from celery import shared_task
+from core.logging import logger
+from analytics.stats import rebuild_all_stats
+
+@shared_task(soft_time_limit=30 * 60, time_limit=35 * 60, acks_late=True, reject_on_worker_lost=True)
+def rebuild_student_course_stats():
+    try:
+        logger.info("Rebuilding student course statistics")
+        count = rebuild_all_stats()
+        logger.info("Student course statistics rebuilt: %s rows", count, extra={'sample': False})
+    except Exception as e:
+        logger.error("Error rebuilding student course statistics: %s", e)
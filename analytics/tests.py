@@ -1,6 +1,14 @@
 import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
 from rest_framework.test import APIClient
-from analytics.models import APIRequestLog
+from rest_framework_simplejwt.tokens import AccessToken
+from analytics.models import APIRequestLog, StudentCourseStats
+from analytics.tasks import rebuild_student_course_stats
+from attendance.models import Attendance
+from courses.models import Course
+from grades.models import Grade
+from students.models import Student
 from users.models import User
 
 @pytest.mark.django_db
@@ -42,3 +50,177 @@ def test_analytics_view_with_filters():
     data = response.json()
     assert len(data) == 1
     assert data[0]['endpoint'] == "/api/test2/"
+
+
+@pytest.mark.django_db
+def test_student_course_stats_maintained_on_writes():
+    teacher = User.objects.create_user(username="teacher", email="teacher@example.com", password="password123", role="teacher")
+    student_user = User.objects.create_user(username="student", email="student@example.com", password="password123", role="student")
+    student = Student.objects.create(user=student_user)
+    course = Course.objects.create(name="Math 101", instructor=teacher)
+
+    Grade.objects.create(student=student, course=course, grade="A", teacher=teacher)
+    grade = Grade.objects.create(student=student, course=course, grade="B", teacher=teacher)
+    Attendance.objects.create(student=student, course=course, status=True)
+    Attendance.objects.create(student=student, course=course, status=False)
+
+    stats = StudentCourseStats.objects.get(student=student, course=course)
+    assert stats.grade_count == 2
+    assert stats.grade_average == 3.5
+    assert stats.present_count == 1
+    assert stats.absent_count == 1
+
+    grade.grade = "C"
+    grade.save()
+    stats.refresh_from_db()
+    assert stats.grade_average == 3.0
+
+    grade.delete()
+    stats.refresh_from_db()
+    assert stats.grade_count == 1
+    assert stats.grade_average == 4.0
+
+
+@pytest.mark.django_db
+def test_student_course_stats_follow_a_moved_row():
+    teacher = User.objects.create_user(username="teacher", email="teacher@example.com", password="password123", role="teacher")
+    student = Student.objects.create(user=User.objects.create_user(username="student", email="student@example.com", role="student"))
+    math = Course.objects.create(name="Math 101", instructor=teacher)
+    physics = Course.objects.create(name="Physics 101", instructor=teacher)
+    Grade.objects.create(student=student, course=math, grade="A", teacher=teacher)
+    grade = Grade.objects.create(student=student, course=math, grade=" b+", teacher=teacher)
+
+    stats = StudentCourseStats.objects.get(student=student, course=math)
+    assert stats.grade_average == round((4.0 + 3.3) / 2, 2)
+
+    grade.course = physics
+    with CaptureQueriesContext(connection) as captured:
+        grade.save()
+    # The gradebook and the stats share one lookup of the row's previous values.
+    lookups = [query for query in captured.captured_queries if query['sql'].startswith('SELECT "grades_grade".')]
+    assert len(lookups) == 1
+    stats.refresh_from_db()
+    assert (stats.grade_count, stats.grade_average) == (1, 4.0)
+    assert StudentCourseStats.objects.get(student=student, course=physics).grade_average == 3.3
+
+
+@pytest.mark.django_db
+def test_student_and_course_stats_views():
+    teacher = User.objects.create_user(username="teacher", email="teacher@example.com", password="password123", role="teacher")
+    student_user = User.objects.create_user(username="student", email="student@example.com", password="password123", role="student")
+    other_user = User.objects.create_user(username="other", email="other@example.com", password="password123", role="student")
+    student = Student.objects.create(user=student_user)
+    other = Student.objects.create(user=other_user)
+    course = Course.objects.create(name="Math 101", instructor=teacher)
+    Grade.objects.create(student=student, course=course, grade="A", teacher=teacher)
+    Grade.objects.create(student=other, course=course, grade="C", teacher=teacher)
+    Attendance.objects.create(student=student, course=course, status=True)
+
+    client = APIClient()
+    client.force_authenticate(user=student_user)
+    response = client.get(f'/api/analytics/students/{student.id}/stats/')
+    assert response.status_code == 200
+    assert response.data['grade_average'] == 4.0
+    assert response.data['courses'][0]['course_name'] == "Math 101"
+
+    response = client.get(f'/api/analytics/students/{other.id}/stats/')
+    assert response.status_code == 404
+
+    response = client.get(f'/api/analytics/courses/{course.id}/stats/')
+    assert response.status_code == 403
+
+    client.force_authenticate(user=teacher)
+    response = client.get(f'/api/analytics/courses/{course.id}/stats/')
+    assert response.status_code == 200
+    assert response.data['grade_average'] == 3.0
+    assert response.data['attendance_rate'] == 1.0
+    assert len(response.data['students']) == 2
+
+
+@pytest.mark.django_db
+def test_rebuild_student_course_stats_task():
+    teacher = User.objects.create_user(username="teacher", email="teacher@example.com", password="password123", role="teacher")
+    student_user = User.objects.create_user(username="student", email="student@example.com", password="password123", role="student")
+    student = Student.objects.create(user=student_user)
+    course = Course.objects.create(name="Math 101", instructor=teacher)
+    Grade.objects.bulk_create([Grade(student=student, course=course, grade="B", teacher=teacher)])
+    Attendance.objects.bulk_create([Attendance(student=student, course=course, status=False)])
+    assert not StudentCourseStats.objects.exists()
+
+    rebuild_student_course_stats()
+
+    stats = StudentCourseStats.objects.get(student=student, course=course)
+    assert stats.grade_average == 3.0
+    assert stats.absent_count == 1
+
+
+@pytest.mark.django_db
+def test_profiling_disabled_by_default(settings):
+    settings.PROFILING_ENABLED = False
+    user = User.objects.create_user(username="admin", email="admin@example.com", password="password123", role="admin")
+    client = APIClient()
+    client.force_authenticate(user=user)
+
+    response = client.get('/api/analytics/', HTTP_X_PROFILE='1')
+
+    assert 'X-Profile-Id' not in response
+    assert client.get('/api/analytics/profiles/').data == []
+
+
+@pytest.mark.django_db
+def test_header_flagged_request_is_profiled(settings):
+    settings.PROFILING_ENABLED = True
+    settings.PROFILING_SAMPLE_RATE = 0
+    admin = User.objects.create_user(username="admin", email="admin@example.com", password="password123", role="admin")
+    client = APIClient()
+    # The middleware runs before DRF, so it sees the JWT rather than a forced user.
+    client.credentials(HTTP_AUTHORIZATION=f"Bearer {AccessToken.for_user(admin)}")
+
+    assert 'X-Profile-Id' not in client.get('/api/users/')
+    response = client.get('/api/users/', HTTP_X_PROFILE='1')
+    profile_id = response['X-Profile-Id']
+
+    summaries = client.get('/api/analytics/profiles/').data
+    assert [summary['id'] for summary in summaries] == [profile_id]
+    assert summaries[0]['path'] == '/api/users/'
+    assert summaries[0]['user'] == 'admin'
+
+    profile = client.get(f'/api/analytics/profiles/{profile_id}/').data
+    assert profile['sql_count'] == len(profile['queries']) > 0
+    assert any(op['op'] == 'get' and op['key'] == 'user_list' for op in profile['cache_ops'])
+    assert 'cumulative' in profile['stats']
+
+    assert client.delete('/api/analytics/profiles/').status_code == 204
+    assert client.get('/api/analytics/profiles/').data == []
+
+
+@pytest.mark.django_db
+def test_only_staff_or_the_secret_can_flag_a_request(settings):
+    settings.PROFILING_ENABLED = True
+    settings.PROFILING_SAMPLE_RATE = 0
+    settings.PROFILING_SECRET = "s3cret"
+    student = User.objects.create_user(username="student", email="student@example.com", password="password123")
+
+    assert 'X-Profile-Id' not in APIClient().get('/api/courses/', HTTP_X_PROFILE='1')
+    client = APIClient()
+    client.credentials(HTTP_AUTHORIZATION=f"Bearer {AccessToken.for_user(student)}")
+    assert 'X-Profile-Id' not in client.get('/api/courses/', HTTP_X_PROFILE='1')
+    assert 'X-Profile-Id' in client.get('/api/courses/', HTTP_X_PROFILE='s3cret')
+
+
+@pytest.mark.django_db
+def test_profile_buffer_keeps_slowest(settings):
+    from analytics.profiling import store_profile, get_profiles
+    for duration in [5, 50, 1, 30, 10]:
+        store_profile({'id': str(duration), 'duration_ms': duration}, keep=3, ttl=60)
+
+    assert [profile['id'] for profile in get_profiles()] == ['50', '30', '10']
+
+
+@pytest.mark.django_db
+def test_profiles_are_admin_only():
+    student = User.objects.create_user(username="student", email="student@example.com", password="password123", role="student")
+    client = APIClient()
+    client.force_authenticate(user=student)
+
+    assert client.get('/api/analytics/profiles/').status_code == 403
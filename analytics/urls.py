@@ -1,6 +1,12 @@
 from django.urls import path
-from .views import APIAnalyticsView
+from .views import APIAnalyticsView, StudentStatsView, CourseStatsView, ProfileListView, ProfileDetailView
+from .async_views import AsyncAPIAnalyticsView
 
 urlpatterns = [
     path('', APIAnalyticsView.as_view(), name='api-analytics'),
+    path('async/', AsyncAPIAnalyticsView.as_view(), name='api-analytics-async'),
+    path('students/<int:student_id>/stats/', StudentStatsView.as_view(), name='student-stats'),
+    path('courses/<int:course_id>/stats/', CourseStatsView.as_view(), name='course-stats'),
+    path('profiles/', ProfileListView.as_view(), name='request-profiles'),
+    path('profiles/<str:profile_id>/', ProfileDetailView.as_view(), name='request-profile-detail'),
 ]
@@ -1,9 +1,31 @@
 from rest_framework.views import APIView
 from rest_framework.response import Response
-from analytics.models import APIRequestLog
+from rest_framework.permissions import IsAuthenticated
+from analytics.models import APIRequestLog, StudentCourseStats
+from analytics.serializers import StudentCourseStatsSerializer
 from django.db.models import Count
 from drf_yasg.utils import swagger_auto_schema
 from drf_yasg import openapi
+from students.models import Student
+from students.permissions import IsAdminOrTeacher
+from users.permissions import IsAdmin
+from analytics.profiling import get_profiles, get_profile, clear_profiles
+from core.logging import logger
+
+
+def summarize_stats(rows):
+    """Combines several StudentCourseStats rows into overall grade average and attendance rate."""
+    points_count = sum(row.points_count for row in rows)
+    points_total = sum(row.points_total for row in rows)
+    present = sum(row.present_count for row in rows)
+    absent = sum(row.absent_count for row in rows)
+    return {
+        'grade_count': sum(row.grade_count for row in rows),
+        'grade_average': round(points_total / points_count, 2) if points_count else None,
+        'present_count': present,
+        'absent_count': absent,
+        'attendance_rate': round(present / (present + absent), 4) if present + absent else None,
+    }
 
 
 class APIAnalyticsView(APIView):
@@ -42,3 +64,86 @@ class APIAnalyticsView(APIView):
         ).order_by('-request_count')
 
         return Response(analytics)
+
+
+class StudentStatsView(APIView):
+    permission_classes = [IsAuthenticated]
+
+    @swagger_auto_schema(
+        operation_summary="Get student statistics",
+        operation_description="Returns the precomputed grade average and attendance of a student in each course. Students can only see their own statistics; students the user may not view are not found.",
+        responses={200: StudentCourseStatsSerializer(many=True)}
+    )
+    def get(self, request, student_id):
+        logger.info("Fetching statistics for student %s", student_id)
+        if not Student.objects.for_user(request.user).filter(pk=student_id).exists():
+            logger.error("Student %s not found for %s", student_id, request.user.username)
+            return Response({"error": "Student not found"}, status=404)
+        rows = list(StudentCourseStats.objects.filter(student_id=student_id).select_related('course'))
+        return Response({
+            'student': student_id,
+            **summarize_stats(rows),
+            'courses': StudentCourseStatsSerializer(rows, many=True).data,
+        })
+
+
+class CourseStatsView(APIView):
+    permission_classes = [IsAuthenticated, IsAdminOrTeacher]
+
+    @swagger_auto_schema(
+        operation_summary="Get course statistics",
+        operation_description="Returns the precomputed grade average and attendance rate of a course and of each student in it. Teachers can only see their own courses.",
+        responses={200: StudentCourseStatsSerializer(many=True)}
+    )
+    def get(self, request, course_id):
+        logger.info("Fetching statistics for course %s", course_id)
+        rows = StudentCourseStats.objects.filter(course_id=course_id).select_related('course')
+        if request.user.role == 'teacher':
+            rows = rows.filter(course__instructor=request.user)
+        rows = list(rows)
+        return Response({
+            'course': course_id,
+            **summarize_stats(rows),
+            'students': StudentCourseStatsSerializer(rows, many=True).data,
+        })
+
+
+PROFILE_SUMMARY_FIELDS = ['id', 'method', 'path', 'status_code', 'user', 'recorded_at',
+                          'duration_ms', 'sql_count', 'sql_ms', 'cache_count']
+
+
+class ProfileListView(APIView):
+    permission_classes = [IsAuthenticated, IsAdmin]
+
+    @swagger_auto_schema(
+        operation_summary="List the slowest request profiles",
+        operation_description="Returns summaries of the slowest profiled requests, slowest first. Profiling is enabled with PROFILING_ENABLED and applies to sampled requests or ones sent with the X-Profile header.",
+        responses={200: "Profile summaries"}
+    )
+    def get(self, request):
+        profiles = get_profiles()
+        return Response([{field: profile[field] for field in PROFILE_SUMMARY_FIELDS} for profile in profiles])
+
+    @swagger_auto_schema(
+        operation_summary="Clear request profiles",
+        responses={204: "Profiles cleared"}
+    )
+    def delete(self, request):
+        clear_profiles()
+        logger.info("Request profiles cleared by %s", request.user.username)
+        return Response(status=204)
+
+
+class ProfileDetailView(APIView):
+    permission_classes = [IsAuthenticated, IsAdmin]
+
+    @swagger_auto_schema(
+        operation_summary="Get a request profile",
+        operation_description="Returns a stored profile with its SQL queries, cache operations and cProfile statistics.",
+        responses={200: "Profile", 404: "Profile not found"}
+    )
+    def get(self, request, profile_id):
+        profile = get_profile(profile_id)
+        if profile is None:
+            return Response({"error": "Profile not found"}, status=404)
+        return Response(profile)
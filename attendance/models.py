@@ -1,6 +1,11 @@
 from django.db import models
 from courses.models import Course
 from students.models import Student
+from core.scoping import RoleScopedQuerySet
+
+class AttendanceQuerySet(RoleScopedQuerySet):
+    teacher_lookup = 'course__instructor'
+    student_lookup = 'student__user'
 
 class Attendance(models.Model):
     student = models.ForeignKey(Student, on_delete=models.CASCADE)
@@ -8,6 +13,14 @@ class Attendance(models.Model):
     date = models.DateField(auto_now_add=True)
     status = models.BooleanField()
 
+    objects = AttendanceQuerySet.as_manager()
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['course', 'date'], name='attendance_course_date_idx'),
+            models.Index(fields=['student', 'date'], name='attendance_student_date_idx'),
+        ]
+
     def __str__(self):
         status = "Present" if self.status else "Absent"
         return f"{self.student.user.username} - {status} on {self.date}"
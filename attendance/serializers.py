@@ -1,11 +1,11 @@
 from rest_framework import serializers
 from attendance.models import Attendance
 from students.serializers import StudentSerializer
-from courses.serializers import CourseSerializer
+from courses.serializers import CachedCourseField
 
 class AttendanceSerializer(serializers.ModelSerializer):
     student = StudentSerializer()
-    course = CourseSerializer()
+    course = CachedCourseField()
     status_label = serializers.SerializerMethodField()
 
     class Meta:
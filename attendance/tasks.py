@@ -1,11 +1,22 @@
 from celery import shared_task
 from core.logging import logger
+from courses.cache import get_course
 from django.core.mail import send_mail
+from attendance.models import Attendance
 
 @shared_task
-def notify_student_about_absence(student_email, course_name):
+def notify_student_about_absence(attendance_id):
     try:
-        logger.info(f"Sending absence notification to {student_email}")
+        attendance = Attendance.objects.select_related('student__user').only(
+            'student__user__email', 'course_id'
+        ).get(pk=attendance_id)
+    except Attendance.DoesNotExist:
+        logger.warning("Attendance record %s no longer exists, skipping notification", attendance_id)
+        return
+    student_email = attendance.student.user.email
+    course_name = get_course(attendance.course_id)['name']
+    try:
+        logger.info("Sending absence notification to %s", student_email)
         send_mail(
             'Attendance Alert',
             f'You have been marked absent in {course_name}. Please contact your teacher.',
@@ -13,6 +24,6 @@ def notify_student_about_absence(student_email, course_name):
             [student_email],
             fail_silently=False,
         )
-        logger.info(f"Absence notification sent to {student_email}")
+        logger.info("Absence notification sent to %s", student_email)
     except Exception as e:
-        logger.error(f"Error sending absence notification to {student_email}: {e}")
+        logger.error("Error sending absence notification to %s: %s", student_email, e)
@@ -1,9 +1,12 @@
 import pytest
+from unittest.mock import patch
 from rest_framework.test import APIClient
 from users.models import User
 from students.models import Student
 from courses.models import Course
 from attendance.models import Attendance
+from attendance.tasks import notify_student_about_absence
+from core.testing import query_budget
 
 @pytest.mark.django_db
 def test_teacher_can_add_attendance():
@@ -48,3 +51,83 @@ def test_student_can_view_their_own_attendance():
     assert response.status_code == 200
     assert len(response.data) == 1
     assert response.data[0]['status'] is True
+
+
+@pytest.mark.django_db
+def test_attendance_list_filters():
+    teacher = User.objects.create_user(username="teacher", email="teacher@example.com", password="password123", role="teacher")
+    student_user = User.objects.create_user(username="student", email="student@example.com", password="password123", role="student")
+    student = Student.objects.create(user=student_user)
+    math = Course.objects.create(name="Math 101", instructor=teacher)
+    physics = Course.objects.create(name="Physics 101", instructor=teacher)
+    Attendance.objects.create(student=student, course=math, status=True)
+    Attendance.objects.create(student=student, course=math, status=False)
+    Attendance.objects.create(student=student, course=physics, status=False)
+
+    client = APIClient()
+    client.force_authenticate(user=teacher)
+
+    response = client.get('/api/attendance/', {"status": "false"})
+    assert response.status_code == 200
+    assert len(response.data) == 2
+
+    response = client.get('/api/attendance/', {"status": "false", "course": math.id})
+    assert len(response.data) == 1
+    assert response.data[0]['status_label'] == "Absent"
+
+
+@pytest.mark.django_db
+@patch("attendance.tasks.send_mail")
+def test_notify_student_about_absence_task(mock_send_mail):
+    teacher = User.objects.create_user(username="teacher", email="teacher@example.com", password="password123", role="teacher")
+    student_user = User.objects.create_user(username="student", email="student@example.com", password="password123", role="student")
+    student = Student.objects.create(user=student_user)
+    course = Course.objects.create(name="Math 101", instructor=teacher)
+    attendance = Attendance.objects.create(student=student, course=course, status=False)
+
+    notify_student_about_absence(attendance.id)
+    notify_student_about_absence(attendance.id + 1)
+
+    mock_send_mail.assert_called_once_with(
+        'Attendance Alert',
+        'You have been marked absent in Math 101. Please contact your teacher.',
+        'admin@example.com',
+        ['student@example.com'],
+        fail_silently=False
+    )
+
+
+@pytest.mark.django_db
+@pytest.mark.parametrize('role, path', [
+    ('teacher', '/api/attendance/?course={course}'),
+    ('student_user', '/api/attendance/'),
+])
+def test_attendance_list_query_budget(seeded_data, warm_course_cache, role, path):
+    client = APIClient()
+    client.force_authenticate(user=User.objects.get(pk=seeded_data[role]))
+    warm_course_cache()
+
+    with query_budget(2, max_ms=500, label=path):
+        response = client.get(path.format(**seeded_data))
+
+    assert response.status_code == 200
+
+
+@pytest.mark.django_db
+def test_attendance_detail_is_scoped_to_owner(django_assert_num_queries, warm_course_cache):
+    teacher = User.objects.create_user(username="teacher", email="teacher@example.com", password="password123", role="teacher")
+    other_teacher = User.objects.create_user(username="other", email="other@example.com", password="password123", role="teacher")
+    student_user = User.objects.create_user(username="student", email="student@example.com", password="password123", role="student")
+    student = Student.objects.create(user=student_user)
+    course = Course.objects.create(name="Math 101", instructor=teacher)
+    attendance = Attendance.objects.create(student=student, course=course, status=True)
+
+    client = APIClient()
+    client.force_authenticate(user=teacher)
+    warm_course_cache()
+    with django_assert_num_queries(2):
+        assert client.get(f'/api/attendance/{attendance.id}/').status_code == 200
+
+    client.force_authenticate(user=other_teacher)
+    assert client.get(f'/api/attendance/{attendance.id}/').status_code == 404
+    assert client.put(f'/api/attendance/{attendance.id}/', {"status": False}, format='json').status_code == 404
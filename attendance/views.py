@@ -2,42 +2,63 @@ from rest_framework.generics import ListAPIView, RetrieveUpdateDestroyAPIView, C
 from rest_framework.response import Response
 from rest_framework.permissions import IsAuthenticated
 from rest_framework.exceptions import PermissionDenied
+from rest_framework.filters import OrderingFilter
 from drf_yasg.utils import swagger_auto_schema
+from drf_yasg import openapi
 from django.core.cache import cache
 from django.conf import settings
+from django.db import transaction
 from .models import Attendance
 from .serializers import AttendanceSerializer
 from attendance.tasks import notify_student_about_absence
+from core.idempotency import IDEMPOTENCY_KEY_PARAMETER, idempotent
 from core.logging import logger
+from core.filters import QueryParamFilterBackend
+from core.cache import query_cache_key
 
 CACHE_TTL = getattr(settings, 'CACHE_TTL', 300)
 
 class AttendanceListView(ListAPIView):
     serializer_class = AttendanceSerializer
     permission_classes = [IsAuthenticated]
+    filter_backends = [QueryParamFilterBackend, OrderingFilter]
+    filter_fields = {
+        'course': 'course_id',
+        'student': 'student_id',
+        'status': 'status',
+        'date_from': 'date__gte',
+        'date_to': 'date__lte',
+    }
+    ordering_fields = ['date', 'id']
+    ordering = ['-date', '-id']
 
     def get_queryset(self):
-        if self.request.user.role == 'teacher':
-            return Attendance.objects.filter(course__instructor=self.request.user)
-        elif self.request.user.role == 'student':
-            return Attendance.objects.filter(student__user=self.request.user)
-        else:
+        if self.request.user.role not in ('teacher', 'student'):
             raise PermissionDenied("Only teachers and students can view attendance records.")
+        return Attendance.objects.for_user(self.request.user).select_related('student__user')
 
     @swagger_auto_schema(
         operation_summary="Get the attendance list",
-        operation_description="Returns a list of attendance for students or teacher courses",
+        operation_description="Returns a list of attendance for students or teacher courses, optionally filtered by course, student, status and date range",
+        manual_parameters=[
+            openapi.Parameter('course', openapi.IN_QUERY, description="Course ID", type=openapi.TYPE_INTEGER),
+            openapi.Parameter('student', openapi.IN_QUERY, description="Student ID", type=openapi.TYPE_INTEGER),
+            openapi.Parameter('status', openapi.IN_QUERY, description="true for present, false for absent", type=openapi.TYPE_BOOLEAN),
+            openapi.Parameter('date_from', openapi.IN_QUERY, description="Earliest date (YYYY-MM-DD)", type=openapi.TYPE_STRING),
+            openapi.Parameter('date_to', openapi.IN_QUERY, description="Latest date (YYYY-MM-DD)", type=openapi.TYPE_STRING),
+            openapi.Parameter('ordering', openapi.IN_QUERY, description="Sort by date or id (prefix with - for descending)", type=openapi.TYPE_STRING),
+        ],
         responses={200: AttendanceSerializer(many=True)}
     )
     def get(self, request, *args, **kwargs):
-        logger.info(f"Fetching attendance list for {request.user.username}")
-        cache_key = f'attendance_list_{request.user.id}'
+        logger.info("Fetching attendance list for %s", request.user.username)
+        cache_key = query_cache_key(f'attendance_list_{request.user.id}', request.query_params)
         cached_attendance = cache.get(cache_key)
         if cached_attendance:
             logger.info("Attendance list fetched from cache")
             return Response(cached_attendance)
 
-        attendance = self.get_queryset()
+        attendance = self.filter_queryset(self.get_queryset())
         serializer = self.get_serializer(attendance, many=True)
         cache.set(cache_key, serializer.data, timeout=CACHE_TTL)
         logger.info("Attendance list fetched from database and cached")
@@ -52,38 +73,32 @@ class AttendanceCreateView(CreateAPIView):
         operation_summary="Add an attendance record",
         operation_description="Adds a new student attendance record (teachers only)",
         request_body=AttendanceSerializer,
-        responses={201: AttendanceSerializer}
+        responses={201: AttendanceSerializer},
+        manual_parameters=[IDEMPOTENCY_KEY_PARAMETER],
     )
+    @idempotent
     def post(self, request, *args, **kwargs):
         if request.user.role != 'teacher':
             raise PermissionDenied("Only teachers can add attendance records.")
 
-        logger.info(f"Adding new attendance record by {request.user.username}")
+        logger.info("Adding new attendance record by %s", request.user.username)
         serializer = self.get_serializer(data=request.data)
         if serializer.is_valid():
             attendance = serializer.save()
             if not attendance.status:
-                notify_student_about_absence.delay(
-                    attendance.student.user.email,
-                    attendance.course.name
-                )
-                logger.info(f"Notification sent for absent student {attendance.student.user.email}")
+                transaction.on_commit(lambda: notify_student_about_absence.delay(attendance.id))
+                logger.info("Absence notification queued for student %s", attendance.student_id)
             return Response(serializer.data, status=201)
         return Response(serializer.errors, status=400)
 
 
 class AttendanceDetailView(RetrieveUpdateDestroyAPIView):
-    queryset = Attendance.objects.all()
     serializer_class = AttendanceSerializer
     permission_classes = [IsAuthenticated]
 
-    def get_object(self):
-        attendance = super().get_object()
-        if self.request.user.role == 'teacher' and attendance.course.instructor != self.request.user:
-            raise PermissionDenied("You can only manage attendance records for your own courses.")
-        if self.request.user.role == 'student' and attendance.student.user != self.request.user:
-            raise PermissionDenied("You can only view your own attendance records.")
-        return attendance
+    def get_queryset(self):
+        # Records outside the user's courses or their own attendance are simply not found.
+        return Attendance.objects.for_user(self.request.user).select_related('student__user')
 
     @swagger_auto_schema(
         operation_summary="Update the attendance record",
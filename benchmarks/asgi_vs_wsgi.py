@@ -0,0 +1,81 @@
+"""
+Compares the synchronous DRF endpoints served over WSGI with their async
+variants served over ASGI under many concurrent (optionally slow) clients.
+
+Start both servers with a single worker each, e.g.:
+
+    gunicorn miniproject.wsgi -w 1 --threads 8 -b 127.0.0.1:8001
+    uvicorn miniproject.asgi:application --workers 1 --port 8002
+
+then run:
+
+    python -m benchmarks.asgi_vs_wsgi --token <JWT access token> --concurrency 200 --requests 2000
+
+Only the standard library is used so the script runs anywhere the project does.
+"""
+import argparse
+import asyncio
+import statistics
+import time
+
+from benchmarks.http import fetch, percentile
+
+ENDPOINTS = [
+    ('notifications', '/api/notifications/', '/api/notifications/async/'),
+    ('courses', '/api/courses/', '/api/courses/async/'),
+    ('user detail', '/api/users/{user_id}/', '/api/users/{user_id}/async/'),
+    ('analytics', '/api/analytics/', '/api/analytics/async/'),
+]
+
+
+async def run_load(base_url, path, token, concurrency, total, read_delay):
+    semaphore = asyncio.Semaphore(concurrency)
+    latencies, errors = [], 0
+
+    async def worker():
+        nonlocal errors
+        async with semaphore:
+            try:
+                latency, status = await fetch(base_url, path, token, read_delay=read_delay)
+            except OSError:
+                errors += 1
+                return
+            if status >= 400:
+                errors += 1
+            latencies.append(latency)
+
+    started = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(total)))
+    elapsed = time.perf_counter() - started
+    latencies.sort()
+    return {
+        'rps': len(latencies) / elapsed if elapsed else 0,
+        'p50': statistics.median(latencies) * 1000 if latencies else 0,
+        'p95': percentile(latencies, 0.95) * 1000,
+        'errors': errors,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--wsgi', default='http://127.0.0.1:8001')
+    parser.add_argument('--asgi', default='http://127.0.0.1:8002')
+    parser.add_argument('--token', required=True, help="JWT access token used for every request")
+    parser.add_argument('--user-id', type=int, default=1)
+    parser.add_argument('--concurrency', type=int, default=100)
+    parser.add_argument('--requests', type=int, default=1000)
+    parser.add_argument('--read-delay', type=float, default=0.0, help="Seconds each client waits before reading the body")
+    args = parser.parse_args()
+
+    print(f"{'endpoint':<14}{'server':<6}{'req/s':>10}{'p50 ms':>10}{'p95 ms':>10}{'errors':>8}")
+    for name, sync_path, async_path in ENDPOINTS:
+        for server, base_url, path in (('wsgi', args.wsgi, sync_path), ('asgi', args.asgi, async_path)):
+            result = asyncio.run(run_load(
+                base_url, path.format(user_id=args.user_id), args.token,
+                args.concurrency, args.requests, args.read_delay,
+            ))
+            print(f"{name:<14}{server:<6}{result['rps']:>10.1f}{result['p50']:>10.1f}{result['p95']:>10.1f}{result['errors']:>8}")
+
+
+if __name__ == '__main__':
+    main()
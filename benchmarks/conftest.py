@@ -0,0 +1,141 @@
+import json
+import statistics
+import time
+from pathlib import Path
+
+import pytest
+from django.core.cache import cache
+from django.db import connection, transaction
+from django.test import Client
+from django.test.utils import CaptureQueriesContext
+
+from benchmarks.http import percentile
+from core.seeding import SCALES, seed
+
+BASELINE_FILE = Path(__file__).with_name('baselines.json')
+results_key = pytest.StashKey[dict]()
+
+
+def pytest_addoption(parser):
+    group = parser.getgroup('benchmarks')
+    group.addoption('--run-benchmarks', action='store_true', help="Run the API benchmarks (skipped otherwise)")
+    group.addoption('--bench-scale', default='small', choices=sorted(SCALES), help="Seeded data volume")
+    group.addoption('--bench-rounds', type=int, default=10, help="Timed requests per endpoint")
+    group.addoption('--bench-tolerance', type=float, default=1.0,
+                    help="Allowed regression of the latency relative to the same-run reference request "
+                         "against the baseline (1.0 = twice as slow)")
+    group.addoption('--save-baselines', action='store_true', help="Store this run's results as the new baselines")
+
+
+def pytest_collection_modifyitems(config, items):
+    if config.getoption('--run-benchmarks', default=False):
+        return
+    skip = pytest.mark.skip(reason="benchmarks only run with: pytest benchmarks --run-benchmarks")
+    for item in items:
+        if 'benchmark' in item.keywords:
+            item.add_marker(skip)
+
+
+def pytest_configure(config):
+    config.addinivalue_line('markers', 'benchmark: API latency/query benchmark, opt-in with --run-benchmarks')
+    config.stash[results_key] = {}
+
+
+def pytest_terminal_summary(terminalreporter, config):
+    results = config.stash.get(results_key, {})
+    if not results:
+        return
+    terminalreporter.section(f"API benchmarks ({config.getoption('--bench-scale')})")
+    terminalreporter.write_line(
+        f"{'endpoint':<28}{'median ms':>11}{'p95 ms':>10}{'req/s':>10}{'relative':>10}{'queries':>9}"
+    )
+    for name, result in sorted(results.items()):
+        terminalreporter.write_line(
+            f"{name:<28}{result['median_ms']:>11.2f}{result['p95_ms']:>10.2f}{result['rps']:>10.1f}"
+            f"{result['relative']:>10.1f}{result['queries']:>9}"
+        )
+    if config.getoption('--save-baselines'):
+        baselines = json.loads(BASELINE_FILE.read_text()) if BASELINE_FILE.exists() else {}
+        baselines[config.getoption('--bench-scale')] = results
+        BASELINE_FILE.write_text(json.dumps(baselines, indent=2, sort_keys=True) + '\n')
+        terminalreporter.write_line(f"Baselines saved to {BASELINE_FILE}")
+
+
+@pytest.fixture(scope='session')
+def seeded(django_db_setup, django_db_blocker, request):
+    """Seeds the test database once per session at the requested scale."""
+    with django_db_blocker.unblock():
+        return seed(request.config.getoption('--bench-scale'))
+
+
+@pytest.fixture(scope='session')
+def baselines(request):
+    if not BASELINE_FILE.exists():
+        return {}
+    return json.loads(BASELINE_FILE.read_text()).get(request.config.getoption('--bench-scale'), {})
+
+
+@pytest.fixture(scope='session')
+def reference_ms(django_db_blocker):
+    """
+    Median latency of an anonymous request rejected by authentication, measured on
+    this host in this run. Endpoint latencies are stored and compared relative to it,
+    so a baseline recorded on one machine still means something on another.
+    """
+    client = Client()
+    latencies = []
+    with django_db_blocker.unblock():
+        for _ in range(50):
+            started = time.perf_counter()
+            client.get('/api/users/')
+            latencies.append(time.perf_counter() - started)
+    return statistics.median(latencies) * 1000
+
+
+@pytest.fixture
+def benchmark(request, baselines, reference_ms):
+    """
+    Returns ``run(name, request_func)``: calls ``request_func`` for the configured
+    number of rounds with a cold cache, records latency, throughput and query count.
+    Each round runs in a rolled-back savepoint so write endpoints see the same data
+    every time. The query count is a hard gate against the baseline; latency only
+    fails when its ratio to the same-run reference request regresses past the tolerance.
+    """
+    config = request.config
+
+    def run(name, request_func):
+        latencies = []
+        queries = 0
+        for _ in range(config.getoption('--bench-rounds')):
+            cache.clear()
+            with transaction.atomic():
+                with CaptureQueriesContext(connection) as captured:
+                    started = time.perf_counter()
+                    response = request_func()
+                    latencies.append(time.perf_counter() - started)
+                transaction.set_rollback(True)
+            assert response.status_code < 400, f"{name} returned {response.status_code}"
+            queries = max(queries, len(captured))
+
+        latencies.sort()
+        result = {
+            'median_ms': round(statistics.median(latencies) * 1000, 2),
+            'p95_ms': round(percentile(latencies, 0.95) * 1000, 2),
+            'rps': round(len(latencies) / sum(latencies), 1),
+            'queries': queries,
+        }
+        result['relative'] = round(result['median_ms'] / reference_ms, 2)
+        config.stash[results_key][name] = result
+
+        baseline = baselines.get(name)
+        if baseline and not config.getoption('--save-baselines'):
+            assert result['queries'] <= baseline['queries'], (
+                f"{name}: {result['queries']} queries, baseline {baseline['queries']}"
+            )
+            allowed = baseline['relative'] * (1 + config.getoption('--bench-tolerance'))
+            assert result['relative'] <= allowed, (
+                f"{name}: median {result['relative']}x the reference request, baseline {baseline['relative']}x"
+            )
+        return result
+
+    return run
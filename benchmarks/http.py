@@ -0,0 +1,39 @@
+import asyncio
+import time
+from urllib.parse import urlsplit
+
+
+async def fetch(base_url, path, token, method='GET', body=None, read_delay=0.0):
+    """
+    Issues one HTTP/1.1 request over a fresh connection and returns
+    ``(latency_seconds, status_code)``. Standard library only.
+    """
+    parts = urlsplit(base_url)
+    reader, writer = await asyncio.open_connection(parts.hostname, parts.port or 80)
+    payload = body.encode() if body else b''
+    request = (
+        f"{method} {path} HTTP/1.1\r\n"
+        f"Host: {parts.netloc}\r\n"
+        f"Authorization: Bearer {token}\r\n"
+        f"Content-Type: application/json\r\n"
+        f"Content-Length: {len(payload)}\r\n"
+        f"Connection: close\r\n\r\n"
+    ).encode() + payload
+    started = time.perf_counter()
+    writer.write(request)
+    await writer.drain()
+    status_line = await reader.readline()
+    if read_delay:
+        # Simulates a slow client that keeps the connection open while reading.
+        await asyncio.sleep(read_delay)
+    await reader.read()
+    writer.close()
+    await writer.wait_closed()
+    return time.perf_counter() - started, int(status_line.split()[1])
+
+
+def percentile(sorted_values, fraction):
+    if not sorted_values:
+        return 0.0
+    index = min(len(sorted_values) - 1, max(0, int(round(fraction * len(sorted_values))) - 1))
+    return sorted_values[index]
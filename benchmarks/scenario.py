@@ -0,0 +1,119 @@
+"""
+Scripted load scenario against a running server, in the spirit of a locust file:
+virtual users loop over a weighted mix of API calls with think time between them,
+and the run reports per-endpoint latency, throughput and error counts.
+
+Seed a database (manage.py seed, see core/seeding.py), start the server, then e.g.:
+
+    python -m benchmarks.scenario --token <JWT> --users 50 --duration 60 \\
+        --student 1 --course 1 --output results.json --baseline previous.json
+
+With --baseline, the run exits non-zero if any endpoint's p95 regressed by more
+than --tolerance compared with the earlier results file.
+"""
+import argparse
+import asyncio
+import json
+import random
+import sys
+import time
+from collections import defaultdict
+
+from benchmarks.http import fetch, percentile
+
+# (weight, name, path template)
+SCENARIO = [
+    (30, 'notifications unread', '/api/notifications/unread-count/'),
+    (15, 'notifications list', '/api/notifications/'),
+    (15, 'courses list', '/api/courses/'),
+    (10, 'grades by student', '/api/grades/?student={student}'),
+    (10, 'attendance list', '/api/attendance/'),
+    (5, 'grades by course', '/api/grades/?course={course}'),
+    (5, 'student stats', '/api/analytics/students/{student}/stats/'),
+    (5, 'course gradebook', '/api/courses/{course}/gradebook/'),
+    (5, 'user detail', '/api/users/{user}/'),
+]
+
+
+async def virtual_user(args, deadline, latencies, errors, rng):
+    weights = [weight for weight, _, _ in SCENARIO]
+    while time.monotonic() < deadline:
+        _, name, path = rng.choices(SCENARIO, weights=weights)[0]
+        try:
+            latency, status = await fetch(args.base_url, path.format(
+                student=args.student, course=args.course, user=args.user,
+            ), args.token)
+        except OSError:
+            errors[name] += 1
+            continue
+        if status >= 400:
+            errors[name] += 1
+        latencies[name].append(latency)
+        await asyncio.sleep(rng.uniform(0, args.think_time))
+
+
+async def run(args):
+    latencies, errors = defaultdict(list), defaultdict(int)
+    deadline = time.monotonic() + args.duration
+    started = time.monotonic()
+    await asyncio.gather(*(
+        virtual_user(args, deadline, latencies, errors, random.Random(args.seed + i))
+        for i in range(args.users)
+    ))
+    elapsed = time.monotonic() - started
+
+    results = {}
+    for name, values in latencies.items():
+        values.sort()
+        results[name] = {
+            'requests': len(values),
+            'errors': errors[name],
+            'rps': round(len(values) / elapsed, 1),
+            'p50_ms': round(percentile(values, 0.5) * 1000, 2),
+            'p95_ms': round(percentile(values, 0.95) * 1000, 2),
+        }
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--base-url', default='http://127.0.0.1:8000')
+    parser.add_argument('--token', required=True, help="JWT access token used for every request")
+    parser.add_argument('--student', type=int, default=1, help="Student id used in student-scoped paths")
+    parser.add_argument('--course', type=int, default=1, help="Course id used in course-scoped paths")
+    parser.add_argument('--user', type=int, default=1, help="User id used in user-scoped paths")
+    parser.add_argument('--users', type=int, default=20, help="Concurrent virtual users")
+    parser.add_argument('--duration', type=float, default=30, help="Seconds to run")
+    parser.add_argument('--think-time', type=float, default=0.5, help="Maximum pause between a user's requests")
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--output', help="Write the results as JSON to this file")
+    parser.add_argument('--baseline', help="Compare against a previous --output file")
+    parser.add_argument('--tolerance', type=float, default=0.25, help="Allowed p95 regression (0.25 = 25%%)")
+    args = parser.parse_args()
+
+    results = asyncio.run(run(args))
+
+    print(f"{'endpoint':<24}{'requests':>10}{'errors':>8}{'req/s':>9}{'p50 ms':>10}{'p95 ms':>10}")
+    for name, result in sorted(results.items()):
+        print(f"{name:<24}{result['requests']:>10}{result['errors']:>8}{result['rps']:>9.1f}"
+              f"{result['p50_ms']:>10.2f}{result['p95_ms']:>10.2f}")
+
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(results, f, indent=2, sort_keys=True)
+
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+        regressions = [
+            f"{name}: p95 {result['p95_ms']}ms vs {baseline[name]['p95_ms']}ms"
+            for name, result in results.items()
+            if name in baseline and result['p95_ms'] > baseline[name]['p95_ms'] * (1 + args.tolerance)
+        ]
+        if regressions:
+            print("Regressions:\n  " + "\n  ".join(regressions))
+            sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,34 @@
+"""
+Measures how long a fresh web or Celery worker process takes to boot and how
+many modules it imports. Each boot runs in a new interpreter (see core.startup).
+Run from the project root:
+
+    python -m benchmarks.startup --repeat 5
+
+``manage.py profile_imports`` prints the per-module breakdown of one boot.
+Only the standard library is used so the script runs anywhere the project does.
+"""
+import argparse
+import statistics
+
+from core.startup import BOOT, import_profile, time_boot
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--process', choices=sorted(BOOT), action='append', help="Process to boot; default both")
+    parser.add_argument('--repeat', type=int, default=5, help="Boots per process")
+    args = parser.parse_args()
+
+    print(f"{'process':<10}{'median ms':>11}{'min ms':>10}{'modules':>9}{'import ms':>11}")
+    for process in args.process or sorted(BOOT):
+        timings = time_boot(process, args.repeat)
+        modules = import_profile(process)
+        print(
+            f"{process:<10}{statistics.median(timings) * 1000:>11.0f}{min(timings) * 1000:>10.0f}"
+            f"{len(modules):>9}{sum(row[1] for row in modules) / 1000:>11.0f}"
+        )
+
+
+if __name__ == '__main__':
+    main()
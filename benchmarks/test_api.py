@@ -0,0 +1,58 @@
+import pytest
+from rest_framework.test import APIClient
+
+from users.models import User
+
+# (name, role making the request, path template filled from the seeded ids)
+ENDPOINTS = [
+    ('users list', 'admin', '/api/users/'),
+    ('user detail', 'admin', '/api/users/{student_user}/'),
+    ('students list', 'admin', '/api/students/'),
+    ('courses list', 'student_user', '/api/courses/'),
+    ('courses search', 'student_user', '/api/courses/?search=Course 1'),
+    ('course detail', 'teacher', '/api/courses/{course}/'),
+    ('course gradebook', 'teacher', '/api/courses/{course}/gradebook/'),
+    ('enrollments list', 'admin', '/api/courses/enrollments/'),
+    ('grades by course', 'teacher', '/api/grades/?course={course}'),
+    ('grades by student', 'teacher', '/api/grades/?student={student}'),
+    ('attendance list', 'student_user', '/api/attendance/'),
+    ('attendance by course', 'teacher', '/api/attendance/?course={course}'),
+    ('notifications list', 'student_user', '/api/notifications/'),
+    ('notifications unread', 'student_user', '/api/notifications/unread-count/'),
+    ('analytics', 'admin', '/api/analytics/'),
+    ('student stats', 'student_user', '/api/analytics/students/{student}/stats/'),
+    ('course stats', 'teacher', '/api/analytics/courses/{course}/stats/'),
+]
+
+# (name, role, method, path template, payload built from the seeded ids)
+WRITE_ENDPOINTS = [
+    ('enrollment create', 'student_user', 'post', '/api/courses/enrollments/',
+     lambda ids: {'student': ids['student'], 'course': ids['open_course']}),
+    ('enrollment batch', 'teacher', 'post', '/api/courses/enrollments/batch/',
+     lambda ids: {'course': ids['course'], 'students': ids['cohort']}),
+    ('notification update', 'student_user', 'put', '/api/notifications/{notification}/',
+     lambda ids: {'read': True}),
+    ('notifications bulk read', 'student_user', 'post', '/api/notifications/bulk/',
+     lambda ids: {'ids': [ids['notification']], 'action': 'mark_read'}),
+]
+
+
+@pytest.mark.benchmark
+@pytest.mark.django_db
+@pytest.mark.parametrize('name, role, path', ENDPOINTS, ids=[endpoint[0] for endpoint in ENDPOINTS])
+def test_endpoint(benchmark, seeded, name, role, path):
+    client = APIClient()
+    client.force_authenticate(user=User.objects.get(pk=seeded[role]))
+    url = path.format(**seeded)
+    benchmark(name, lambda: client.get(url))
+
+
+@pytest.mark.benchmark
+@pytest.mark.django_db
+@pytest.mark.parametrize('name, role, method, path, payload', WRITE_ENDPOINTS, ids=[endpoint[0] for endpoint in WRITE_ENDPOINTS])
+def test_write_endpoint(benchmark, seeded, name, role, method, path, payload):
+    client = APIClient()
+    client.force_authenticate(user=User.objects.get(pk=seeded[role]))
+    url = path.format(**seeded)
+    send = getattr(client, method)
+    benchmark(name, lambda: send(url, payload(seeded), format='json'))
@@ -0,0 +1,41 @@
+from unittest.mock import patch
+
+import pytest
+from django.core.cache import cache
+
+
+@pytest.fixture(autouse=True)
+def clear_cache():
+    cache.clear()
+    yield
+    cache.clear()
+
+
+@pytest.fixture
+def seeded_data(db):
+    """Seeds a small but realistic dataset and returns the ids budget tests request as."""
+    from core.seeding import seed
+    return seed('tiny')
+
+
+@pytest.fixture
+def warm_course_cache(db):
+    """
+    Returns a function that loads every course into the course cache, so query
+    budgets measure the steady state rather than each course's first render.
+    """
+    from courses.cache import CourseLookup
+    from courses.models import Course
+
+    def warm():
+        CourseLookup().get_many(list(Course.objects.values_list('pk', flat=True)))
+    return warm
+
+
+@pytest.fixture
+def enrollment_queue_redis():
+    """An in-memory Redis behind the enrollment queue, which refuses to run on the test cache."""
+    fakeredis = pytest.importorskip('fakeredis')
+    client = fakeredis.FakeRedis()
+    with patch('courses.enrollment_queue.redis_client', return_value=client):
+        yield client
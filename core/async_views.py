@@ -0,0 +1,43 @@
+from asgiref.sync import sync_to_async
+from django.http import JsonResponse
+from django.views import View
+from rest_framework.exceptions import AuthenticationFailed
+from rest_framework_simplejwt.authentication import JWTAuthentication
+
+
+async def authenticate(request):
+    """
+    Resolves the user of a native async request the same way the DRF views do:
+    a JWT bearer token first, then the session. Returns None for anonymous requests.
+    """
+    authenticator = JWTAuthentication()
+    header = authenticator.get_header(request)
+    if header is not None:
+        raw_token = authenticator.get_raw_token(header)
+        if raw_token is None:
+            return None
+        try:
+            validated_token = authenticator.get_validated_token(raw_token)
+            return await sync_to_async(authenticator.get_user)(validated_token)
+        except AuthenticationFailed:
+            return None
+    user = await request.auser()
+    return user if user.is_authenticated else None
+
+
+class AsyncAPIView(View):
+    """
+    Base class for the async variants of read-heavy endpoints. Handlers are
+    ``async def`` methods so the request never occupies a worker thread while
+    waiting on the database or Redis.
+    """
+
+    async def authenticate(self, request):
+        return await authenticate(request)
+
+    async def dispatch(self, request, *args, **kwargs):
+        user = await self.authenticate(request)
+        if user is None:
+            return JsonResponse({"detail": "Authentication credentials were not provided."}, status=401)
+        request.user = user
+        return await super().dispatch(request, *args, **kwargs)
@@ -0,0 +1,76 @@
+import asyncio
+import hashlib
+import weakref
+
+from django.conf import settings
+from django.core.cache import cache, caches
+from django.utils.http import urlencode
+from django_redis.cache import RedisCache
+from redis import asyncio as aioredis
+
+from core.metrics import record_cache_lookup
+
+
+def query_cache_key(prefix, params):
+    """
+    Returns a cache key for a list endpoint that includes the request's
+    query parameters, so every filter/ordering/search combination is cached
+    separately. Requests without parameters keep the plain ``prefix`` key.
+    """
+    items = sorted((key, value) for key, values in params.lists() for value in values if value != '')
+    if not items:
+        return prefix
+    digest = hashlib.md5(urlencode(items).encode()).hexdigest()
+    return f'{prefix}_{digest}'
+
+
+_MISSING = object()
+
+
+class InstrumentedRedisCache(RedisCache):
+    """django-redis cache that counts hits and misses per key family for /metrics."""
+
+    def get(self, key, default=None, version=None, client=None):
+        value = super().get(key, _MISSING, version=version, client=client)
+        record_cache_lookup(key, value is not _MISSING)
+        return default if value is _MISSING else value
+
+
+_async_clients = weakref.WeakKeyDictionary()
+
+
+def async_redis_client():
+    """
+    Returns a redis.asyncio client for the default cache's server, one per
+    event loop, or None when the default cache is not django-redis.
+    """
+    if not isinstance(caches['default'], RedisCache):
+        return None
+    loop = asyncio.get_running_loop()
+    client = _async_clients.get(loop)
+    if client is None:
+        location = settings.CACHES['default']['LOCATION']
+        if isinstance(location, (list, tuple)):
+            location = location[0]
+        client = _async_clients[loop] = aioredis.from_url(location.split(',')[0])
+    return client
+
+
+async def aget(key, default=None):
+    """
+    Non-blocking cache read that shares keys and value encoding with the
+    synchronous ``cache`` object, so sync and async views reuse each other's entries.
+    """
+    client = async_redis_client()
+    if client is None:
+        return await cache.aget(key, default)
+    value = await client.get(cache.make_key(key))
+    record_cache_lookup(key, value is not None)
+    return default if value is None else cache.client.decode(value)
+
+
+async def aset(key, value, timeout):
+    client = async_redis_client()
+    if client is None:
+        return await cache.aset(key, value, timeout=timeout)
+    await client.set(cache.make_key(key), cache.client.encode(value), ex=timeout)
@@ -0,0 +1,45 @@
+from django.core.exceptions import FieldDoesNotExist, ValidationError as DjangoValidationError
+from django.db.models import BooleanField
+from django.db.models.constants import LOOKUP_SEP
+from rest_framework.exceptions import ValidationError
+from rest_framework.filters import BaseFilterBackend
+
+BOOLEAN_VALUES = {'true': True, 'false': False}
+
+
+class QueryParamFilterBackend(BaseFilterBackend):
+    """
+    Filters a queryset using the view's ``filter_fields`` mapping of
+    query parameter name -> ORM lookup, e.g. ``{'date_from': 'date__gte'}``.
+    Empty parameters are ignored, so the filters are applied in SQL only
+    when the client asks for them. ``true``/``false`` are converted only for
+    lookups that end on a BooleanField; every other value is passed through.
+    """
+
+    def filter_queryset(self, request, queryset, view):
+        lookups = {}
+        for param, lookup in getattr(view, 'filter_fields', {}).items():
+            value = request.query_params.get(param)
+            if value not in (None, ''):
+                if isinstance(lookup_field(queryset.model, lookup), BooleanField):
+                    value = BOOLEAN_VALUES.get(value.lower(), value)
+                lookups[lookup] = value
+        if not lookups:
+            return queryset
+        try:
+            return queryset.filter(**lookups)
+        except (ValueError, DjangoValidationError) as e:
+            raise ValidationError({"error": f"Invalid filter value: {e}"})
+
+
+def lookup_field(model, lookup):
+    """The model field an ORM lookup such as ``course__is_active__exact`` filters on, or None."""
+    field = None
+    for part in lookup.split(LOOKUP_SEP):
+        try:
+            field = model._meta.get_field(part)
+        except FieldDoesNotExist:
+            break
+        if field.related_model is not None:
+            model = field.related_model
+    return field
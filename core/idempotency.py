@@ -0,0 +1,100 @@
+"""
+``Idempotency-Key`` support for write endpoints whose clients retry.
+
+The first request with a key claims it in the cache (an atomic ``add``, so
+concurrent retries cannot both run), executes, and stores its status, body
+and Location for IDEMPOTENCY_TTL. A retry with the same key gets the stored
+response back with ``Idempotent-Replayed: true`` and nothing is written or
+dispatched again. Keys are scoped per user and bound to a hash of the method,
+path and body: reusing one for a different request is rejected with 422, and
+a retry that arrives while the first request is still running gets 409.
+Server errors release the key, so the client's next retry executes afresh.
+Requests without the header are not affected.
+"""
+import functools
+import hashlib
+import json
+
+from django.conf import settings
+from django.core.cache import cache
+from drf_yasg import openapi
+from rest_framework.response import Response
+
+from core.metrics import registry
+
+IDEMPOTENCY_HEADER = 'Idempotency-Key'
+IDEMPOTENCY_TTL = getattr(settings, 'IDEMPOTENCY_TTL', 60 * 60 * 24)
+IDEMPOTENCY_LOCK_TTL = getattr(settings, 'IDEMPOTENCY_LOCK_TTL', 60)
+MAX_KEY_LENGTH = 255
+
+IDEMPOTENCY_KEY_PARAMETER = openapi.Parameter(
+    IDEMPOTENCY_HEADER, openapi.IN_HEADER, type=openapi.TYPE_STRING,
+    description="Unique key of this write; retries with the same key replay the original response instead of writing again",
+)
+
+IDEMPOTENT_REQUESTS = registry.counter(
+    'idempotent_requests_total', "Requests carrying an Idempotency-Key by outcome.", ['outcome'])
+
+
+def idempotency_cache_key(user_id, key):
+    return f'idempotency_{user_id}_{hashlib.sha256(key.encode()).hexdigest()}'
+
+
+def request_fingerprint(request):
+    body = json.dumps(request.data, sort_keys=True, default=str)
+    return hashlib.sha256(f'{request.method} {request.path}\n{body}'.encode()).hexdigest()
+
+
+def idempotent(view_method):
+    """Makes a DRF view method (``post``) honour the Idempotency-Key header."""
+
+    @functools.wraps(view_method)
+    def wrapper(self, request, *args, **kwargs):
+        key = request.headers.get(IDEMPOTENCY_HEADER)
+        if key is None:
+            return view_method(self, request, *args, **kwargs)
+        if not key or len(key) > MAX_KEY_LENGTH:
+            return Response({"error": f"{IDEMPOTENCY_HEADER} must be 1 to {MAX_KEY_LENGTH} characters"}, status=400)
+
+        cache_key = idempotency_cache_key(request.user.pk, key)
+        fingerprint = request_fingerprint(request)
+        if not cache.add(cache_key, {'fingerprint': fingerprint, 'status': None}, timeout=IDEMPOTENCY_LOCK_TTL):
+            return replay(cache.get(cache_key), fingerprint)
+
+        IDEMPOTENT_REQUESTS.inc(outcome='executed')
+        try:
+            response = view_method(self, request, *args, **kwargs)
+        except Exception:
+            cache.delete(cache_key)
+            raise
+        if response.status_code >= 500:
+            cache.delete(cache_key)
+            return response
+        cache.set(cache_key, {
+            'fingerprint': fingerprint,
+            'status': response.status_code,
+            'data': response.data,
+            'location': response.get('Location'),
+        }, timeout=IDEMPOTENCY_TTL)
+        return response
+
+    return wrapper
+
+
+def replay(entry, fingerprint):
+    if entry is not None and entry['fingerprint'] != fingerprint:
+        IDEMPOTENT_REQUESTS.inc(outcome='mismatch')
+        return Response({"error": f"This {IDEMPOTENCY_HEADER} was already used for a different request."}, status=422)
+    if entry is None or entry['status'] is None:
+        # Still running, or it just failed and released the key: either way the client should retry.
+        IDEMPOTENT_REQUESTS.inc(outcome='in_progress')
+        return Response(
+            {"error": f"A request with this {IDEMPOTENCY_HEADER} is still being processed; retry shortly."},
+            status=409, headers={'Retry-After': '1'},
+        )
+
+    IDEMPOTENT_REQUESTS.inc(outcome='replayed')
+    headers = {'Idempotent-Replayed': 'true'}
+    if entry['location']:
+        headers['Location'] = entry['location']
+    return Response(entry['data'], status=entry['status'], headers=headers)
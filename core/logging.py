@@ -1,3 +1,115 @@
+import json
 import logging
+import os
+import queue
+import random
+from datetime import datetime, timezone
+from logging.handlers import QueueListener
 
 logger = logging.getLogger('custom_logger')
+
+# Attributes every LogRecord has; anything else on a record came from ``extra=``.
+RECORD_ATTRIBUTES = set(vars(logging.LogRecord('', 0, '', 0, '', (), None))) | {'message', 'asctime', 'taskName', 'sample'}
+LAZY_ARG_TYPES = (str, int, float, bool, type(None))
+
+
+class JSONFormatter(logging.Formatter):
+    """Formats a record as one JSON object per line, including any ``extra`` fields."""
+
+    def format(self, record):
+        payload = {
+            'time': datetime.fromtimestamp(record.created, tz=timezone.utc).isoformat(),
+            'level': record.levelname,
+            'logger': record.name,
+            'module': record.module,
+            'message': record.getMessage(),
+        }
+        payload.update({key: value for key, value in vars(record).items() if key not in RECORD_ATTRIBUTES})
+        if record.exc_info:
+            payload['exc_info'] = self.formatException(record.exc_info)
+        elif record.exc_text:
+            payload['exc_info'] = record.exc_text
+        return json.dumps(payload, default=str)
+
+
+class SamplingFilter(logging.Filter):
+    """
+    Lets through only a ``rate`` fraction of records below ``level``; warnings
+    and errors always pass. Log with ``extra={'sample': False}`` to keep an info line.
+    """
+
+    def __init__(self, rate=1.0, level='WARNING'):
+        super().__init__()
+        self.rate = rate
+        self.level = logging.getLevelName(level) if isinstance(level, str) else level
+
+    def filter(self, record):
+        if record.levelno >= self.level or not getattr(record, 'sample', True):
+            return True
+        return self.rate >= 1 or random.random() < self.rate
+
+
+class BackgroundHandler(logging.Handler):
+    """
+    Puts records on a bounded queue that a QueueListener thread drains into
+    ``targets``, so the logging call never waits on file or console I/O. When
+    the queue is full records are dropped and counted instead of blocking.
+
+    ``targets`` are ``cfg://handlers.<name>`` references. dictConfig builds
+    handlers in name order, so the targets must sort before this handler.
+
+    Threads do not survive fork, so the listener is started by the first record
+    each process emits rather than at configuration time: prefork workers and
+    ``--preload`` children each drain their own fresh queue.
+    """
+
+    def __init__(self, targets=(), capacity=10_000):
+        super().__init__()
+        # Indexing a dictConfig ConvertingList is what resolves the cfg:// references.
+        targets = [targets[index] for index in range(len(targets))]
+        for target in targets:
+            if not isinstance(target, logging.Handler):
+                raise ValueError(f"Log target {target!r} is not configured yet; give it a name that sorts first")
+        self.targets = targets
+        self.capacity = capacity
+        self.dropped = 0
+        self.queue = None
+        self.listener = None
+        self._pid = None
+
+    def _start(self):
+        # emit runs under the handler lock, which logging re-creates in a forked child.
+        self.queue = queue.Queue(self.capacity)
+        self.listener = QueueListener(self.queue, *self.targets, respect_handler_level=True)
+        self.listener.start()
+        self._pid = os.getpid()
+
+    def emit(self, record):
+        try:
+            if self._pid != os.getpid():
+                self._start()
+            if record.exc_info:
+                # Tracebacks reference live frames, render them while they are still accurate.
+                record.exc_text = logging.Formatter().formatException(record.exc_info)
+                record.exc_info = None
+            if record.args and not all(isinstance(arg, LAZY_ARG_TYPES) for arg in self._args(record)):
+                # Objects such as model instances may hit the database in __str__, so they
+                # are rendered here; plain values are formatted later by the listener thread.
+                record.msg = record.getMessage()
+                record.args = None
+            self.queue.put_nowait(record)
+        except queue.Full:
+            self.dropped += 1
+        except Exception:
+            self.handleError(record)
+
+    @staticmethod
+    def _args(record):
+        return record.args.values() if isinstance(record.args, dict) else record.args
+
+    def close(self):
+        # A listener inherited from the parent has no thread in this process to stop.
+        if self._pid == os.getpid():
+            self._pid = None
+            self.listener.stop()
+        super().close()
@@ -0,0 +1,15 @@
+from django.core.management.base import BaseCommand
+
+from core.openapi import schema_path, write_schema
+
+
+class Command(BaseCommand):
+    help = "Generates the OpenAPI document served at /openapi.json. Run it on every deploy."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--output', help="Where to write the document; defaults to OPENAPI_SCHEMA_PATH")
+
+    def handle(self, *args, **options):
+        path = options['output'] or schema_path()
+        content = write_schema(path)
+        self.stdout.write(self.style.SUCCESS(f"Wrote {len(content):,} bytes of OpenAPI document to {path}."))
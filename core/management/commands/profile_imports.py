@@ -0,0 +1,29 @@
+from django.core.management.base import BaseCommand
+
+from core.startup import BOOT, import_profile
+
+
+class Command(BaseCommand):
+    help = (
+        "Boots a fresh web or worker process under python -X importtime and lists the modules that "
+        "took longest to import. Use python -m benchmarks.startup to time whole boots."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--process', default='web', choices=sorted(BOOT), help="Process to boot")
+        parser.add_argument('--top', type=int, default=25, help="Number of modules to list")
+        parser.add_argument('--self', action='store_true', dest='by_self',
+                            help="Rank by a module's own time rather than including its imports")
+        parser.add_argument('--depth', type=int, help="Only list modules imported at most this deep")
+
+    def handle(self, *args, **options):
+        rows = import_profile(options['process'])
+        count, total = len(rows), sum(row[1] for row in rows)
+        if options['depth'] is not None:
+            rows = [row for row in rows if row[3] <= options['depth']]
+        rows.sort(key=lambda row: row[1] if options['by_self'] else row[2], reverse=True)
+
+        self.stdout.write(f"{options['process']}: {count:,} modules, {total / 1000:.0f}ms importing")
+        self.stdout.write(f"{'self ms':>9}{'total ms':>10}  module")
+        for name, self_us, cumulative_us, depth in rows[:options['top']]:
+            self.stdout.write(f"{self_us / 1000:>9.1f}{cumulative_us / 1000:>10.1f}  {'  ' * depth}{name}")
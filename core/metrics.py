@@ -0,0 +1,268 @@
+"""
+In-process metrics registry rendered in the Prometheus text exposition format.
+
+Every process (gunicorn worker, Celery worker) accumulates counter and
+histogram increments in memory. A background thread adds them to a Redis hash
+shared by all processes every METRICS_FLUSH_INTERVAL seconds, and a scrape
+flushes its own process first, so /metrics on any worker reports totals for
+the whole deployment while recording a sample never waits on Redis. When the
+default cache is not Redis the totals are kept in the current process only.
+"""
+import atexit
+import os
+import re
+import threading
+import time
+from collections import defaultdict
+
+from django.conf import settings
+from django.core.cache import cache, caches
+from django_redis import get_redis_connection
+from django_redis.cache import RedisCache
+
+from core.logging import logger
+
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+STORE_KEY = 'metrics'
+HASH_SEGMENT = re.compile(r'[0-9a-f]{32}')
+
+
+def format_labels(labels):
+    escaped = (
+        (name, str(value).replace('\\', r'\\').replace('"', r'\"').replace('\n', r'\n'))
+        for name, value in labels
+    )
+    return ','.join(f'{name}="{value}"' for name, value in escaped)
+
+
+def format_value(value):
+    return str(int(value)) if float(value).is_integer() else repr(float(value))
+
+
+class Metric:
+    type = None
+
+    def __init__(self, registry, name, documentation, labelnames=()):
+        self.registry = registry
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+
+    def _labels(self, labels):
+        if set(labels) != set(self.labelnames):
+            raise ValueError(f"{self.name} expects labels {self.labelnames}, got {tuple(labels)}")
+        return tuple((name, labels[name]) for name in self.labelnames)
+
+    def sample_names(self):
+        return [self.name]
+
+
+class Counter(Metric):
+    type = 'counter'
+
+    def inc(self, amount=1, **labels):
+        self.registry.add(self.name, self._labels(labels), amount)
+
+
+class Histogram(Metric):
+    type = 'histogram'
+
+    def __init__(self, registry, name, documentation, labelnames=(), buckets=DEFAULT_BUCKETS):
+        super().__init__(registry, name, documentation, labelnames)
+        self.buckets = tuple(sorted(buckets))
+
+    def observe(self, value, **labels):
+        labels = self._labels(labels)
+        # Buckets are stored cumulatively, as they are exposed; adding 0 still creates empty buckets.
+        for bound in self.buckets:
+            self.registry.add(f'{self.name}_bucket', labels + (('le', format_value(bound)),), int(value <= bound))
+        self.registry.add(f'{self.name}_bucket', labels + (('le', '+Inf'),), 1)
+        self.registry.add(f'{self.name}_sum', labels, value)
+        self.registry.add(f'{self.name}_count', labels, 1)
+
+    def sample_names(self):
+        return [f'{self.name}_bucket', f'{self.name}_sum', f'{self.name}_count']
+
+
+class Gauge(Metric):
+    """A value computed at scrape time by ``collect()``, which yields ``(labels, value)`` pairs."""
+    type = 'gauge'
+
+    def __init__(self, registry, name, documentation, collect):
+        super().__init__(registry, name, documentation)
+        self.collect = collect
+
+
+class LocalStore:
+    def __init__(self):
+        self.values = defaultdict(float)
+
+    def add(self, deltas):
+        for field, amount in deltas.items():
+            self.values[field] += amount
+
+    def read(self):
+        return dict(self.values)
+
+
+class RedisStore:
+    def __init__(self, client, key):
+        self.client = client
+        self.key = key
+
+    def add(self, deltas):
+        pipeline = self.client.pipeline(transaction=False)
+        for field, amount in deltas.items():
+            pipeline.hincrbyfloat(self.key, field, amount)
+        pipeline.execute()
+
+    def read(self):
+        return {field.decode(): float(value) for field, value in self.client.hgetall(self.key).items()}
+
+
+class Registry:
+    def __init__(self):
+        self.metrics = {}
+        self.local_store = LocalStore()
+        self._pending = defaultdict(float)
+        self._lock = threading.Lock()
+        self._flusher = None
+        # Threads and a lock held mid-fork do not carry over into a forked child,
+        # and the parent's pending increments are the parent's to flush.
+        os.register_at_fork(after_in_child=self._reset)
+        atexit.register(self.flush)
+
+    def _reset(self):
+        self._pending = defaultdict(float)
+        self._lock = threading.Lock()
+        self._flusher = None
+
+    def _register(self, metric):
+        self.metrics[metric.name] = metric
+        return metric
+
+    def counter(self, name, documentation, labelnames=()):
+        return self._register(Counter(self, name, documentation, labelnames))
+
+    def histogram(self, name, documentation, labelnames=(), buckets=DEFAULT_BUCKETS):
+        return self._register(Histogram(self, name, documentation, labelnames, buckets))
+
+    def gauge(self, name, documentation, collect):
+        return self._register(Gauge(self, name, documentation, collect))
+
+    def store(self):
+        if isinstance(caches['default'], RedisCache):
+            return RedisStore(get_redis_connection('default'), cache.make_key(STORE_KEY))
+        return self.local_store
+
+    def add(self, sample_name, labels, amount):
+        field = f'{sample_name}{{{format_labels(labels)}}}' if labels else sample_name
+        with self._lock:
+            self._pending[field] += amount
+            if self._flusher is None:
+                self._flusher = threading.Thread(target=self._flush_periodically, name='metrics-flush', daemon=True)
+                self._flusher.start()
+
+    def _flush_periodically(self):
+        while True:
+            time.sleep(getattr(settings, 'METRICS_FLUSH_INTERVAL', 5))
+            self.flush()
+
+    def flush(self):
+        with self._lock:
+            deltas, self._pending = self._pending, defaultdict(float)
+        if not deltas:
+            return
+        try:
+            self.store().add(deltas)
+        except Exception as e:
+            logger.error("Error flushing metrics: %s", e)
+            with self._lock:
+                for field, amount in deltas.items():
+                    self._pending[field] += amount
+
+    def render(self):
+        """Flushes this process's pending increments and renders every metric as exposition text."""
+        self.flush()
+        values = self.store().read()
+        by_sample = defaultdict(list)
+        for field, value in values.items():
+            by_sample[field.split('{', 1)[0]].append((field, value))
+
+        lines = []
+        for metric in self.metrics.values():
+            lines.append(f'# HELP {metric.name} {metric.documentation}')
+            lines.append(f'# TYPE {metric.name} {metric.type}')
+            if isinstance(metric, Gauge):
+                try:
+                    for labels, value in metric.collect():
+                        field = f'{metric.name}{{{format_labels(labels.items())}}}' if labels else metric.name
+                        lines.append(f'{field} {format_value(value)}')
+                except Exception as e:
+                    logger.error("Error collecting %s: %s", metric.name, e)
+                continue
+            for sample_name in metric.sample_names():
+                for field, value in sorted(by_sample.get(sample_name, []), key=sample_sort_key):
+                    lines.append(f'{field} {format_value(value)}')
+        return '\n'.join(lines) + '\n'
+
+
+def sample_sort_key(item):
+    field = item[0]
+    head, _, le = field.partition('le="')
+    bound = le.split('"', 1)[0]
+    return head, float('inf') if bound == '+Inf' else float(bound or 0)
+
+
+def key_family(key):
+    """Reduces a cache key to its family: ``course_12`` -> ``course``, ``grade_list_3_<md5>`` -> ``grade_list``."""
+    parts = []
+    for part in key.split('_'):
+        if part.isdigit() or HASH_SEGMENT.fullmatch(part):
+            break
+        parts.append(part)
+    return '_'.join(parts) or 'other'
+
+
+def celery_queue_lengths():
+    from miniproject.celery import app
+
+    with app.connection_for_read() as connection:
+        channel = connection.default_channel
+        for queue in settings.CELERY_TASK_QUEUES:
+            try:
+                length = channel.queue_declare(queue=queue.name, passive=True).message_count
+            except connection.channel_errors:
+                # The broker only knows a queue once a worker or producer has declared it.
+                length = 0
+            yield {'queue': queue.name}, length
+
+
+def enrollment_queue_length():
+    from courses.enrollment_queue import queue_length
+
+    yield {}, queue_length()
+
+
+registry = Registry()
+
+HTTP_REQUESTS = registry.counter(
+    'http_requests_total', "HTTP requests by route, method and status.", ['route', 'method', 'status'])
+HTTP_LATENCY = registry.histogram(
+    'http_request_duration_seconds', "HTTP request latency by route and method.", ['route', 'method'])
+DB_QUERY_LATENCY = registry.histogram(
+    'db_query_duration_seconds', "SQL query latency by database alias and statement type.", ['alias', 'operation'],
+    buckets=(0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0))
+CACHE_LOOKUPS = registry.counter(
+    'cache_lookups_total', "Cache reads by key family and result (hit or miss).", ['family', 'result'])
+CELERY_TASK_LATENCY = registry.histogram(
+    'celery_task_duration_seconds', "Celery task run time by task name and final state.", ['task', 'state'],
+    buckets=(0.01, 0.05, 0.1, 0.5, 1.0, 5.0, 10.0, 30.0, 60.0, 300.0, 1800.0))
+CELERY_QUEUE_LENGTH = registry.gauge(
+    'celery_queue_length', "Messages waiting in each Celery queue.", celery_queue_lengths)
+ENROLLMENT_QUEUE_LENGTH = registry.gauge(
+    'enrollment_queue_length', "Enrollment requests waiting to be processed.", enrollment_queue_length)
+
+
+def record_cache_lookup(key, hit):
+    CACHE_LOOKUPS.inc(family=key_family(key), result='hit' if hit else 'miss')
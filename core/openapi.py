@@ -0,0 +1,118 @@
+"""
+The OpenAPI document is generated once and served as a static artifact.
+
+``manage.py generate_openapi`` introspects every view and serializer and
+writes the JSON document to OPENAPI_SCHEMA_PATH; run it on deploy. A process
+that finds no document generates it on the first request and writes it for
+the others. /openapi.json serves the bytes with an ETag and Cache-Control,
+and the Swagger and ReDoc pages are static shells pointed at it (SPEC_URL),
+so neither UI introspects the API per hit.
+
+drf_yasg's generator, codecs and UI views are imported on first use only, so
+web processes that never serve the docs never load them.
+"""
+import functools
+import hashlib
+import threading
+from pathlib import Path
+
+from django.conf import settings
+from drf_yasg import openapi
+
+from core.logging import logger
+
+INFO = openapi.Info(
+    title="SMS API",
+    default_version='v1',
+    description="API documentation for SMS",
+    contact=openapi.Contact(email="admin@example.com"),
+)
+
+_documents = {}
+_lock = threading.Lock()
+
+
+@functools.cache
+def _ui_view(renderer, cache_timeout):
+    from drf_yasg.generators import OpenAPISchemaGenerator
+    from drf_yasg.views import get_schema_view
+    from rest_framework import permissions
+
+    class DocumentShellGenerator(OpenAPISchemaGenerator):
+        """Only the title and version the UI pages show; they fetch the document itself from SPEC_URL."""
+
+        def get_schema(self, request=None, public=False):
+            return openapi.Swagger(info=self.info, _prefix='/', paths=openapi.Paths(paths={}))
+
+    view = get_schema_view(INFO, public=True, permission_classes=(permissions.AllowAny,), generator_class=DocumentShellGenerator)
+    return view.with_ui(renderer, cache_timeout=cache_timeout)
+
+
+def ui_view(renderer, cache_timeout=0):
+    """A Swagger or ReDoc page view whose drf_yasg machinery is built on its first request."""
+
+    def view(request, *args, **kwargs):
+        return _ui_view(renderer, cache_timeout)(request, *args, **kwargs)
+
+    return view
+
+
+def schema_path():
+    return Path(getattr(settings, 'OPENAPI_SCHEMA_PATH', settings.BASE_DIR / 'openapi.json'))
+
+
+def generate_schema():
+    """Introspects the API, as an anonymous visitor would see it, and returns the OpenAPI document as JSON bytes."""
+    from django.contrib.auth.models import AnonymousUser
+    from django.test import RequestFactory
+    from drf_yasg.codecs import OpenAPICodecJson
+    from drf_yasg.generators import OpenAPISchemaGenerator
+    from rest_framework.request import Request
+
+    request = Request(RequestFactory().get('/openapi.json'))
+    request.user = AnonymousUser()
+    schema = OpenAPISchemaGenerator(INFO).get_schema(request=request, public=True)
+    return OpenAPICodecJson(validators=[]).encode(schema)
+
+
+def write_schema(path=None):
+    """Generates the document, writes it to ``path`` and makes it the one this process serves."""
+    path = Path(path or schema_path())
+    content = generate_schema()
+    _write(path, content)
+    _documents[path] = (content, etag(content))
+    return content
+
+
+def _write(path, content):
+    path.parent.mkdir(parents=True, exist_ok=True)
+    temporary = path.with_name(f'.{path.name}.tmp')
+    temporary.write_bytes(content)
+    temporary.replace(path)
+
+
+def etag(content):
+    return '"%s"' % hashlib.sha256(content).hexdigest()[:32]
+
+
+def get_schema():
+    """Returns the served document and its ETag, reading or generating it once per process."""
+    path = schema_path()
+    document = _documents.get(path)
+    if document is None:
+        with _lock:
+            document = _documents.get(path)
+            if document is None:
+                if path.exists():
+                    content = path.read_bytes()
+                    _documents[path] = document = (content, etag(content))
+                else:
+                    logger.warning("OpenAPI document %s is missing; generating it", path)
+                    content = generate_schema()
+                    _documents[path] = document = (content, etag(content))
+                    try:
+                        _write(path, content)
+                    except OSError as e:
+                        # A read-only filesystem only costs the other processes a regeneration.
+                        logger.error("Could not write the OpenAPI document to %s: %s", path, e)
+    return document
@@ -0,0 +1,162 @@
+"""
+Bulk data seeding for ``manage.py seed`` and the benchmark suite. Scales are
+named so baselines recorded at one size are only ever compared against runs at
+the same size. Rows are built lazily and inserted with chunked ``bulk_create``
+under a single precomputed password hash, so millions of rows take minutes.
+"""
+import random
+
+from django.contrib.auth.hashers import make_password
+from django.db import transaction
+
+from analytics.models import APIRequestLog
+from analytics.stats import rebuild_all_stats
+from attendance.models import Attendance
+from courses.enrollment import recount_enrollments
+from courses.models import Course, Enrollment
+from courses.search import rebuild_index
+from grades.models import Grade, GRADE_POINTS
+from notifications.models import Notification
+from students.models import Student
+from users.models import User
+
+SCALES = {
+    'tiny': {
+        'students': 20, 'teachers': 3, 'courses': 4, 'enrollments_per_student': 2,
+        'grades': 200, 'attendance': 200, 'notifications': 100, 'request_logs': 200,
+    },
+    'small': {
+        'students': 200, 'teachers': 10, 'courses': 20, 'enrollments_per_student': 3,
+        'grades': 2_000, 'attendance': 2_000, 'notifications': 2_000, 'request_logs': 10_000,
+    },
+    'medium': {
+        'students': 2_000, 'teachers': 50, 'courses': 100, 'enrollments_per_student': 4,
+        'grades': 100_000, 'attendance': 100_000, 'notifications': 50_000, 'request_logs': 1_000_000,
+    },
+    'full': {
+        'students': 10_000, 'teachers': 200, 'courses': 500, 'enrollments_per_student': 5,
+        'grades': 1_000_000, 'attendance': 1_000_000, 'notifications': 500_000, 'request_logs': 10_000_000,
+    },
+}
+
+BATCH_SIZE = 5_000
+ENDPOINTS = ['/api/grades/', '/api/attendance/', '/api/courses/', '/api/notifications/', '/api/users/']
+
+
+def _bulk_create(model, rows, batch_size=BATCH_SIZE, progress=None):
+    """
+    Inserts an iterable of unsaved instances in fixed-size batches without
+    materialising it. Each batch commits on its own so SQLite does not fsync per
+    statement and Postgres does not hold one enormous transaction open.
+    """
+    total = 0
+    batch = []
+    for row in rows:
+        batch.append(row)
+        if len(batch) >= batch_size:
+            total += _insert_batch(model, batch, batch_size, progress)
+            batch = []
+    if batch:
+        total += _insert_batch(model, batch, batch_size, progress)
+    return total
+
+
+def _insert_batch(model, batch, batch_size, progress):
+    with transaction.atomic():
+        model.objects.bulk_create(batch, batch_size=batch_size)
+    if progress:
+        progress(str(model._meta.verbose_name_plural), len(batch))
+    return len(batch)
+
+
+def seed(scale='small', random_seed=0, overrides=None, batch_size=BATCH_SIZE, progress=None):
+    """
+    Populates an empty database at the given scale and returns the ids the benchmarks need.
+    ``overrides`` replaces individual row counts of the scale, ``progress`` is called
+    as ``progress(label, rows_in_batch)`` after every batch.
+    """
+    sizes = {**SCALES[scale], **(overrides or {})}
+    rng = random.Random(random_seed)
+    password = make_password('benchmark')
+
+    def insert(model, rows):
+        return _bulk_create(model, rows, batch_size, progress)
+
+    insert(User, (
+        User(username=f'teacher{i}', email=f'teacher{i}@example.com', password=password, role='teacher')
+        for i in range(sizes['teachers'])
+    ))
+    insert(User, (
+        User(username=f'student{i}', email=f'student{i}@example.com', password=password, role='student')
+        for i in range(sizes['students'])
+    ))
+    admin = User.objects.create(username='admin', email='admin@example.com', password=password, role='admin')
+
+    teacher_ids = list(User.objects.filter(role='teacher').order_by('id').values_list('id', flat=True))
+    student_user_ids = list(User.objects.filter(role='student').order_by('id').values_list('id', flat=True))
+    insert(Student, (Student(user_id=user_id) for user_id in student_user_ids))
+    student_ids = list(Student.objects.order_by('id').values_list('id', flat=True))
+
+    insert(Course, (
+        Course(name=f'Course {i}', description=f'Description of course {i}', instructor_id=teacher_ids[i % len(teacher_ids)])
+        for i in range(sizes['courses'])
+    ))
+    rebuild_index()
+    course_ids = list(Course.objects.order_by('id').values_list('id', flat=True))
+    instructors = dict(Course.objects.values_list('id', 'instructor_id'))
+
+    per_student = min(sizes['enrollments_per_student'], len(course_ids))
+    insert(Enrollment, (
+        Enrollment(student_id=student_id, course_id=course_id)
+        for student_id in student_ids
+        for course_id in rng.sample(course_ids, per_student)
+    ))
+    recount_enrollments()
+
+    grade_values = list(GRADE_POINTS)
+
+    def grades():
+        for _ in range(sizes['grades']):
+            course_id = rng.choice(course_ids)
+            yield Grade(
+                student_id=rng.choice(student_ids), course_id=course_id,
+                grade=rng.choice(grade_values), teacher_id=instructors[course_id],
+            )
+
+    def attendance():
+        for _ in range(sizes['attendance']):
+            yield Attendance(student_id=rng.choice(student_ids), course_id=rng.choice(course_ids), status=rng.random() < 0.85)
+
+    def notifications():
+        for i in range(sizes['notifications']):
+            yield Notification(user_id=rng.choice(student_user_ids), message=f'Notification {i}', read=rng.random() < 0.5)
+
+    def request_logs():
+        for _ in range(sizes['request_logs']):
+            yield APIRequestLog(
+                user_id=rng.choice(student_user_ids), endpoint=rng.choice(ENDPOINTS),
+                method='GET', status_code=200,
+            )
+
+    insert(Grade, grades())
+    insert(Attendance, attendance())
+    insert(Notification, notifications())
+    insert(APIRequestLog, request_logs())
+
+    rebuild_all_stats()
+
+    enrolled = set(Enrollment.objects.filter(student_id=student_ids[0]).values_list('course_id', flat=True))
+    return {
+        'admin': admin.id,
+        'teacher': teacher_ids[0],
+        'student_user': student_user_ids[0],
+        'student': student_ids[0],
+        'course': course_ids[0],
+        # Targets of the write benchmarks: a course student0 can still join, students
+        # outside the first course, and one of student0's notifications.
+        'open_course': next((course_id for course_id in course_ids if course_id not in enrolled), course_ids[0]),
+        'cohort': list(
+            Student.objects.exclude(enrollment__course_id=course_ids[0]).order_by('id').values_list('id', flat=True)[:50]
+        ),
+        'notification': Notification.objects.filter(user_id=student_user_ids[0]).values_list('id', flat=True).first(),
+    }
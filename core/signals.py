@@ -0,0 +1,43 @@
+import time
+
+from celery.signals import task_prerun, task_postrun, worker_process_shutdown
+from django.db.backends.signals import connection_created
+from django.dispatch import receiver
+
+from core.metrics import CELERY_TASK_LATENCY, DB_QUERY_LATENCY, registry
+
+_task_started = {}
+
+
+def time_query(execute, sql, params, many, context):
+    started = time.perf_counter()
+    try:
+        return execute(sql, params, many, context)
+    finally:
+        operation = sql.lstrip().split(None, 1)[0].upper() if sql.strip() else 'OTHER'
+        DB_QUERY_LATENCY.observe(time.perf_counter() - started,
+                                 alias=context['connection'].alias, operation=operation)
+
+
+@receiver(connection_created)
+def instrument_connection(sender, connection, **kwargs):
+    # Django reuses the wrapper object across reconnects, so only install once.
+    if time_query not in connection.execute_wrappers:
+        connection.execute_wrappers.append(time_query)
+
+
+@task_prerun.connect
+def start_task_timer(task_id=None, **kwargs):
+    _task_started[task_id] = time.perf_counter()
+
+
+@task_postrun.connect
+def record_task_duration(task_id=None, task=None, state=None, **kwargs):
+    started = _task_started.pop(task_id, None)
+    if started is not None:
+        CELERY_TASK_LATENCY.observe(time.perf_counter() - started, task=task.name, state=state or 'UNKNOWN')
+
+
+@worker_process_shutdown.connect
+def flush_metrics(**kwargs):
+    registry.flush()
@@ -0,0 +1,65 @@
+"""
+Boots a fresh web or Celery worker process in a new interpreter, to time it or
+to see which imports it spends that time on:
+
+    web     django.setup(), the WSGI application and the URLconf (loaded on the first request)
+    worker  the Celery app and every autodiscovered task module
+
+``-X importtime`` does not report modules loaded with importlib.import_module
+(app modules, autodiscovered task modules) themselves, only what they import.
+"""
+import os
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+
+BOOT = {
+    'web': (
+        "import miniproject.wsgi\n"
+        "from django.urls import get_resolver\n"
+        "get_resolver().url_patterns\n"
+    ),
+    'worker': (
+        "from miniproject.celery import app\n"
+        "app.loader.import_default_modules()\n"
+    ),
+}
+
+
+def boot(process, *flags):
+    """Boots ``process`` in a new interpreter and returns the completed process (stderr captured)."""
+    env = {**os.environ, 'PYTHONDONTWRITEBYTECODE': '1'}
+    env.setdefault('DJANGO_SETTINGS_MODULE', 'miniproject.settings')
+    return subprocess.run(
+        [sys.executable, *flags, '-c', BOOT[process]],
+        cwd=ROOT, env=env, capture_output=True, text=True, check=True,
+    )
+
+
+def time_boot(process, repeat):
+    """Wall-clock seconds of ``repeat`` boots of ``process``, interpreter start-up included."""
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        boot(process)
+        timings.append(time.perf_counter() - started)
+    return timings
+
+
+def parse_importtime(output):
+    """Parses ``-X importtime`` output into ``(module, self_us, cumulative_us, depth)`` rows in import order."""
+    rows = []
+    for line in output.splitlines():
+        if not line.startswith('import time:') or 'self [us]' in line:
+            continue
+        self_us, cumulative_us, name = line[len('import time:'):].split('|', 2)
+        depth = (len(name) - len(name.lstrip()) - 1) // 2
+        rows.append((name.strip(), int(self_us), int(cumulative_us), depth))
+    return rows
+
+
+def import_profile(process):
+    return parse_importtime(boot(process, '-X', 'importtime').stderr)
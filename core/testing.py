@@ -0,0 +1,33 @@
+"""
+Test helpers for holding endpoints to a query-count and latency budget, so a
+serializer or view change that reintroduces an N+1 fails the regular suite
+instead of only showing up in the opt-in benchmarks.
+"""
+import time
+from contextlib import contextmanager
+
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+
+class BudgetExceeded(AssertionError):
+    pass
+
+
+@contextmanager
+def query_budget(max_queries, max_ms=None, label='block'):
+    """
+    Fails if the wrapped block runs more than ``max_queries`` SQL queries or, when
+    ``max_ms`` is given, takes longer than that many milliseconds. The captured
+    SQL is included in the failure message to make the offending loop obvious.
+    """
+    with CaptureQueriesContext(connection) as captured:
+        started = time.perf_counter()
+        yield captured
+        elapsed_ms = (time.perf_counter() - started) * 1000
+
+    if len(captured) > max_queries:
+        statements = '\n'.join(query['sql'] for query in captured.captured_queries)
+        raise BudgetExceeded(f"{label}: {len(captured)} queries, budget {max_queries}\n{statements}")
+    if max_ms is not None and elapsed_ms > max_ms:
+        raise BudgetExceeded(f"{label}: {elapsed_ms:.1f}ms, budget {max_ms}ms")
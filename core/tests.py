@@ -0,0 +1,276 @@
+import json
+import logging
+import os
+import time
+from io import StringIO
+from unittest.mock import patch
+import pytest
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from core.seeding import SCALES
+from core.startup import import_profile, parse_importtime
+from core.filters import lookup_field
+from core.idempotency import idempotent
+from core.logging import BackgroundHandler, JSONFormatter, SamplingFilter
+from core.metrics import Registry, key_family
+from rest_framework.response import Response
+from rest_framework.test import APIClient, APIRequestFactory, force_authenticate
+from rest_framework.views import APIView
+from courses.models import Enrollment
+from grades.models import Grade
+from users.models import User
+
+
+def grade_rows():
+    return list(Grade.objects.order_by('id').values_list('student__user__username', 'course__name', 'grade'))
+
+
+@pytest.mark.django_db
+def test_seed_command_creates_scale():
+    out = StringIO()
+    call_command('seed', scale='tiny', grades=50, stdout=out)
+
+    sizes = SCALES['tiny']
+    assert User.objects.filter(role='student').count() == sizes['students']
+    assert Enrollment.objects.count() == sizes['students'] * sizes['enrollments_per_student']
+    assert Grade.objects.count() == 50
+    assert User.objects.get(username='student0').check_password('benchmark')
+    assert "grades: 50" in out.getvalue()
+
+
+@pytest.mark.django_db
+def test_seed_command_is_deterministic():
+    call_command('seed', scale='tiny', seed=7, stdout=StringIO())
+    first = grade_rows()
+
+    with pytest.raises(CommandError):
+        call_command('seed', scale='tiny', seed=7, stdout=StringIO())
+
+    call_command('seed', scale='tiny', seed=7, flush=True, stdout=StringIO())
+    assert grade_rows() == first
+
+
+class Rendered:
+    def __str__(self):
+        return "rendered"
+
+
+def make_record(level=logging.INFO, msg="message %s", args=("arg",), **extra):
+    record = logging.LogRecord('custom_logger', level, __file__, 1, msg, args, None)
+    record.__dict__.update(extra)
+    return record
+
+
+def test_background_handler_writes_json_from_listener_thread():
+    stream = StringIO()
+    target = logging.StreamHandler(stream)
+    target.setFormatter(JSONFormatter())
+    handler = BackgroundHandler(targets=[target])
+
+    handler.handle(make_record(msg="user %s", args=(7,), course=3))
+    handler.handle(make_record(msg="object %s", args=(Rendered(),)))
+    handler.close()
+
+    first, second = [json.loads(line) for line in stream.getvalue().splitlines()]
+    assert first['message'] == "user 7"
+    assert first['course'] == 3
+    assert first['level'] == "INFO"
+    assert second['message'] == "object rendered"
+
+
+@pytest.mark.skipif(not hasattr(os, 'fork'), reason="needs fork")
+def test_background_handler_writes_records_of_forked_children(tmp_path):
+    path = tmp_path / 'app.log'
+    target = logging.FileHandler(path)
+    target.setFormatter(JSONFormatter())
+    handler = BackgroundHandler(targets=[target])
+    # The parent logs first, so its listener thread is running when it forks.
+    handler.handle(make_record(msg="before fork", args=()))
+
+    pid = os.fork()
+    if pid == 0:
+        try:
+            handler.handle(make_record(msg="from child", args=()))
+            handler.close()
+        finally:
+            os._exit(0)
+    os.waitpid(pid, 0)
+    handler.handle(make_record(msg="after fork", args=()))
+    handler.close()
+
+    messages = [json.loads(line)['message'] for line in path.read_text().splitlines()]
+    assert sorted(messages) == ["after fork", "before fork", "from child"]
+
+
+def test_sampling_filter_keeps_warnings_and_opted_out_records():
+    sampler = SamplingFilter(rate=0)
+
+    assert not sampler.filter(make_record())
+    assert sampler.filter(make_record(sample=False))
+    assert sampler.filter(make_record(level=logging.WARNING))
+    assert SamplingFilter(rate=1).filter(make_record())
+
+
+def test_key_family():
+    assert key_family('course_12') == 'course'
+    assert key_family('user_list') == 'user_list'
+    assert key_family('grade_list_3_0cc175b9c0f1b6a831c399e269772661') == 'grade_list'
+
+
+def test_registry_renders_exposition_format():
+    registry = Registry()
+    requests = registry.counter('demo_requests_total', "Demo requests.", ['route'])
+    latency = registry.histogram('demo_seconds', "Demo latency.", ['route'], buckets=(0.1, 1.0))
+
+    requests.inc(route='/a/')
+    requests.inc(route='/a/')
+    latency.observe(0.5, route='/a/')
+
+    lines = registry.render().splitlines()
+    assert '# TYPE demo_requests_total counter' in lines
+    assert 'demo_requests_total{route="/a/"} 2' in lines
+    assert lines[lines.index('# TYPE demo_seconds histogram') + 1:] == [
+        'demo_seconds_bucket{route="/a/",le="0.1"} 0',
+        'demo_seconds_bucket{route="/a/",le="1"} 1',
+        'demo_seconds_bucket{route="/a/",le="+Inf"} 1',
+        'demo_seconds_sum{route="/a/"} 0.5',
+        'demo_seconds_count{route="/a/"} 1',
+    ]
+
+
+def test_registry_flushes_in_the_background(settings):
+    # The local store is only used when the default cache is not Redis.
+    settings.CACHES = {'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'}}
+    settings.METRICS_FLUSH_INTERVAL = 0.01
+    registry = Registry()
+    registry.counter('demo_total', "Demo.").inc()
+
+    deadline = time.monotonic() + 2
+    while not registry.local_store.read() and time.monotonic() < deadline:
+        time.sleep(0.01)
+    assert registry.local_store.read() == {'demo_total': 1}
+
+
+@pytest.mark.django_db
+def test_metrics_endpoint(settings):
+    settings.METRICS_TOKEN = None
+    settings.DEBUG = False
+    user = User.objects.create_user(username="student", email="student@example.com", password="password123", role="student")
+    client = APIClient()
+    client.force_authenticate(user=user)
+    client.get('/api/courses/')
+
+    assert client.get('/metrics').status_code == 403
+    settings.DEBUG = True
+    response = client.get('/metrics')
+
+    assert response.status_code == 200
+    assert response['Content-Type'].startswith('text/plain; version=0.0.4')
+    body = response.content.decode()
+    assert 'http_requests_total{route="/api/courses/",method="GET",status="200"}' in body
+    assert 'http_request_duration_seconds_bucket{route="/api/courses/",method="GET",le="+Inf"}' in body
+    assert 'db_query_duration_seconds_count{alias="default",operation="SELECT"}' in body
+
+    settings.METRICS_TOKEN = 'secret'
+    assert client.get('/metrics').status_code == 401
+    assert client.get('/metrics', HTTP_AUTHORIZATION='Bearer secret').status_code == 200
+
+
+@pytest.mark.django_db
+def test_role_scoped_querysets_filter_in_one_query(django_assert_num_queries):
+    from attendance.models import Attendance
+    from courses.models import Course
+    from students.models import Student
+
+    admin = User.objects.create_user(username="admin", email="admin@example.com", role="admin")
+    teacher = User.objects.create_user(username="teacher", email="teacher@example.com", role="teacher")
+    other_teacher = User.objects.create_user(username="other", email="other@example.com", role="teacher")
+    student = Student.objects.create(user=User.objects.create_user(username="student", email="student@example.com", role="student"))
+    other_student = Student.objects.create(user=User.objects.create_user(username="student2", email="student2@example.com", role="student"))
+    course = Course.objects.create(name="Math", description="", instructor=teacher)
+    other_course = Course.objects.create(name="Art", description="", instructor=other_teacher)
+    mine = Attendance.objects.create(student=student, course=course, status=True)
+    Attendance.objects.create(student=other_student, course=other_course, status=False)
+
+    with django_assert_num_queries(1):
+        assert list(Attendance.objects.for_user(teacher)) == [mine]
+    assert list(Attendance.objects.for_user(student.user)) == [mine]
+    assert Attendance.objects.for_user(admin).count() == 2
+    assert list(Course.objects.for_user(teacher)) == [course]
+    assert not Course.objects.for_user(student.user).exists()
+
+
+@pytest.mark.django_db
+def test_openapi_document_is_generated_once_and_revalidated(settings, tmp_path):
+    settings.OPENAPI_SCHEMA_PATH = tmp_path / 'openapi.json'
+    call_command('generate_openapi', stdout=StringIO())
+    document = json.loads(settings.OPENAPI_SCHEMA_PATH.read_text())
+    assert '/courses/search/' in document['paths']
+
+    client = APIClient()
+    with patch('core.openapi.generate_schema') as generate:
+        response = client.get('/openapi.json')
+        assert response.status_code == 200
+        assert json.loads(response.content) == document
+        assert 'max-age=' in response['Cache-Control']
+        assert client.get('/openapi.json', HTTP_IF_NONE_MATCH=response['ETag']).status_code == 304
+
+        page = client.get('/swagger/')
+        assert page.status_code == 200
+        assert b'/openapi.json' in page.content
+    generate.assert_not_called()
+
+
+@pytest.mark.django_db
+def test_openapi_document_is_served_when_it_cannot_be_written(settings, tmp_path):
+    blocker = tmp_path / 'not-a-directory'
+    blocker.write_text('')
+    settings.OPENAPI_SCHEMA_PATH = blocker / 'openapi.json'
+
+    response = APIClient().get('/openapi.json')
+    assert response.status_code == 200
+    assert '/courses/search/' in json.loads(response.content)['paths']
+    assert not settings.OPENAPI_SCHEMA_PATH.exists()
+
+
+def test_parse_importtime():
+    output = (
+        "import time: self [us] | cumulative | imported package\n"
+        "import time:       120 |        120 |   django.utils\n"
+        "import time:       300 |        420 | django\n"
+    )
+    assert parse_importtime(output) == [('django.utils', 120, 120, 1), ('django', 300, 420, 0)]
+
+
+def test_worker_boot_skips_web_only_modules():
+    modules = {row[0] for row in import_profile('worker')}
+    assert 'courses.enrollment_queue' in modules  # imported by courses.tasks
+    assert not modules & {'miniproject.urls', 'courses.views', 'drf_yasg.generators', 'djoser.views', 'pytest'}
+
+
+@pytest.mark.django_db
+def test_idempotency_key_is_released_after_a_server_error():
+    user = User.objects.create_user(username="teacher", email="teacher@example.com", role="teacher")
+    outcomes = iter([500, 201])
+
+    class View(APIView):
+        @idempotent
+        def post(self, request):
+            return Response({"status": "done"}, status=next(outcomes))
+
+    def post():
+        request = APIRequestFactory().post('/things/', {"a": 1}, format='json', HTTP_IDEMPOTENCY_KEY="key")
+        force_authenticate(request, user=user)
+        return View.as_view()(request)
+
+    assert post().status_code == 500
+    assert post().status_code == 201
+    replayed = post()
+    assert (replayed.status_code, replayed['Idempotent-Replayed']) == (201, 'true')
+
+
+def test_lookup_field_follows_relations_and_skips_lookups():
+    assert lookup_field(Grade, 'grade').name == 'grade'
+    assert lookup_field(Grade, 'date__gte').name == 'date'
+    assert lookup_field(Grade, 'course__is_active__exact').name == 'is_active'
+    assert lookup_field(Grade, 'missing') is None
@@ -0,0 +1,39 @@
+from django.conf import settings
+from django.http import HttpResponse, HttpResponseNotModified
+from django.utils.crypto import constant_time_compare
+from django.views import View
+
+from core.metrics import registry
+from core.openapi import get_schema
+
+EXPOSITION_CONTENT_TYPE = 'text/plain; version=0.0.4; charset=utf-8'
+
+
+class MetricsView(View):
+    """
+    Prometheus scrape target. The scraper must send METRICS_TOKEN as a bearer
+    token; without a token the endpoint is only open while DEBUG is on.
+    """
+
+    def get(self, request):
+        token = getattr(settings, 'METRICS_TOKEN', None)
+        if token is None:
+            if not settings.DEBUG:
+                return HttpResponse(status=403)
+        elif not constant_time_compare(request.headers.get('Authorization', ''), f'Bearer {token}'):
+            return HttpResponse(status=401)
+        return HttpResponse(registry.render(), content_type=EXPOSITION_CONTENT_TYPE)
+
+
+class OpenAPISchemaView(View):
+    """The pre-generated OpenAPI document, revalidated by ETag once OPENAPI_CACHE_TTL has passed."""
+
+    def get(self, request):
+        content, etag = get_schema()
+        headers = {
+            'ETag': etag,
+            'Cache-Control': f"public, max-age={getattr(settings, 'OPENAPI_CACHE_TTL', 3600)}",
+        }
+        if request.headers.get('If-None-Match') == etag:
+            return HttpResponseNotModified(headers=headers)
+        return HttpResponse(content, content_type='application/json', headers=headers)
@@ -0,0 +1,27 @@
+from django.conf import settings
+from django.http import JsonResponse
+from core.async_views import AsyncAPIView
+from core.cache import aget, aset
+from core.logging import logger
+from .models import Course
+from .serializers import CourseSerializer
+
+CACHE_TTL = getattr(settings, 'CACHE_TTL', 300)
+
+
+class AsyncCourseListView(AsyncAPIView):
+    async def get(self, request):
+        logger.info("Fetching course list by %s (async)", request.user.username)
+        cached_courses = await aget('course_list')
+        if cached_courses:
+            logger.info("Course list fetched from cache")
+            return JsonResponse(cached_courses, safe=False)
+
+        courses = [
+            course async for course in
+            Course.objects.filter(is_active=True).select_related('instructor').order_by('name', 'id')
+        ]
+        data = CourseSerializer(courses, many=True).data
+        await aset('course_list', data, timeout=CACHE_TTL)
+        logger.info("Course list fetched from database and cached")
+        return JsonResponse(data, safe=False)
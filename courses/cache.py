@@ -0,0 +1,72 @@
+"""
+Per-process read-through cache of courses as NestedCourseSerializer renders
+them, instructor included. Course rows are tiny and nested in nearly every grade,
+attendance and enrollment payload, so serializers and tasks look them up
+here instead of joining ``courses_course`` and ``users_user``.
+
+Each process keeps one snapshot of the courses it has rendered, tagged with a
+version token shared through the cache. Any write that changes what a course
+renders (the course itself or its instructor) replaces the token once the
+transaction commits, and every process drops its snapshot the next time it
+reads the token: once per serializer, not once per row. ``enrolled_count`` is
+not rendered, so enrollments never replace the token.
+"""
+import threading
+import uuid
+
+from django.core.cache import cache
+from django.db import transaction
+
+COURSE_VERSION_KEY = 'course_version'
+
+_snapshot = (None, {})
+_lock = threading.Lock()
+
+
+def course_version():
+    version = cache.get(COURSE_VERSION_KEY)
+    if version is None:
+        # Never tag a snapshot with "no version": an evicted key would make a stale one look current.
+        cache.add(COURSE_VERSION_KEY, uuid.uuid4().hex, timeout=None)
+        version = cache.get(COURSE_VERSION_KEY)
+    return version
+
+
+def bump_course_version():
+    cache.set(COURSE_VERSION_KEY, uuid.uuid4().hex, timeout=None)
+
+
+def invalidate_courses():
+    """Bumps the course version when the current transaction commits, so no process caches the old rows under the new version."""
+    transaction.on_commit(bump_course_version)
+
+
+class CourseLookup:
+    """Cached courses of the current version. Create one per serializer or task; it reads the version once."""
+
+    def __init__(self):
+        global _snapshot
+        version = course_version()
+        with _lock:
+            if _snapshot[0] != version:
+                _snapshot = (version, {})
+            self.courses = _snapshot[1]
+
+    def get_many(self, course_ids):
+        """Returns ``{course_id: course}`` for the existing courses, loading the uncached ones in one query."""
+        missing = {course_id for course_id in course_ids if course_id not in self.courses}
+        if missing:
+            from courses.models import Course
+            from courses.serializers import NestedCourseSerializer
+
+            loaded = Course.objects.filter(pk__in=missing).select_related('instructor')
+            self.courses.update((course.pk, NestedCourseSerializer(course).data) for course in loaded)
+        return {course_id: self.courses[course_id] for course_id in course_ids if course_id in self.courses}
+
+    def get(self, course_id):
+        return self.get_many([course_id]).get(course_id)
+
+
+def get_course(course_id):
+    """A single cached course, or None if it does not exist."""
+    return CourseLookup().get(course_id)
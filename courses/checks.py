@@ -0,0 +1,14 @@
+from django.core.checks import Error, register
+
+from courses.enrollment_queue import queue_settings, redis_client
+
+
+@register()
+def check_enrollment_queue(app_configs, **kwargs):
+    if queue_settings()['enabled'] and redis_client() is None:
+        return [Error(
+            "ENROLLMENT_QUEUE_ENABLED is on but the default cache is not Redis.",
+            hint="Queued enrollments must be visible to the Celery workers; configure a Redis cache or turn the queue off.",
+            id='courses.E001',
+        )]
+    return []
@@ -0,0 +1,95 @@
+"""
+Enrollment in bulk. A batch locks the courses it touches (in primary key
+order, so concurrent batches cannot deadlock), finds the pairs that already
+exist with one query, inserts the rest with ``bulk_create`` and moves each
+course's ``enrolled_count`` with an ``F()`` update. Seats are handed out in
+request order while the course rows are locked, so a rush of concurrent
+requests can never push a course past its capacity.
+"""
+from collections import Counter
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models import Count, F, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+
+from courses.models import Course, Enrollment
+from courses.signals import gradebook_cache_key
+from students.models import Student
+
+ENROLLMENT_BATCH_SIZE = getattr(settings, 'ENROLLMENT_BATCH_SIZE', 500)
+
+ALREADY_ENROLLED = 'already_enrolled'
+COURSE_FULL = 'course_full'
+COURSE_NOT_FOUND = 'course_not_found'
+STUDENT_NOT_FOUND = 'student_not_found'
+
+SKIP_MESSAGES = {
+    ALREADY_ENROLLED: "The student is already enrolled in this course.",
+    COURSE_FULL: "The course has no free seats left.",
+    COURSE_NOT_FOUND: "Course not found.",
+    STUDENT_NOT_FOUND: "Student not found.",
+}
+
+
+def enroll(pairs):
+    """
+    Enrolls ``(student_id, course_id)`` pairs and returns ``(created, skipped)``:
+    the new Enrollment rows and a ``{'student', 'course', 'reason'}`` entry for
+    each pair that was not enrolled. Repeated pairs in the input count once.
+    """
+    pairs = list(dict.fromkeys(pairs))
+    if not pairs:
+        return [], []
+    student_ids = {student_id for student_id, _ in pairs}
+    course_ids = sorted({course_id for _, course_id in pairs})
+
+    with transaction.atomic():
+        courses = {
+            course.pk: course
+            for course in Course.objects.select_for_update().filter(pk__in=course_ids, is_active=True).order_by('pk')
+        }
+        students = set(Student.objects.filter(pk__in=student_ids).values_list('pk', flat=True))
+        existing = set(
+            Enrollment.objects.filter(student_id__in=student_ids, course_id__in=courses)
+            .values_list('student_id', 'course_id')
+        )
+        seats = {
+            course.pk: None if course.capacity is None else max(course.capacity - course.enrolled_count, 0)
+            for course in courses.values()
+        }
+
+        rows, skipped = [], []
+        for student_id, course_id in pairs:
+            reason = None
+            if course_id not in courses:
+                reason = COURSE_NOT_FOUND
+            elif student_id not in students:
+                reason = STUDENT_NOT_FOUND
+            elif (student_id, course_id) in existing:
+                reason = ALREADY_ENROLLED
+            elif seats[course_id] == 0:
+                reason = COURSE_FULL
+            if reason:
+                skipped.append({'student': student_id, 'course': course_id, 'reason': reason})
+                continue
+            if seats[course_id] is not None:
+                seats[course_id] -= 1
+            rows.append(Enrollment(student_id=student_id, course_id=course_id))
+
+        created = Enrollment.objects.bulk_create(rows, batch_size=ENROLLMENT_BATCH_SIZE)
+        added = Counter(enrollment.course_id for enrollment in created)
+        for course_id, count in added.items():
+            Course.objects.filter(pk=course_id).update(enrolled_count=F('enrolled_count') + count)
+        # bulk_create sends no post_save, so the gradebook signal does not run.
+        transaction.on_commit(lambda: cache.delete_many([gradebook_cache_key(course_id) for course_id in added]))
+
+    return created, skipped
+
+
+def recount_enrollments(courses=None):
+    """Recomputes ``enrolled_count`` from the Enrollment table, for rows written without ``enroll``."""
+    counts = Enrollment.objects.filter(course=OuterRef('pk')).values('course').annotate(total=Count('id')).values('total')
+    courses = Course.objects.all() if courses is None else courses
+    return courses.update(enrolled_count=Coalesce(Subquery(counts), 0))
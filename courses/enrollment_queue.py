@@ -0,0 +1,223 @@
+"""
+Queued enrollment for registration rushes. With ENROLLMENT_QUEUE_ENABLED a
+student's enrollment request is validated, pushed onto a Redis list and
+answered at once with a ticket; a Celery task drains the list in batches
+through courses.enrollment.enroll, so thousands of concurrent requests turn
+into a few bulk inserts instead of queueing on the database write lock.
+Tickets live in the cache and are polled at /api/courses/enrollments/tickets/<id>/.
+
+Items are claimed with LMOVE onto a processing list and only removed from it
+once their tickets are written, so a worker killed mid-batch loses nothing:
+claims older than ENROLLMENT_QUEUE_VISIBILITY_TIMEOUT go back on the queue at
+the start of the next drain. One run handles at most ENROLLMENT_QUEUE_MAX_BATCHES
+batches and schedules another for the rest, staying inside the task time limit.
+The queue must be shared by web and worker processes, so it needs the default
+cache to be Redis; the courses.E001 check enforces that.
+"""
+import json
+import time
+import uuid
+
+from celery.exceptions import SoftTimeLimitExceeded
+from django.conf import settings
+from django.core.cache import cache, caches
+from django.core.exceptions import ImproperlyConfigured
+from django_redis import get_redis_connection
+from django_redis.cache import RedisCache
+
+from core.logging import logger
+from courses.enrollment import SKIP_MESSAGES, enroll
+
+QUEUE_KEY = 'enrollment_queue'
+DRAIN_SCHEDULED_KEY = 'enrollment_queue_scheduled'
+
+PENDING = 'pending'
+ENROLLED = 'enrolled'
+REJECTED = 'rejected'
+FAILED = 'failed'
+
+
+def queue_settings():
+    return {
+        'enabled': getattr(settings, 'ENROLLMENT_QUEUE_ENABLED', False),
+        'batch_size': getattr(settings, 'ENROLLMENT_QUEUE_BATCH_SIZE', 200),
+        'max_batches': getattr(settings, 'ENROLLMENT_QUEUE_MAX_BATCHES', 20),
+        'visibility_timeout': getattr(settings, 'ENROLLMENT_QUEUE_VISIBILITY_TIMEOUT', 5 * 60),
+        'delay': getattr(settings, 'ENROLLMENT_QUEUE_DELAY', 1),
+        'ticket_ttl': getattr(settings, 'ENROLLMENT_TICKET_TTL', 60 * 60),
+    }
+
+
+def ticket_cache_key(ticket_id):
+    return f'enrollment_ticket_{ticket_id}'
+
+
+class RedisQueue:
+    def __init__(self, client, key):
+        self.client = client
+        self.key = key
+        self.processing_key = f'{key}:processing'
+        self.claims_key = f'{key}:claims'
+
+    def push(self, item):
+        self.client.rpush(self.key, json.dumps(item))
+
+    def claim_batch(self, size):
+        """
+        Moves up to ``size`` items onto the processing list and returns them as
+        ``(raw, item)`` pairs. LMOVE is atomic, so concurrent workers never take
+        the same item; each claim is timestamped for requeue_stale.
+        """
+        pipeline = self.client.pipeline(transaction=False)
+        for _ in range(size):
+            pipeline.lmove(self.key, self.processing_key, 'LEFT', 'RIGHT')
+        raws = [raw for raw in pipeline.execute() if raw is not None]
+        if raws:
+            now = time.time()
+            self.client.hset(self.claims_key, mapping={raw: now for raw in raws})
+        return [(raw, json.loads(raw)) for raw in raws]
+
+    def ack(self, raws):
+        """Forgets claimed items whose tickets are written."""
+        pipeline = self.client.pipeline(transaction=False)
+        for raw in raws:
+            pipeline.lrem(self.processing_key, 1, raw)
+        pipeline.hdel(self.claims_key, *raws)
+        pipeline.execute()
+
+    def release(self, raws):
+        """Puts claimed items back at the head of the queue, in their original order."""
+        for raw in reversed(raws):
+            self._requeue(raw)
+
+    def requeue_stale(self, timeout):
+        """Puts back items claimed more than ``timeout`` seconds ago by a worker that never acked them."""
+        claims = self.client.hgetall(self.claims_key)
+        now = time.time()
+        stale = []
+        for raw in self.client.lrange(self.processing_key, 0, -1):
+            if raw not in claims:
+                # Moved but not yet timestamped (or its worker died in between): start its clock now.
+                self.client.hsetnx(self.claims_key, raw, now)
+            elif float(claims[raw]) < now - timeout:
+                stale.append(raw)
+        return sum(self._requeue(raw) for raw in reversed(stale))
+
+    def _requeue(self, raw):
+        # Only the worker whose LREM removed the item pushes it back, so it is never queued twice.
+        if not self.client.lrem(self.processing_key, 1, raw):
+            return 0
+        pipeline = self.client.pipeline(transaction=False)
+        pipeline.lpush(self.key, raw)
+        pipeline.hdel(self.claims_key, raw)
+        pipeline.execute()
+        return 1
+
+    def __len__(self):
+        return self.client.llen(self.key)
+
+
+def redis_client():
+    """The Redis connection behind the default cache, or None when the cache is not Redis."""
+    if isinstance(caches['default'], RedisCache):
+        return get_redis_connection('default')
+    return None
+
+
+def get_queue():
+    client = redis_client()
+    if client is None:
+        raise ImproperlyConfigured("ENROLLMENT_QUEUE_ENABLED needs the default cache to be Redis.")
+    return RedisQueue(client, cache.make_key(QUEUE_KEY))
+
+
+def submit(user, student_id, course_id):
+    """Queues one enrollment and returns its pending ticket."""
+    config = queue_settings()
+    ticket = {
+        'id': uuid.uuid4().hex, 'status': PENDING, 'user': user.id,
+        'student': student_id, 'course': course_id, 'enrollment': None, 'reason': None, 'error': None,
+    }
+    cache.set(ticket_cache_key(ticket['id']), ticket, timeout=config['ticket_ttl'])
+    get_queue().push({'ticket': ticket['id'], 'user': user.id, 'student': student_id, 'course': course_id})
+    schedule_drain(config['delay'])
+    return ticket
+
+
+def schedule_drain(delay):
+    """Schedules one drain per ``delay`` window however many requests arrive in it."""
+    from courses.tasks import process_enrollment_queue
+
+    if cache.add(DRAIN_SCHEDULED_KEY, 1, timeout=delay):
+        process_enrollment_queue.apply_async(countdown=delay)
+
+
+def get_ticket(ticket_id):
+    return cache.get(ticket_cache_key(ticket_id))
+
+
+def drain(batch_size=None, max_batches=None):
+    """
+    Enrolls queued requests batch by batch, at most ``max_batches`` of them, and
+    schedules another run if requests are left; returns how many were handled.
+    """
+    if redis_client() is None:
+        return 0
+    config = queue_settings()
+    batch_size = batch_size or config['batch_size']
+    max_batches = max_batches or config['max_batches']
+    # Cleared before reading so a request queued from here on schedules another drain.
+    cache.delete(DRAIN_SCHEDULED_KEY)
+    queue = get_queue()
+    requeued = queue.requeue_stale(config['visibility_timeout'])
+    if requeued:
+        logger.warning("Requeued %d enrollment requests abandoned by a worker", requeued)
+    handled = 0
+    for _ in range(max_batches):
+        claimed = queue.claim_batch(batch_size)
+        if not claimed:
+            return handled
+        raws = [raw for raw, _ in claimed]
+        try:
+            process_batch([item for _, item in claimed], config['ticket_ttl'])
+        except SoftTimeLimitExceeded:
+            queue.release(raws)
+            schedule_drain(config['delay'])
+            raise
+        queue.ack(raws)
+        handled += len(claimed)
+    if len(queue):
+        schedule_drain(config['delay'])
+    return handled
+
+
+def process_batch(items, ticket_ttl):
+    keys = [ticket_cache_key(item['ticket']) for item in items]
+    tickets = cache.get_many(keys)
+    try:
+        created, skipped = enroll([(item['student'], item['course']) for item in items])
+    except SoftTimeLimitExceeded:
+        raise
+    except Exception as e:
+        logger.error("Error enrolling a queued batch of %d: %s", len(items), e)
+        created, skipped = [], None
+    enrollments = {(enrollment.student_id, enrollment.course_id): enrollment.pk for enrollment in created}
+    reasons = {(skip['student'], skip['course']): skip['reason'] for skip in skipped or []}
+
+    updates = {}
+    for key, item in zip(keys, items):
+        ticket = tickets.get(key) or {'id': item['ticket'], 'user': item['user'], 'student': item['student'], 'course': item['course']}
+        pair = (item['student'], item['course'])
+        if pair in enrollments:
+            ticket.update(status=ENROLLED, enrollment=enrollments[pair], reason=None, error=None)
+        elif skipped is None:
+            ticket.update(status=FAILED, enrollment=None, reason=None, error="The enrollment could not be processed, please try again.")
+        else:
+            reason = reasons[pair]
+            ticket.update(status=REJECTED, enrollment=None, reason=reason, error=SKIP_MESSAGES[reason])
+        updates[key] = ticket
+    cache.set_many(updates, timeout=ticket_ttl)
+
+
+def queue_length():
+    return len(get_queue()) if redis_client() is not None else 0
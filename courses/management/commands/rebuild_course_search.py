@@ -0,0 +1,18 @@
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+
+from courses.models import Course
+from courses.search import get_backend, rebuild_index
+
+
+class Command(BaseCommand):
+    help = (
+        "Rebuilds the course full-text search index from courses_course. Run it after courses were "
+        "written without signals, e.g. with bulk_create or update()."
+    )
+
+    def handle(self, *args, **options):
+        if get_backend() is None:
+            raise CommandError(f"Course search is not available on {connection.vendor}.")
+        rebuild_index()
+        self.stdout.write(self.style.SUCCESS(f"Indexed {Course.objects.count():,} courses."))
@@ -0,0 +1,44 @@
+# Generated by Django 5.1.3 on 2026-10-19 15:43
+
+from django.db import migrations, models
+from django.db.models import Count, Min, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+
+
+def deduplicate_and_count_enrollments(apps, schema_editor):
+    Course = apps.get_model('courses', 'Course')
+    Enrollment = apps.get_model('courses', 'Enrollment')
+    duplicates = (
+        Enrollment.objects.values('student_id', 'course_id')
+        .annotate(keep=Min('id'), rows=Count('id')).filter(rows__gt=1)
+    )
+    for row in duplicates:
+        Enrollment.objects.filter(student_id=row['student_id'], course_id=row['course_id']).exclude(pk=row['keep']).delete()
+    counts = Enrollment.objects.filter(course=OuterRef('pk')).values('course').annotate(total=Count('id')).values('total')
+    Course.objects.update(enrolled_count=Coalesce(Subquery(counts), 0))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('courses', '0004_course_course_active_name_idx'),
+        ('students', '0003_alter_student_options'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='course',
+            name='capacity',
+            field=models.PositiveIntegerField(blank=True, help_text='Maximum number of enrolled students; empty for no limit', null=True),
+        ),
+        migrations.AddField(
+            model_name='course',
+            name='enrolled_count',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.RunPython(deduplicate_and_count_enrollments, migrations.RunPython.noop),
+        migrations.AddConstraint(
+            model_name='enrollment',
+            constraint=models.UniqueConstraint(fields=('student', 'course'), name='enrollment_student_course_uniq'),
+        ),
+    ]
@@ -0,0 +1,43 @@
+from django.db import migrations
+
+# The DDL is written out here rather than taken from courses.search, so later
+# changes to the live backends cannot change what this migration creates.
+CREATE = {
+    'sqlite': [
+        "CREATE VIRTUAL TABLE IF NOT EXISTS courses_course_search USING fts5(name, description, tokenize='porter unicode61')",
+        "DELETE FROM courses_course_search",
+        "INSERT INTO courses_course_search (rowid, name, description) SELECT id, name, description FROM courses_course",
+    ],
+    'postgresql': [
+        "CREATE TABLE IF NOT EXISTS courses_course_search ("
+        "course_id bigint PRIMARY KEY REFERENCES courses_course (id) ON DELETE CASCADE, document tsvector NOT NULL)",
+        "CREATE INDEX IF NOT EXISTS courses_course_search_document_idx ON courses_course_search USING GIN (document)",
+        "DELETE FROM courses_course_search",
+        "INSERT INTO courses_course_search (course_id, document) SELECT id, "
+        "setweight(to_tsvector('english', name), 'A') || setweight(to_tsvector('english', description), 'B') "
+        "FROM courses_course",
+    ],
+}
+
+DROP = "DROP TABLE IF EXISTS courses_course_search"
+
+
+def create_search_index(apps, schema_editor):
+    for statement in CREATE.get(schema_editor.connection.vendor, []):
+        schema_editor.execute(statement)
+
+
+def drop_search_index(apps, schema_editor):
+    if schema_editor.connection.vendor in CREATE:
+        schema_editor.execute(DROP)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('courses', '0005_course_capacity'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_search_index, drop_search_index),
+    ]
@@ -1,12 +1,29 @@
 from django.db import models
 from users.models import User
 from students.models import Student
+from core.scoping import RoleScopedQuerySet
+
+class CourseQuerySet(RoleScopedQuerySet):
+    teacher_lookup = 'instructor'
+
+class EnrollmentQuerySet(RoleScopedQuerySet):
+    teacher_lookup = 'course__instructor'
+    student_lookup = 'student__user'
 
 class Course(models.Model):
     name = models.CharField(max_length=100)
     description = models.TextField()
     instructor = models.ForeignKey(User, on_delete=models.CASCADE, limit_choices_to={'role': 'teacher'})
     is_active = models.BooleanField(default=True)
+    capacity = models.PositiveIntegerField(null=True, blank=True, help_text="Maximum number of enrolled students; empty for no limit")
+    enrolled_count = models.PositiveIntegerField(default=0, editable=False)
+
+    objects = CourseQuerySet.as_manager()
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['is_active', 'name'], name='course_active_name_idx'),
+        ]
 
     def __str__(self):
         return self.name
@@ -14,4 +31,11 @@ class Course(models.Model):
 class Enrollment(models.Model):
     student = models.ForeignKey(Student, on_delete=models.CASCADE)
     course = models.ForeignKey(Course, on_delete=models.CASCADE)
-    enrollment_date = models.DateField(auto_now_add=True)
\ No newline at end of file
+    enrollment_date = models.DateField(auto_now_add=True)
+
+    objects = EnrollmentQuerySet.as_manager()
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['student', 'course'], name='enrollment_student_course_uniq'),
+        ]
@@ -0,0 +1,151 @@
+"""
+Full-text search over course names and descriptions. The index is a side
+table maintained next to ``courses_course``: an FTS5 virtual table on SQLite
+and a ``tsvector`` column with a GIN index on PostgreSQL. Signals in
+courses.signals keep it in step with every course save and delete; rows
+written without signals (``bulk_create``, ``update()``) need
+``rebuild_index()``, which ``manage.py rebuild_course_search`` runs.
+Names weigh more than descriptions in the ranking, and only active courses
+are returned.
+"""
+import re
+
+from django.db import connection
+
+TABLE = 'courses_course_search'
+TERM = re.compile(r'\w+')
+
+
+class SQLiteSearchBackend:
+    def create(self, cursor):
+        cursor.execute(
+            f"CREATE VIRTUAL TABLE IF NOT EXISTS {TABLE} USING fts5(name, description, tokenize='porter unicode61')"
+        )
+
+    def drop(self, cursor):
+        cursor.execute(f"DROP TABLE IF EXISTS {TABLE}")
+
+    def index(self, cursor, course_id, name, description):
+        cursor.execute(f"DELETE FROM {TABLE} WHERE rowid = %s", [course_id])
+        cursor.execute(f"INSERT INTO {TABLE} (rowid, name, description) VALUES (%s, %s, %s)", [course_id, name, description])
+
+    def remove(self, cursor, course_id):
+        cursor.execute(f"DELETE FROM {TABLE} WHERE rowid = %s", [course_id])
+
+    def rebuild(self, cursor):
+        cursor.execute(f"DELETE FROM {TABLE}")
+        cursor.execute(f"INSERT INTO {TABLE} (rowid, name, description) SELECT id, name, description FROM courses_course")
+
+    def match(self, query):
+        # Every term must appear; each is quoted so user input is never read as FTS5 syntax,
+        # and matched as a prefix so partial words still find the course.
+        return ' '.join(f'"{term}"*' for term in TERM.findall(query))
+
+    def search(self, cursor, query, limit, offset):
+        match = self.match(query)
+        where = (
+            f"FROM {TABLE} JOIN courses_course c ON c.id = {TABLE}.rowid "
+            f"WHERE {TABLE} MATCH %s AND c.is_active"
+        )
+        cursor.execute(f"SELECT COUNT(*) {where}", [match])
+        total = cursor.fetchone()[0]
+        # bm25 is lower for better matches; column weights favour the name.
+        cursor.execute(
+            f"SELECT c.id {where} ORDER BY bm25({TABLE}, 10.0, 1.0), c.id LIMIT %s OFFSET %s",
+            [match, limit, offset],
+        )
+        return [row[0] for row in cursor.fetchall()], total
+
+
+class PostgresSearchBackend:
+    DOCUMENT = "setweight(to_tsvector('english', {name}), 'A') || setweight(to_tsvector('english', {description}), 'B')"
+
+    def create(self, cursor):
+        cursor.execute(
+            f"CREATE TABLE IF NOT EXISTS {TABLE} ("
+            f"course_id bigint PRIMARY KEY REFERENCES courses_course (id) ON DELETE CASCADE, document tsvector NOT NULL)"
+        )
+        cursor.execute(f"CREATE INDEX IF NOT EXISTS {TABLE}_document_idx ON {TABLE} USING GIN (document)")
+
+    def drop(self, cursor):
+        cursor.execute(f"DROP TABLE IF EXISTS {TABLE}")
+
+    def index(self, cursor, course_id, name, description):
+        document = self.DOCUMENT.format(name='%s', description='%s')
+        cursor.execute(
+            f"INSERT INTO {TABLE} (course_id, document) VALUES (%s, {document}) "
+            f"ON CONFLICT (course_id) DO UPDATE SET document = EXCLUDED.document",
+            [course_id, name, description],
+        )
+
+    def remove(self, cursor, course_id):
+        cursor.execute(f"DELETE FROM {TABLE} WHERE course_id = %s", [course_id])
+
+    def rebuild(self, cursor):
+        cursor.execute(f"DELETE FROM {TABLE}")
+        document = self.DOCUMENT.format(name='name', description='description')
+        cursor.execute(f"INSERT INTO {TABLE} (course_id, document) SELECT id, {document} FROM courses_course")
+
+    def match(self, query):
+        # Same semantics as SQLite: every term must appear, each as a prefix. Terms are
+        # \w+ runs, so nothing the user types can reach the tsquery operators.
+        return ' & '.join(f'{term}:*' for term in TERM.findall(query))
+
+    def search(self, cursor, query, limit, offset):
+        match = self.match(query)
+        where = (
+            f"FROM {TABLE} s JOIN courses_course c ON c.id = s.course_id, to_tsquery('english', %s) q "
+            f"WHERE s.document @@ q AND c.is_active"
+        )
+        cursor.execute(f"SELECT COUNT(*) {where}", [match])
+        total = cursor.fetchone()[0]
+        cursor.execute(
+            f"SELECT c.id {where} ORDER BY ts_rank_cd(s.document, q) DESC, c.id LIMIT %s OFFSET %s",
+            [match, limit, offset],
+        )
+        return [row[0] for row in cursor.fetchall()], total
+
+
+BACKENDS = {
+    'sqlite': SQLiteSearchBackend,
+    'postgresql': PostgresSearchBackend,
+}
+
+
+def get_backend(vendor=None):
+    """The search backend for a database vendor, or None where course search is not supported."""
+    backend = BACKENDS.get(vendor or connection.vendor)
+    return backend() if backend else None
+
+
+def index_course(course):
+    backend = get_backend()
+    if backend:
+        with connection.cursor() as cursor:
+            backend.index(cursor, course.pk, course.name, course.description)
+
+
+def remove_course(course_id):
+    backend = get_backend()
+    if backend:
+        with connection.cursor() as cursor:
+            backend.remove(cursor, course_id)
+
+
+def rebuild_index():
+    backend = get_backend()
+    if backend:
+        with connection.cursor() as cursor:
+            backend.rebuild(cursor)
+
+
+def search_courses(query, limit, offset=0):
+    """
+    Returns the IDs of the active courses matching ``query``, best first, and the
+    total number of matches. Nothing matches where ``get_backend()`` is None.
+    """
+    backend = get_backend()
+    if backend is None or not TERM.search(query):
+        return [], 0
+    with connection.cursor() as cursor:
+        return backend.search(cursor, query, limit, offset)
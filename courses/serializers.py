@@ -1,21 +1,111 @@
 from students.serializers import StudentSerializer
+from courses.cache import CourseLookup
 from courses.models import Course
 from users.serializers import CustomUserSerializer
 from rest_framework import serializers
 from courses.models import Enrollment
+from grades.models import Grade
+from attendance.models import Attendance
 
 class CourseSerializer(serializers.ModelSerializer):
     instructor = CustomUserSerializer()
 
     class Meta:
         model = Course
-        fields = ['id', 'name', 'description', 'instructor']
+        fields = ['id', 'name', 'description', 'instructor', 'capacity', 'enrolled_count']
+        read_only_fields = ['enrolled_count']
+
+class NestedCourseSerializer(CourseSerializer):
+    """A course nested in another payload: ``enrolled_count`` is left out so enrollments do not invalidate the course cache."""
+
+    class Meta(CourseSerializer.Meta):
+        fields = ['id', 'name', 'description', 'instructor', 'capacity']
+
+class CachedCourseField(serializers.Field):
+    """
+    A read-only course rendered like NestedCourseSerializer, taken from the
+    course cache instead of a join. In a list, the courses of every row are
+    looked up together on first use.
+    """
+
+    def __init__(self, **kwargs):
+        kwargs.setdefault('source', 'course_id')
+        kwargs['read_only'] = True
+        super().__init__(**kwargs)
+        self._lookup = None
+
+    def to_representation(self, course_id):
+        if self._lookup is None:
+            self._lookup = CourseLookup()
+            if isinstance(self.root, serializers.ListSerializer) and self.root.instance is not None:
+                self._lookup.get_many({row.course_id for row in self.root.instance})
+        return self._lookup.get(course_id)
+
 
 class EnrollmentSerializer(serializers.ModelSerializer):
     student = StudentSerializer()
-    course = CourseSerializer()
+    course = CachedCourseField()
 
     class Meta:
         model = Enrollment
         fields = ['id', 'student', 'course', 'enrollment_date']
         read_only_fields = ['enrollment_date']
+
+
+class EnrollmentCreateSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = Enrollment
+        fields = ['id', 'student', 'course', 'enrollment_date']
+        read_only_fields = ['enrollment_date']
+        # Uniqueness is checked by courses.enrollment while the course row is locked.
+        validators = []
+
+
+class EnrollmentBatchSerializer(serializers.Serializer):
+    course = serializers.IntegerField(required=False, help_text="Course to enroll the students in (administrators and teachers)")
+    students = serializers.ListField(child=serializers.IntegerField(), required=False, allow_empty=False, help_text="Student IDs to enroll in the course")
+    courses = serializers.ListField(child=serializers.IntegerField(), required=False, allow_empty=False, help_text="Course IDs to enroll in (students)")
+
+    def validate(self, attrs):
+        limit = self.context['limit']
+        if len(attrs.get('students', [])) > limit or len(attrs.get('courses', [])) > limit:
+            raise serializers.ValidationError(f"A batch can enroll at most {limit} students or courses.")
+        return attrs
+
+
+class EnrollmentSkipSerializer(serializers.Serializer):
+    student = serializers.IntegerField()
+    course = serializers.IntegerField()
+    reason = serializers.CharField()
+
+
+class EnrollmentBatchResultSerializer(serializers.Serializer):
+    enrolled = EnrollmentCreateSerializer(many=True)
+    skipped = EnrollmentSkipSerializer(many=True)
+
+
+class EnrollmentTicketSerializer(serializers.Serializer):
+    id = serializers.CharField()
+    status = serializers.ChoiceField(choices=['pending', 'enrolled', 'rejected', 'failed'])
+    student = serializers.IntegerField()
+    course = serializers.IntegerField()
+    enrollment = serializers.IntegerField(allow_null=True, help_text="ID of the enrollment once the ticket is enrolled")
+    reason = serializers.CharField(allow_null=True)
+    error = serializers.CharField(allow_null=True)
+
+
+class GradebookGradeSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = Grade
+        fields = ['id', 'student', 'grade', 'comment', 'date', 'teacher']
+
+
+class GradebookAttendanceSerializer(serializers.ModelSerializer):
+    status_label = serializers.SerializerMethodField()
+
+    class Meta:
+        model = Attendance
+        fields = ['id', 'student', 'date', 'status', 'status_label']
+
+    def get_status_label(self, obj):
+        return "Present" if obj.status else "Absent"
@@ -0,0 +1,86 @@
+from django.core.cache import cache
+from django.db.models import F
+from django.db.models.signals import post_delete, post_save, pre_save
+from django.dispatch import receiver
+from attendance.models import Attendance
+from courses.cache import invalidate_courses
+from courses.models import Course, Enrollment
+from courses.search import index_course, remove_course
+from grades.models import Grade
+from users.models import User
+
+
+def gradebook_cache_key(course_id):
+    return f'course_gradebook_{course_id}'
+
+
+@receiver(pre_save, sender=Grade)
+@receiver(pre_save, sender=Attendance)
+@receiver(pre_save, sender=Enrollment)
+def remember_previous_pair(sender, instance, **kwargs):
+    """
+    Stores the row's saved (student_id, course_id) on the instance, or None for
+    a new row, so the gradebook and the analytics summaries can both clean up
+    after a row that moved without each selecting the old row again.
+    """
+    instance._previous_pair = None
+    if not instance._state.adding:
+        instance._previous_pair = sender.objects.filter(pk=instance.pk).values_list('student_id', 'course_id').first()
+
+
+def previous_pair(instance):
+    return instance.__dict__.get('_previous_pair')
+
+
+@receiver(post_save, sender=Grade)
+@receiver(post_save, sender=Attendance)
+@receiver(post_save, sender=Enrollment)
+@receiver(post_delete, sender=Grade)
+@receiver(post_delete, sender=Attendance)
+@receiver(post_delete, sender=Enrollment)
+def invalidate_gradebook(sender, instance, **kwargs):
+    # A row moved to another course must also leave the old course's gradebook.
+    previous = previous_pair(instance)
+    course_ids = {instance.course_id, previous and previous[1]} - {None}
+    cache.delete_many([gradebook_cache_key(course_id) for course_id in course_ids])
+
+
+@receiver(post_save, sender=Course)
+@receiver(post_delete, sender=Course)
+def invalidate_course_gradebook(sender, instance, **kwargs):
+    cache.delete(gradebook_cache_key(instance.pk))
+
+
+@receiver(post_save, sender=Enrollment)
+def count_enrollment(sender, instance, created, **kwargs):
+    if created:
+        Course.objects.filter(pk=instance.course_id).update(enrolled_count=F('enrolled_count') + 1)
+
+
+@receiver(post_delete, sender=Enrollment)
+def uncount_enrollment(sender, instance, **kwargs):
+    Course.objects.filter(pk=instance.course_id, enrolled_count__gt=0).update(enrolled_count=F('enrolled_count') - 1)
+
+
+@receiver(post_save, sender=Course)
+@receiver(post_delete, sender=Course)
+def invalidate_cached_courses(sender, **kwargs):
+    invalidate_courses()
+
+
+@receiver(post_save, sender=User)
+def invalidate_instructor_courses(sender, instance, update_fields=None, **kwargs):
+    # Cached courses embed their instructor; logins only touch last_login.
+    if instance.role == 'teacher' and (update_fields is None or set(update_fields) - {'last_login'}):
+        invalidate_courses()
+
+
+@receiver(post_save, sender=Course)
+def index_course_for_search(sender, instance, update_fields=None, **kwargs):
+    if update_fields is None or {'name', 'description'} & set(update_fields):
+        index_course(instance)
+
+
+@receiver(post_delete, sender=Course)
+def remove_course_from_search(sender, instance, **kwargs):
+    remove_course(instance.pk)
@@ -1,19 +1,45 @@
 from celery import shared_task
+from celery.exceptions import SoftTimeLimitExceeded
 from core.logging import logger
-from django.core.mail import send_mail
+from django.core.mail import get_connection, send_mail
+from courses.enrollment_queue import drain
+from courses.cache import get_course
+from students.models import Student
 
-@shared_task
-def notify_students_about_new_course(course_name, student_emails):
+EMAIL_BATCH_SIZE = 1000
+
+@shared_task(soft_time_limit=30 * 60, time_limit=35 * 60)
+def notify_students_about_new_course(course_id):
+    course = get_course(course_id)
+    if course is None:
+        logger.warning("Course %s no longer exists, skipping notification", course_id)
+        return
+    course_name = course['name']
+    try:
+        logger.info("Notifying students about new course: %s", course_name)
+        emails = Student.objects.order_by('id').values_list('user__email', flat=True)
+        with get_connection() as connection:
+            for email in emails.iterator(chunk_size=EMAIL_BATCH_SIZE):
+                send_mail(
+                    'New Course Available',
+                    f'A new course "{course_name}" has been added.',
+                    'admin@example.com',
+                    [email],
+                    fail_silently=False,
+                    connection=connection,
+                )
+        logger.info("Notification sent to all students about course: %s", course_name)
+    except SoftTimeLimitExceeded:
+        raise
+    except Exception as e:
+        logger.error("Error notifying students about new course %s: %s", course_name, e)
+
+
+@shared_task(acks_late=True, reject_on_worker_lost=True)
+def process_enrollment_queue():
     try:
-        logger.info(f"Notifying students about new course: {course_name}")
-        for email in student_emails:
-            send_mail(
-                'New Course Available',
-                f'A new course "{course_name}" has been added.',
-                'admin@example.com',
-                [email],
-                fail_silently=False,
-            )
-        logger.info(f"Notification sent to all students about course: {course_name}")
+        handled = drain()
+        if handled:
+            logger.info("Processed %s queued enrollments", handled)
     except Exception as e:
-        logger.error(f"Error notifying students about new course {course_name}: {e}")
+        logger.error("Error processing the enrollment queue: %s", e)
@@ -1,8 +1,22 @@
+import time
 import pytest
+from unittest.mock import patch
+from celery.exceptions import SoftTimeLimitExceeded
+from django.core.exceptions import ImproperlyConfigured
+from miniproject.celery import app as celery_app
+from courses.tasks import notify_students_about_new_course
+from courses.cache import course_version, get_course
+from courses.enrollment import enroll
+from courses.checks import check_enrollment_queue
+from courses.enrollment_queue import drain, get_queue, get_ticket, submit
+from courses.search import PostgresSearchBackend
 from rest_framework.test import APIClient
 from users.models import User
 from students.models import Student
-from courses.models import Course
+from courses.models import Course, Enrollment
+from grades.models import Grade
+from attendance.models import Attendance
+from core.testing import query_budget
 
 @pytest.mark.django_db
 def test_teacher_create_course():
@@ -40,6 +54,358 @@ def test_student_enroll_in_course():
     client = APIClient()
     client.force_authenticate(user=student_user)
 
-    response = client.post('/api/enrollments/', {"student": student.id, "course": course.id}, format='json')
+    response = client.post('/api/courses/enrollments/', {"student": student.id, "course": course.id}, format='json')
     assert response.status_code == 201
     assert response.data['course'] == course.id
+    course.refresh_from_db()
+    assert course.enrolled_count == 1
+
+    response = client.post('/api/courses/enrollments/', {"student": student.id, "course": course.id}, format='json')
+    assert response.status_code == 400
+
+
+@pytest.mark.django_db
+def test_course_list_search_and_ordering():
+    teacher = User.objects.create_user(username="teacher", email="teacher@example.com", password="password123", role="teacher")
+    Course.objects.create(name="Physics 101", description="Intro Physics", instructor=teacher)
+    Course.objects.create(name="Advanced Physics", description="Physics II", instructor=teacher)
+    Course.objects.create(name="Biology 101", description="Intro Biology", instructor=teacher)
+    Course.objects.create(name="Physics Archive", description="Old", instructor=teacher, is_active=False)
+
+    client = APIClient()
+    client.force_authenticate(user=teacher)
+
+    response = client.get('/api/courses/', {"search": "physics"})
+    assert response.status_code == 200
+    assert [c['name'] for c in response.data] == ["Advanced Physics", "Physics 101"]
+
+    response = client.get('/api/courses/', {"search": "physics", "ordering": "-name"})
+    assert [c['name'] for c in response.data] == ["Physics 101", "Advanced Physics"]
+
+
+@pytest.mark.django_db
+def test_course_gradebook(django_assert_max_num_queries):
+    teacher = User.objects.create_user(username="teacher", email="teacher@example.com", password="password123", role="teacher")
+    other_teacher = User.objects.create_user(username="other", email="other@example.com", password="password123", role="teacher")
+    course = Course.objects.create(name="Physics 101", description="Intro Physics", instructor=teacher)
+    students = []
+    for i in range(3):
+        user = User.objects.create_user(username=f"student{i}", email=f"student{i}@example.com", password="password123")
+        student = Student.objects.create(user=user)
+        Enrollment.objects.create(student=student, course=course)
+        Grade.objects.create(student=student, course=course, grade="A", teacher=teacher)
+        Attendance.objects.create(student=student, course=course, status=bool(i))
+        students.append(student)
+
+    client = APIClient()
+    client.force_authenticate(user=teacher)
+    with django_assert_max_num_queries(5):
+        response = client.get(f'/api/courses/{course.id}/gradebook/')
+    assert response.status_code == 200
+    assert len(response.data['students']) == 3
+    assert response.data['students'][0]['grades'][0]['grade'] == "A"
+    assert response.data['students'][0]['attendance'][0]['status_label'] == "Absent"
+
+    Grade.objects.create(student=students[0], course=course, grade="B", teacher=teacher)
+    response = client.get(f'/api/courses/{course.id}/gradebook/')
+    assert len(response.data['students'][0]['grades']) == 2
+
+    other_course = Course.objects.create(name="Physics 102", description="More Physics", instructor=teacher)
+    grade = Grade.objects.filter(student=students[0], grade="B").get()
+    grade.course = other_course
+    grade.save()
+    response = client.get(f'/api/courses/{course.id}/gradebook/')
+    assert len(response.data['students'][0]['grades']) == 1
+
+    client.force_authenticate(user=other_teacher)
+    response = client.get(f'/api/courses/{course.id}/gradebook/')
+    assert response.status_code == 403
+
+
+def test_course_fan_out_is_routed_away_from_transactional_queue():
+    bulk = celery_app.amqp.router.route({}, 'courses.tasks.notify_students_about_new_course')
+    absence = celery_app.amqp.router.route({}, 'attendance.tasks.notify_student_about_absence')
+
+    assert bulk['queue'].name == 'bulk'
+    assert absence['queue'].name == 'transactional'
+    assert absence['priority'] < bulk['priority']
+
+
+@pytest.mark.django_db
+def test_notify_students_about_new_course_task():
+    teacher = User.objects.create_user(username="teacher", email="teacher@example.com", password="password123", role="teacher")
+    for i in range(3):
+        Student.objects.create(user=User.objects.create_user(username=f"s{i}", email=f"s{i}@example.com", password="password123"))
+    course = Course.objects.create(name="Physics 101", description="Intro Physics", instructor=teacher)
+
+    with patch("courses.tasks.send_mail") as mock_send_mail:
+        notify_students_about_new_course(course.id)
+
+    assert mock_send_mail.call_count == 3
+    assert {c.args[3][0] for c in mock_send_mail.call_args_list} == {"s0@example.com", "s1@example.com", "s2@example.com"}
+
+
+@pytest.mark.django_db
+@pytest.mark.parametrize('role, path, max_queries', [
+    ('student_user', '/api/courses/', 2),
+    ('teacher', '/api/courses/{course}/', 2),
+    ('admin', '/api/courses/enrollments/', 2),
+    ('teacher', '/api/courses/{course}/gradebook/', 5),
+])
+def test_course_endpoints_query_budget(seeded_data, warm_course_cache, role, path, max_queries):
+    client = APIClient()
+    client.force_authenticate(user=User.objects.get(pk=seeded_data[role]))
+    warm_course_cache()
+
+    with query_budget(max_queries, max_ms=500, label=path):
+        response = client.get(path.format(**seeded_data))
+
+    assert response.status_code == 200
+
+
+@pytest.mark.django_db
+def test_only_instructor_can_change_course():
+    teacher = User.objects.create_user(username="teacher", email="teacher@example.com", password="password123", role="teacher")
+    other_teacher = User.objects.create_user(username="other", email="other@example.com", password="password123", role="teacher")
+    student = User.objects.create_user(username="student", email="student@example.com", password="password123", role="student")
+    course = Course.objects.create(name="Math 101", description="Algebra", instructor=teacher)
+
+    client = APIClient()
+    client.force_authenticate(user=other_teacher)
+    assert client.get(f'/api/courses/{course.id}/').status_code == 200
+    response = client.put(f'/api/courses/{course.id}/', {"name": "Hijacked"}, format='json')
+    assert response.status_code == 404
+
+    client.force_authenticate(user=student)
+    assert client.delete(f'/api/courses/{course.id}/').status_code == 404
+    assert Course.objects.filter(pk=course.id).exists()
+
+
+@pytest.mark.django_db
+def test_enrollment_list_is_scoped_to_role():
+    teacher = User.objects.create_user(username="teacher", email="teacher@example.com", password="password123", role="teacher")
+    other_teacher = User.objects.create_user(username="other", email="other@example.com", password="password123", role="teacher")
+    students = [Student.objects.create(user=User.objects.create_user(username=f"student{i}", email=f"student{i}@example.com", role="student")) for i in range(2)]
+    course = Course.objects.create(name="Math 101", instructor=teacher)
+    other_course = Course.objects.create(name="Art", instructor=other_teacher)
+    Enrollment.objects.create(student=students[0], course=course)
+    Enrollment.objects.create(student=students[1], course=other_course)
+
+    client = APIClient()
+    client.force_authenticate(user=teacher)
+    assert [row['course']['id'] for row in client.get('/api/courses/enrollments/').data] == [course.id]
+
+    client.force_authenticate(user=students[1].user)
+    assert [row['student']['id'] for row in client.get('/api/courses/enrollments/').data] == [students[1].id]
+
+
+@pytest.mark.django_db
+def test_batch_enrollment_respects_capacity_and_duplicates(django_assert_max_num_queries):
+    teacher = User.objects.create_user(username="teacher", email="teacher@example.com", password="password123", role="teacher")
+    students = [Student.objects.create(user=User.objects.create_user(username=f"student{i}", email=f"student{i}@example.com", role="student")) for i in range(4)]
+    course = Course.objects.create(name="Math 101", instructor=teacher, capacity=3)
+    Enrollment.objects.create(student=students[0], course=course)
+
+    client = APIClient()
+    client.force_authenticate(user=teacher)
+    student_ids = [student.id for student in students] + [students[1].id, 0]
+    with django_assert_max_num_queries(9):
+        response = client.post('/api/courses/enrollments/batch/', {"course": course.id, "students": student_ids}, format='json')
+
+    assert response.status_code == 201
+    assert [row['student'] for row in response.data['enrolled']] == [students[1].id, students[2].id]
+    assert [(row['student'], row['reason']) for row in response.data['skipped']] == [
+        (students[0].id, 'already_enrolled'), (students[3].id, 'course_full'), (0, 'student_not_found'),
+    ]
+    course.refresh_from_db()
+    assert course.enrolled_count == 3 == Enrollment.objects.filter(course=course).count()
+
+    Enrollment.objects.filter(student=students[1]).delete()
+    course.refresh_from_db()
+    assert course.enrolled_count == 2
+
+
+@pytest.mark.django_db
+def test_batch_enrollment_is_scoped_to_role():
+    teacher = User.objects.create_user(username="teacher", email="teacher@example.com", password="password123", role="teacher")
+    other_teacher = User.objects.create_user(username="other", email="other@example.com", password="password123", role="teacher")
+    student = Student.objects.create(user=User.objects.create_user(username="student", email="student@example.com", role="student"))
+    courses = [Course.objects.create(name=f"Course {i}", instructor=teacher) for i in range(2)]
+    archived = Course.objects.create(name="Archived", instructor=teacher, is_active=False)
+
+    client = APIClient()
+    client.force_authenticate(user=other_teacher)
+    response = client.post('/api/courses/enrollments/batch/', {"course": courses[0].id, "students": [student.id]}, format='json')
+    assert response.status_code == 404
+
+    client.force_authenticate(user=student.user)
+    response = client.post('/api/courses/enrollments/batch/', {"courses": [c.id for c in courses] + [archived.id]}, format='json')
+    assert response.status_code == 201
+    assert sorted(row['course'] for row in response.data['enrolled']) == [c.id for c in courses]
+    assert response.data['skipped'] == [{'student': student.id, 'course': archived.id, 'reason': 'course_not_found'}]
+
+    response = client.post('/api/courses/enrollments/batch/', {"course": courses[0].id, "students": [student.id]}, format='json')
+    assert response.status_code == 400
+
+
+@pytest.mark.django_db
+def test_queued_enrollment_returns_ticket(settings, enrollment_queue_redis):
+    settings.ENROLLMENT_QUEUE_ENABLED = True
+    teacher = User.objects.create_user(username="teacher", email="teacher@example.com", password="password123", role="teacher")
+    students = [Student.objects.create(user=User.objects.create_user(username=f"student{i}", email=f"student{i}@example.com", role="student")) for i in range(2)]
+    course = Course.objects.create(name="Math 101", instructor=teacher, capacity=1)
+
+    client = APIClient()
+    tickets = []
+    with patch('courses.tasks.process_enrollment_queue.apply_async') as apply_async:
+        for student in students:
+            client.force_authenticate(user=student.user)
+            response = client.post('/api/courses/enrollments/', {"student": student.id, "course": course.id}, format='json')
+            assert response.status_code == 202
+            assert response.data['status'] == 'pending'
+            assert response['Location'] == f"/api/courses/enrollments/tickets/{response.data['id']}/"
+            tickets.append(response['Location'])
+    apply_async.assert_called_once()
+    assert not Enrollment.objects.exists()
+
+    assert drain() == 2
+    client.force_authenticate(user=students[0].user)
+    response = client.get(tickets[0])
+    assert response.data['status'] == 'enrolled'
+    assert response.data['enrollment'] == Enrollment.objects.get(student=students[0]).id
+    assert client.get(tickets[1]).status_code == 404
+
+    client.force_authenticate(user=students[1].user)
+    response = client.get(tickets[1])
+    assert (response.data['status'], response.data['reason']) == ('rejected', 'course_full')
+
+
+@pytest.mark.django_db
+def test_enrollment_queue_recovers_abandoned_batches_and_caps_runs(settings, enrollment_queue_redis):
+    settings.ENROLLMENT_QUEUE_VISIBILITY_TIMEOUT = 60
+    teacher = User.objects.create_user(username="teacher", email="teacher@example.com", password="password123", role="teacher")
+    course = Course.objects.create(name="Math 101", instructor=teacher)
+    students = [Student.objects.create(user=User.objects.create_user(username=f"student{i}", email=f"student{i}@example.com", role="student")) for i in range(5)]
+    queue = get_queue()
+    with patch('courses.tasks.process_enrollment_queue.apply_async') as apply_async:
+        tickets = [submit(student.user, student.id, course.id) for student in students]
+
+        # A worker claims two requests and dies before writing their tickets.
+        abandoned = queue.claim_batch(2)
+        assert len(queue) == 3
+        apply_async.reset_mock()
+        assert drain(batch_size=1, max_batches=1) == 1
+        apply_async.assert_called_once()
+        assert not Enrollment.objects.filter(student__in=students[:2]).exists()
+
+        # Once the claim is older than the visibility timeout it is queued again.
+        with patch('courses.enrollment_queue.time.time', return_value=time.time() + 120):
+            assert drain() == 4
+    assert len(queue) == 0 and not enrollment_queue_redis.llen(queue.processing_key)
+    assert {get_ticket(ticket['id'])['status'] for ticket in tickets} == {'enrolled'}
+
+    # A run cut short by the soft time limit puts its batch back and stops.
+    Enrollment.objects.filter(student=students[0]).delete()
+    with patch('courses.tasks.process_enrollment_queue.apply_async'):
+        submit(students[0].user, students[0].id, course.id)
+        with patch('courses.enrollment_queue.enroll', side_effect=SoftTimeLimitExceeded), pytest.raises(SoftTimeLimitExceeded):
+            drain()
+    assert len(queue) == 1 and not enrollment_queue_redis.llen(queue.processing_key)
+    assert {item['ticket'] for _, item in abandoned} == {tickets[0]['id'], tickets[1]['id']}
+
+
+def test_enrollment_queue_requires_redis(settings, monkeypatch):
+    # Simulate a non-Redis default cache whatever the project settings say.
+    monkeypatch.setattr('courses.enrollment_queue.redis_client', lambda: None)
+    monkeypatch.setattr('courses.checks.redis_client', lambda: None)
+    settings.ENROLLMENT_QUEUE_ENABLED = True
+    assert [error.id for error in check_enrollment_queue(None)] == ['courses.E001']
+    with pytest.raises(ImproperlyConfigured):
+        get_queue()
+    settings.ENROLLMENT_QUEUE_ENABLED = False
+    assert check_enrollment_queue(None) == []
+
+
+@pytest.mark.django_db
+def test_course_search_is_ranked_and_kept_in_sync():
+    teacher = User.objects.create_user(username="teacher", email="teacher@example.com", password="password123", role="teacher")
+    in_description = Course.objects.create(name="Mechanics", description="Classical physics for engineers", instructor=teacher)
+    in_name = Course.objects.create(name="Physics 101", description="Motion and energy", instructor=teacher)
+    Course.objects.create(name="Physics Archive", description="Old", instructor=teacher, is_active=False)
+    Course.objects.create(name="Biology 101", description="Intro Biology", instructor=teacher)
+
+    client = APIClient()
+    client.force_authenticate(user=teacher)
+
+    response = client.get('/api/courses/search/', {"q": "physic"})
+    assert response.status_code == 200
+    assert response.data['count'] == 2
+    assert [c['id'] for c in response.data['results']] == [in_name.id, in_description.id]
+
+    response = client.get('/api/courses/search/', {"q": "physics", "limit": 1, "offset": 1})
+    assert [c['id'] for c in response.data['results']] == [in_description.id]
+
+    in_name.name = "Chemistry 101"
+    in_name.description = "Reactions"
+    in_name.save()
+    in_description.delete()
+    assert client.get('/api/courses/search/', {"q": "physics"}).data['count'] == 0
+    assert client.get('/api/courses/search/', {"q": 'chem"'}).data['results'][0]['id'] == in_name.id
+    assert client.get('/api/courses/search/').status_code == 400
+
+    with patch("courses.views.get_backend", return_value=None):
+        assert client.get('/api/courses/search/', {"q": "physics"}).status_code == 501
+    assert PostgresSearchBackend().match("intro phys & !x") == "intro:* & phys:* & x:*"
+
+
+@pytest.mark.django_db
+def test_course_cache_serves_nested_courses_until_a_write_commits(django_assert_num_queries, django_capture_on_commit_callbacks):
+    teacher = User.objects.create_user(username="teacher", email="teacher@example.com", password="password123", role="teacher")
+    courses = [Course.objects.create(name=f"Course {i}", description="", instructor=teacher) for i in range(3)]
+    students = [Student.objects.create(user=User.objects.create_user(username=f"student{i}", email=f"student{i}@example.com", role="student")) for i in range(4)]
+    Enrollment.objects.bulk_create([Enrollment(student=student, course=course) for student in students for course in courses])
+
+    client = APIClient()
+    client.force_authenticate(user=teacher)
+    # Enrollments, then one query for all of their courses and instructors, then the request log.
+    with django_assert_num_queries(3):
+        response = client.get('/api/courses/enrollments/')
+    assert len(response.data) == 12
+    assert response.data[0]['course']['instructor']['username'] == "teacher"
+    assert 'enrolled_count' not in response.data[0]['course']
+
+    version = course_version()
+    with django_capture_on_commit_callbacks(execute=True):
+        Enrollment.objects.filter(course=courses[0]).first().delete()
+        enroll([(students[0].id, courses[0].id)])
+    assert course_version() == version
+
+    with django_capture_on_commit_callbacks(execute=True):
+        courses[0].name = "Renamed"
+        courses[0].save()
+    with django_assert_num_queries(1):
+        assert get_course(courses[1].id)['name'] == "Course 1"
+    assert get_course(courses[0].id)['name'] == "Renamed"
+
+
+@pytest.mark.django_db
+def test_enrollment_retry_with_idempotency_key_replays_response():
+    teacher = User.objects.create_user(username="teacher", email="teacher@example.com", password="password123", role="teacher")
+    student_user = User.objects.create_user(username="student", email="student@example.com", password="password123", role="student")
+    student = Student.objects.create(user=student_user)
+    course = Course.objects.create(name="Physics 101", description="Intro Physics", instructor=teacher)
+    other = Course.objects.create(name="Biology 101", description="Intro Biology", instructor=teacher)
+
+    client = APIClient()
+    client.force_authenticate(user=student_user)
+    payload = {"student": student.id, "course": course.id}
+    first = client.post('/api/courses/enrollments/', payload, format='json', HTTP_IDEMPOTENCY_KEY="retry-1")
+    retry = client.post('/api/courses/enrollments/', payload, format='json', HTTP_IDEMPOTENCY_KEY="retry-1")
+    assert (first.status_code, retry.status_code) == (201, 201)
+    assert retry.data == first.data
+    assert retry['Idempotent-Replayed'] == 'true'
+    assert Enrollment.objects.count() == 1
+
+    reused = client.post('/api/courses/enrollments/', {"student": student.id, "course": other.id}, format='json', HTTP_IDEMPOTENCY_KEY="retry-1")
+    assert reused.status_code == 422
+    assert client.post('/api/courses/enrollments/', payload, format='json').status_code == 400
@@ -1,8 +1,14 @@
 from django.urls import path
-from .views import CourseListView, CourseDetailView, EnrollmentListView
+from .views import CourseListView, CourseDetailView, CourseGradebookView, CourseSearchView, EnrollmentBatchView, EnrollmentListView, EnrollmentTicketView
+from .async_views import AsyncCourseListView
 
 urlpatterns = [
     path('', CourseListView.as_view(), name='course-list'),
+    path('search/', CourseSearchView.as_view(), name='course-search'),
+    path('async/', AsyncCourseListView.as_view(), name='course-list-async'),
     path('<int:pk>/', CourseDetailView.as_view(), name='course-detail'),
+    path('<int:pk>/gradebook/', CourseGradebookView.as_view(), name='course-gradebook'),
     path('enrollments/', EnrollmentListView.as_view(), name='enrollment-list'),
+    path('enrollments/batch/', EnrollmentBatchView.as_view(), name='enrollment-batch'),
+    path('enrollments/tickets/<str:ticket_id>/', EnrollmentTicketView.as_view(), name='enrollment-ticket'),
 ]
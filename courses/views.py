@@ -1,38 +1,83 @@
+from collections import defaultdict
 from rest_framework.generics import ListCreateAPIView, RetrieveUpdateDestroyAPIView
+from rest_framework.views import APIView
 from rest_framework.response import Response
-from rest_framework.permissions import IsAuthenticated
+from rest_framework.permissions import IsAuthenticated, SAFE_METHODS
 from rest_framework.exceptions import PermissionDenied
+from rest_framework.filters import OrderingFilter, SearchFilter
 from drf_yasg.utils import swagger_auto_schema
+from drf_yasg import openapi
 from django.core.cache import cache
 from django.conf import settings
-from .models import Course, Student, Enrollment
-from .serializers import CourseSerializer, EnrollmentSerializer
+from django.db import connection, transaction
+from django.urls import reverse
+from .models import Course, Enrollment
+from .enrollment import SKIP_MESSAGES, enroll
+from .enrollment_queue import get_ticket, queue_settings, submit
+from .cache import get_course
+from .search import get_backend, search_courses
+from .serializers import (
+    CourseSerializer,
+    EnrollmentBatchResultSerializer,
+    EnrollmentBatchSerializer,
+    EnrollmentCreateSerializer,
+    EnrollmentSerializer,
+    EnrollmentTicketSerializer,
+    GradebookAttendanceSerializer,
+    GradebookGradeSerializer,
+)
+from grades.models import Grade
+from attendance.models import Attendance
+from students.models import Student
+from students.serializers import StudentSerializer
+from students.permissions import IsAdminOrTeacher
 from courses.tasks import notify_students_about_new_course
+from courses.signals import gradebook_cache_key
+from core.idempotency import IDEMPOTENCY_KEY_PARAMETER, idempotent
 from core.logging import logger
+from core.filters import QueryParamFilterBackend
+from core.cache import query_cache_key
+from users.access import get_access
 
 CACHE_TTL = getattr(settings, 'CACHE_TTL', 300)
+ENROLLMENT_BATCH_LIMIT = getattr(settings, 'ENROLLMENT_BATCH_LIMIT', 500)
+COURSE_SEARCH_PAGE_SIZE = getattr(settings, 'COURSE_SEARCH_PAGE_SIZE', 20)
+COURSE_SEARCH_MAX_PAGE_SIZE = 100
 
 
 class CourseListView(ListCreateAPIView):
-    queryset = Course.objects.filter(is_active=True)
+    queryset = Course.objects.filter(is_active=True).select_related('instructor')
     serializer_class = CourseSerializer
     permission_classes = [IsAuthenticated]
+    filter_backends = [QueryParamFilterBackend, SearchFilter, OrderingFilter]
+    filter_fields = {
+        'instructor': 'instructor_id',
+    }
+    search_fields = ['name']
+    ordering_fields = ['name', 'id']
+    ordering = ['name', 'id']
 
     @swagger_auto_schema(
         operation_summary="Get a list of courses",
-        operation_description="Returns a list of active courses for students",
+        operation_description="Returns a list of active courses for students, optionally filtered by instructor and searched by name",
+        manual_parameters=[
+            openapi.Parameter('instructor', openapi.IN_QUERY, description="Instructor user ID", type=openapi.TYPE_INTEGER),
+            openapi.Parameter('search', openapi.IN_QUERY, description="Part of the course name", type=openapi.TYPE_STRING),
+            openapi.Parameter('ordering', openapi.IN_QUERY, description="Sort by name or id (prefix with - for descending)", type=openapi.TYPE_STRING),
+        ],
         responses={200: CourseSerializer(many=True)}
     )
     def get(self, request, *args, **kwargs):
-        logger.info(f"Fetching course list by {request.user.username}")
-        cached_courses = cache.get('course_list')
+        logger.info("Fetching course list by %s", request.user.username)
+        cache_key = query_cache_key('course_list', request.query_params)
+        cached_courses = cache.get(cache_key)
         if cached_courses:
             logger.info("Course list fetched from cache")
             return Response(cached_courses)
 
-        courses = self.get_queryset()
+        courses = self.filter_queryset(self.get_queryset())
         serializer = self.get_serializer(courses, many=True)
-        cache.set('course_list', serializer.data, timeout=CACHE_TTL)
+        cache.set(cache_key, serializer.data, timeout=CACHE_TTL)
         logger.info("Course list fetched from database and cached")
         return Response(serializer.data)
 
@@ -46,22 +91,65 @@ class CourseListView(ListCreateAPIView):
         if request.user.role != 'teacher':
             raise PermissionDenied("Only teachers can create courses.")
 
-        logger.info(f"Teacher {request.user.username} is creating a course")
+        logger.info("Teacher %s is creating a course", request.user.username)
         serializer = self.get_serializer(data=request.data)
         if serializer.is_valid():
             course = serializer.save(instructor=request.user)
-            student_emails = [student.user.email for student in Student.objects.all()]
-            notify_students_about_new_course.delay(course.name, student_emails)
-            logger.info(f"Course '{course.name}' created and notifications sent")
+            transaction.on_commit(lambda: notify_students_about_new_course.delay(course.id))
+            logger.info("Course '%s' created and notifications queued", course.name)
             return Response(serializer.data, status=201)
         return Response(serializer.errors, status=400)
 
 
+class CourseSearchView(APIView):
+    permission_classes = [IsAuthenticated]
+
+    @swagger_auto_schema(
+        operation_summary="Search courses",
+        operation_description=(
+            "Full-text search over the names and descriptions of active courses. Every word of the query must "
+            "match, as a whole word or a prefix; results are ranked with name matches first"
+        ),
+        manual_parameters=[
+            openapi.Parameter('q', openapi.IN_QUERY, description="Search query", type=openapi.TYPE_STRING, required=True),
+            openapi.Parameter('limit', openapi.IN_QUERY, description=f"Page size, at most {COURSE_SEARCH_MAX_PAGE_SIZE}", type=openapi.TYPE_INTEGER),
+            openapi.Parameter('offset', openapi.IN_QUERY, description="Number of results to skip", type=openapi.TYPE_INTEGER),
+        ],
+        responses={200: "Total number of matches and the ranked page of courses"}
+    )
+    def get(self, request):
+        query = request.query_params.get('q', '').strip()
+        if not query:
+            return Response({"error": "q is required"}, status=400)
+        limit = request.query_params.get('limit', str(COURSE_SEARCH_PAGE_SIZE))
+        if not limit.isdigit() or not 1 <= int(limit) <= COURSE_SEARCH_MAX_PAGE_SIZE:
+            return Response({"error": f"limit must be between 1 and {COURSE_SEARCH_MAX_PAGE_SIZE}"}, status=400)
+        offset = request.query_params.get('offset', '0')
+        if not offset.isdigit():
+            return Response({"error": "offset must be a non-negative integer"}, status=400)
+
+        if get_backend() is None:
+            logger.error("Course search is not available on %s", connection.vendor)
+            return Response({"error": "Course search is not available"}, status=501)
+
+        logger.info("Searching courses for %r by %s", query, request.user.username)
+        course_ids, total = search_courses(query, int(limit), int(offset))
+        courses = Course.objects.select_related('instructor').in_bulk(course_ids)
+        ranked = [courses[course_id] for course_id in course_ids if course_id in courses]
+        return Response({'count': total, 'results': CourseSerializer(ranked, many=True).data})
+
+
 class CourseDetailView(RetrieveUpdateDestroyAPIView):
-    queryset = Course.objects.all()
     serializer_class = CourseSerializer
     permission_classes = [IsAuthenticated]
 
+    def get_queryset(self):
+        courses = Course.objects.select_related('instructor')
+        if self.request.method in SAFE_METHODS:
+            return courses
+        # Only the instructor (or an administrator) can find the course to change or delete it.
+        return courses.for_user(self.request.user)
+
     @swagger_auto_schema(
         operation_summary="Change course",
         operation_description="Allows the teacher to change the course",
@@ -73,44 +161,171 @@ class CourseDetailView(RetrieveUpdateDestroyAPIView):
             raise PermissionDenied("Only teachers can update courses.")
 
         pk = kwargs.get("pk")
-        logger.info(f"Updating course {pk} by {request.user.username}")
+        logger.info("Updating course %s by %s", pk, request.user.username)
         try:
             course = self.get_queryset().get(pk=pk)
-            if course.instructor != request.user:
-                raise PermissionDenied("You can only modify your own courses.")
-
             serializer = self.get_serializer(course, data=request.data)
             if serializer.is_valid():
                 serializer.save()
                 cache.delete(f'course_{pk}')
                 cache.set(f'course_{pk}', serializer.data, timeout=CACHE_TTL)
-                logger.info(f"Course {pk} updated and cached")
+                logger.info("Course %s updated and cached", pk)
                 return Response(serializer.data)
             return Response(serializer.errors, status=400)
         except Course.DoesNotExist:
-            logger.error(f"Course {pk} not found")
+            logger.error("Course %s not found", pk)
             return Response({"error": "Course not found"}, status=404)
 
 
 class EnrollmentListView(ListCreateAPIView):
-    queryset = Enrollment.objects.all()
     serializer_class = EnrollmentSerializer
     permission_classes = [IsAuthenticated]
 
+    def get_queryset(self):
+        return Enrollment.objects.for_user(self.request.user).select_related('student__user')
+
     @swagger_auto_schema(
         operation_summary="Sign up for a course",
-        operation_description="Allows students to enroll in courses",
-        request_body=EnrollmentSerializer,
-        responses={201: EnrollmentSerializer}
+        operation_description=(
+            "Allows students to enroll in courses with free seats. When the enrollment queue is enabled "
+            "the request is queued and answered with a ticket to poll at its Location"
+        ),
+        request_body=EnrollmentCreateSerializer,
+        responses={201: EnrollmentCreateSerializer, 202: EnrollmentTicketSerializer},
+        manual_parameters=[IDEMPOTENCY_KEY_PARAMETER],
     )
+    @idempotent
     def post(self, request, *args, **kwargs):
         if request.user.role != 'student':
             raise PermissionDenied("Only students can enroll in courses.")
 
-        logger.info(f"Student {request.user.username} enrolling in a course")
-        serializer = self.get_serializer(data=request.data)
-        if serializer.is_valid():
-            enrollment = serializer.save()
-            logger.info(f"Student {enrollment.student.user.username} enrolled in {enrollment.course.name}")
-            return Response(serializer.data, status=201)
-        return Response(serializer.errors, status=400)
+        logger.info("Student %s enrolling in a course", request.user.username)
+        serializer = EnrollmentCreateSerializer(data=request.data)
+        if not serializer.is_valid():
+            return Response(serializer.errors, status=400)
+        student = serializer.validated_data['student']
+        if student.user_id != request.user.id:
+            raise PermissionDenied("Students can only enroll themselves.")
+
+        if queue_settings()['enabled']:
+            ticket = submit(request.user, student.pk, serializer.validated_data['course'].pk)
+            logger.info("Student %s queued for course %s with ticket %s", request.user.username, ticket['course'], ticket['id'])
+            location = reverse('enrollment-ticket', args=[ticket['id']])
+            return Response(EnrollmentTicketSerializer(ticket).data, status=202, headers={'Location': location})
+
+        created, skipped = enroll([(student.pk, serializer.validated_data['course'].pk)])
+        if skipped:
+            logger.info("Student %s was not enrolled: %s", request.user.username, skipped[0]['reason'])
+            return Response({"error": SKIP_MESSAGES[skipped[0]['reason']]}, status=400)
+        logger.info("Student %s enrolled in course %s", request.user.username, created[0].course_id)
+        return Response(EnrollmentCreateSerializer(created[0]).data, status=201)
+
+
+class EnrollmentTicketView(APIView):
+    permission_classes = [IsAuthenticated]
+
+    @swagger_auto_schema(
+        operation_summary="Get a queued enrollment",
+        operation_description="Returns the status of a queued enrollment ticket (its owner only)",
+        responses={200: EnrollmentTicketSerializer}
+    )
+    def get(self, request, ticket_id):
+        ticket = get_ticket(ticket_id)
+        if ticket is None or ticket['user'] != request.user.id:
+            return Response({"error": "Ticket not found"}, status=404)
+        return Response(EnrollmentTicketSerializer(ticket).data)
+
+
+class EnrollmentBatchView(APIView):
+    permission_classes = [IsAuthenticated]
+
+    @swagger_auto_schema(
+        operation_summary="Enroll in bulk",
+        operation_description=(
+            "Administrators and teachers enroll many students in one course (`course` and `students`); "
+            "students enroll themselves in many courses (`courses`). Pairs that are already enrolled, "
+            "or that do not fit in the course's capacity, are skipped and reported with a reason"
+        ),
+        request_body=EnrollmentBatchSerializer,
+        responses={201: EnrollmentBatchResultSerializer}
+    )
+    def post(self, request):
+        serializer = EnrollmentBatchSerializer(data=request.data, context={'limit': ENROLLMENT_BATCH_LIMIT})
+        if not serializer.is_valid():
+            return Response(serializer.errors, status=400)
+        data = serializer.validated_data
+        access = get_access(request.user)
+
+        if access.is_student:
+            if 'courses' not in data:
+                return Response({"courses": ["This field is required."]}, status=400)
+            student_id = Student.objects.filter(user=request.user).values_list('pk', flat=True).first()
+            if student_id is None:
+                return Response({"error": "Student profile not found"}, status=400)
+            pairs = [(student_id, course_id) for course_id in data['courses']]
+        elif access.is_admin or access.is_teacher:
+            if 'course' not in data or 'students' not in data:
+                return Response({"error": "Both course and students are required."}, status=400)
+            if not Course.objects.for_user(request.user).filter(pk=data['course']).exists():
+                logger.error("Course %s not found for %s", data['course'], request.user.username)
+                return Response({"error": "Course not found"}, status=404)
+            pairs = [(student_id, data['course']) for student_id in data['students']]
+        else:
+            raise PermissionDenied("You cannot enroll students.")
+
+        created, skipped = enroll(pairs)
+        logger.info("%s enrolled %d pairs in bulk, skipped %d", request.user.username, len(created), len(skipped))
+        result = EnrollmentBatchResultSerializer({'enrolled': created, 'skipped': skipped})
+        return Response(result.data, status=201 if created else 200)
+
+
+class CourseGradebookView(APIView):
+    permission_classes = [IsAuthenticated, IsAdminOrTeacher]
+
+    def build_gradebook(self, course):
+        enrollments = Enrollment.objects.filter(course_id=course['id']).select_related('student__user').order_by('student_id')
+        grades = Grade.objects.filter(course_id=course['id']).order_by('date', 'id')
+        attendance = Attendance.objects.filter(course_id=course['id']).order_by('date', 'id')
+
+        grades_by_student = defaultdict(list)
+        for grade in GradebookGradeSerializer(grades, many=True).data:
+            grades_by_student[grade.pop('student')].append(grade)
+        attendance_by_student = defaultdict(list)
+        for record in GradebookAttendanceSerializer(attendance, many=True).data:
+            attendance_by_student[record.pop('student')].append(record)
+
+        students = [
+            {
+                'student': StudentSerializer(enrollment.student).data,
+                'enrollment_date': enrollment.enrollment_date,
+                'grades': grades_by_student.get(enrollment.student_id, []),
+                'attendance': attendance_by_student.get(enrollment.student_id, []),
+            }
+            for enrollment in enrollments
+        ]
+        # The cached course leaves out enrolled_count; the roster is the count.
+        return {'course': {**course, 'enrolled_count': len(students)}, 'students': students}
+
+    @swagger_auto_schema(
+        operation_summary="Get the course gradebook",
+        operation_description="Returns the roster of a course with each enrolled student's grades and attendance (administrator or course instructor only)",
+        responses={200: "Course gradebook"}
+    )
+    def get(self, request, pk):
+        logger.info("Fetching gradebook for course %s by %s", pk, request.user.username)
+        cache_key = gradebook_cache_key(pk)
+        gradebook = cache.get(cache_key)
+        if gradebook:
+            logger.info("Gradebook fetched from cache")
+        else:
+            course = get_course(pk)
+            if course is None:
+                logger.error("Course %s not found", pk)
+                return Response({"error": "Course not found"}, status=404)
+            gradebook = self.build_gradebook(course)
+            cache.set(cache_key, gradebook, timeout=CACHE_TTL)
+            logger.info("Gradebook built from database and cached")
+
+        if request.user.role == 'teacher' and gradebook['course']['instructor']['id'] != request.user.id:
+            raise PermissionDenied("You can only view the gradebook of your own courses.")
+        return Response(gradebook)
@@ -2,6 +2,19 @@ from django.db import models
 from courses.models import Course
 from students.models import Student
 from users.models import User
+from core.scoping import RoleScopedQuerySet
+
+GRADE_POINTS = {
+    'A+': 4.0, 'A': 4.0, 'A-': 3.7,
+    'B+': 3.3, 'B': 3.0, 'B-': 2.7,
+    'C+': 2.3, 'C': 2.0, 'C-': 1.7,
+    'D+': 1.3, 'D': 1.0, 'D-': 0.7,
+    'F': 0.0,
+}
+
+class GradeQuerySet(RoleScopedQuerySet):
+    teacher_lookup = 'course__instructor'
+    student_lookup = 'student__user'
 
 class Grade(models.Model):
     student = models.ForeignKey(Student, on_delete=models.CASCADE)
@@ -11,5 +24,19 @@ class Grade(models.Model):
     date = models.DateField(auto_now_add=True)
     teacher = models.ForeignKey(User, on_delete=models.CASCADE, limit_choices_to={'role': 'teacher'})
 
+    objects = GradeQuerySet.as_manager()
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['course', 'date'], name='grade_course_date_idx'),
+            models.Index(fields=['student', 'date'], name='grade_student_date_idx'),
+            models.Index(fields=['grade'], name='grade_value_idx'),
+        ]
+
+    @property
+    def points(self):
+        """Numeric value of a letter grade on a 4.0 scale, or None if the grade is not a letter grade."""
+        return GRADE_POINTS.get(self.grade.strip().upper())
+
     def __str__(self):
         return f"Grade {self.grade} for {self.student.user.username} in {self.course.name}"
@@ -1,12 +1,12 @@
 from rest_framework import serializers
 from grades.models import Grade
 from students.serializers import StudentSerializer
-from courses.serializers import CourseSerializer
+from courses.serializers import CachedCourseField
 from users.serializers import CustomUserSerializer
 
 class GradeSerializer(serializers.ModelSerializer):
     student = StudentSerializer()
-    course = CourseSerializer()
+    course = CachedCourseField()
     teacher = CustomUserSerializer()
 
     class Meta:
@@ -1,18 +1,29 @@
 from celery import shared_task
 from core.logging import logger
+from courses.cache import get_course
 from django.core.mail import send_mail
+from grades.models import Grade
 
 @shared_task
-def notify_student_about_new_grade(student_email, course_name, grade):
+def notify_student_about_new_grade(grade_id):
     try:
-        logger.info(f"Sending grade notification to {student_email}")
+        grade = Grade.objects.select_related('student__user').only(
+            'grade', 'student__user__email', 'course_id'
+        ).get(pk=grade_id)
+    except Grade.DoesNotExist:
+        logger.warning("Grade %s no longer exists, skipping notification", grade_id)
+        return
+    student_email = grade.student.user.email
+    course_name = get_course(grade.course_id)['name']
+    try:
+        logger.info("Sending grade notification to %s", student_email)
         send_mail(
             'New Grade Assigned',
-            f'You have received a new grade in {course_name}: {grade}.',
+            f'You have received a new grade in {course_name}: {grade.grade}.',
             'admin@example.com',
             [student_email],
             fail_silently=False,
         )
-        logger.info(f"Grade notification sent to {student_email}")
+        logger.info("Grade notification sent to %s", student_email)
     except Exception as e:
-        logger.error(f"Error sending grade notification to {student_email}: {e}")
+        logger.error("Error sending grade notification to %s: %s", student_email, e)
@@ -5,6 +5,8 @@ from grades.tasks import notify_student_about_new_grade
 from users.models import User
 from students.models import Student
 from courses.models import Course
+from grades.models import Grade
+from core.testing import query_budget
 
 @pytest.mark.django_db
 def test_teacher_add_grade():
@@ -42,9 +44,16 @@ def test_student_cannot_add_grade():
     assert response.status_code == 403
     assert response.json()['error'] == "Only teachers can add grades"
 
+@pytest.mark.django_db
 @patch("grades.tasks.send_mail")
 def test_notify_student_about_new_grade_task(mock_send_mail):
-    notify_student_about_new_grade("student@example.com", "Math 101", "A")
+    teacher = User.objects.create_user(username="teacher", email="teacher@example.com", password="password123", role="teacher")
+    student_user = User.objects.create_user(username="student", email="student@example.com", password="password123", role="student")
+    student = Student.objects.create(user=student_user)
+    course = Course.objects.create(name="Math 101", instructor=teacher)
+    grade = Grade.objects.create(student=student, course=course, grade="A", teacher=teacher)
+
+    notify_student_about_new_grade(grade.id)
 
     mock_send_mail.assert_called_once_with(
         'New Grade Assigned',
@@ -53,3 +62,64 @@ def test_notify_student_about_new_grade_task(mock_send_mail):
         ['student@example.com'],
         fail_silently=False
     )
+
+@pytest.mark.django_db
+def test_grade_list_filters():
+    teacher = User.objects.create_user(username="teacher", email="teacher@example.com", password="password123", role="teacher")
+    student_user = User.objects.create_user(username="student", email="student@example.com", password="password123", role="student")
+    student = Student.objects.create(user=student_user)
+    physics = Course.objects.create(name="Physics", instructor=teacher)
+    math = Course.objects.create(name="Math", instructor=teacher)
+    Grade.objects.create(student=student, course=physics, grade="A", teacher=teacher)
+    Grade.objects.create(student=student, course=physics, grade="B", teacher=teacher)
+    Grade.objects.create(student=student, course=math, grade="A", teacher=teacher)
+
+    client = APIClient()
+    client.force_authenticate(user=teacher)
+
+    response = client.get('/api/grades/', {"course": physics.id})
+    assert response.status_code == 200
+    assert len(response.json()) == 2
+
+    response = client.get('/api/grades/', {"course": physics.id, "grade": "A"})
+    assert len(response.json()) == 1
+
+    response = client.get('/api/grades/', {"ordering": "grade"})
+    assert [g['grade'] for g in response.json()] == ["A", "A", "B"]
+
+    response = client.get('/api/grades/', {"date_from": "not-a-date"})
+    assert response.status_code == 400
+
+
+@pytest.mark.django_db
+@pytest.mark.parametrize('path', ['/api/grades/?course={course}', '/api/grades/?student={student}'])
+def test_grade_list_query_budget(seeded_data, warm_course_cache, path):
+    client = APIClient()
+    client.force_authenticate(user=User.objects.get(pk=seeded_data['teacher']))
+    warm_course_cache()
+
+    with query_budget(2, max_ms=500, label=path):
+        response = client.get(path.format(**seeded_data))
+
+    assert response.status_code == 200
+    assert len(response.data) > 0
+
+
+@pytest.mark.django_db
+def test_grade_list_is_scoped_to_role():
+    teacher = User.objects.create_user(username="teacher", email="teacher@example.com", password="password123", role="teacher")
+    other_teacher = User.objects.create_user(username="other", email="other@example.com", password="password123", role="teacher")
+    students = [Student.objects.create(user=User.objects.create_user(username=f"student{i}", email=f"student{i}@example.com", role="student")) for i in range(2)]
+    course = Course.objects.create(name="Physics", instructor=teacher)
+    other_course = Course.objects.create(name="Art", instructor=other_teacher)
+    mine = Grade.objects.create(student=students[0], course=course, grade="A", teacher=teacher)
+    theirs = Grade.objects.create(student=students[1], course=other_course, grade="B", teacher=other_teacher)
+
+    client = APIClient()
+    client.force_authenticate(user=teacher)
+    assert [grade['id'] for grade in client.get('/api/grades/').data] == [mine.id]
+    assert client.put(f'/api/grades/{theirs.id}/', {"grade": "F"}, format='json').status_code == 404
+
+    client.force_authenticate(user=students[1].user)
+    assert [grade['id'] for grade in client.get('/api/grades/').data] == [theirs.id]
+    assert client.delete(f'/api/grades/{theirs.id}/').status_code == 403
@@ -1,66 +1,94 @@
 from rest_framework.generics import ListCreateAPIView, RetrieveUpdateDestroyAPIView
 from rest_framework.response import Response
 from rest_framework.permissions import IsAuthenticated
+from rest_framework.filters import OrderingFilter
 from drf_yasg.utils import swagger_auto_schema
+from drf_yasg import openapi
 from django.core.cache import cache
 from django.conf import settings
+from django.db import transaction
 from .models import Grade
 from .serializers import GradeSerializer
 from grades.tasks import notify_student_about_new_grade
+from core.idempotency import IDEMPOTENCY_KEY_PARAMETER, idempotent
 from core.logging import logger
+from core.filters import QueryParamFilterBackend
+from core.cache import query_cache_key
 
 CACHE_TTL = getattr(settings, 'CACHE_TTL', 300)
 
 class GradeListView(ListCreateAPIView):
-    queryset = Grade.objects.all()
     serializer_class = GradeSerializer
     permission_classes = [IsAuthenticated]
+    filter_backends = [QueryParamFilterBackend, OrderingFilter]
+    filter_fields = {
+        'course': 'course_id',
+        'student': 'student_id',
+        'grade': 'grade',
+        'date_from': 'date__gte',
+        'date_to': 'date__lte',
+    }
+    ordering_fields = ['date', 'grade', 'id']
+    ordering = ['-date', '-id']
+
+    def get_queryset(self):
+        return Grade.objects.for_user(self.request.user).select_related('student__user', 'teacher')
 
     @swagger_auto_schema(
         operation_summary="Get a list of grades",
+        operation_description="Returns the grades of the teacher's courses or the student's own grades, optionally filtered by course, student, grade value and date range",
+        manual_parameters=[
+            openapi.Parameter('course', openapi.IN_QUERY, description="Course ID", type=openapi.TYPE_INTEGER),
+            openapi.Parameter('student', openapi.IN_QUERY, description="Student ID", type=openapi.TYPE_INTEGER),
+            openapi.Parameter('grade', openapi.IN_QUERY, description="Grade value, e.g. B+", type=openapi.TYPE_STRING),
+            openapi.Parameter('date_from', openapi.IN_QUERY, description="Earliest date (YYYY-MM-DD)", type=openapi.TYPE_STRING),
+            openapi.Parameter('date_to', openapi.IN_QUERY, description="Latest date (YYYY-MM-DD)", type=openapi.TYPE_STRING),
+            openapi.Parameter('ordering', openapi.IN_QUERY, description="Sort by date, grade or id (prefix with - for descending)", type=openapi.TYPE_STRING),
+        ],
         responses={200: GradeSerializer(many=True)}
     )
     def get(self, request, *args, **kwargs):
         logger.info("Fetching grade list")
-        cached_grades = cache.get('grade_list')
+        cache_key = query_cache_key(f'grade_list_{request.user.id}', request.query_params)
+        cached_grades = cache.get(cache_key)
         if cached_grades:
             logger.info("Grade list fetched from cache")
             return Response(cached_grades)
-        grades = self.get_queryset()
+        grades = self.filter_queryset(self.get_queryset())
         serializer = self.get_serializer(grades, many=True)
-        cache.set('grade_list', serializer.data, timeout=CACHE_TTL)
+        cache.set(cache_key, serializer.data, timeout=CACHE_TTL)
         logger.info("Grade list fetched from database and cached")
         return Response(serializer.data)
 
     @swagger_auto_schema(
         operation_summary="Add a grade",
         request_body=GradeSerializer,
-        responses={201: GradeSerializer}
+        responses={201: GradeSerializer},
+        manual_parameters=[IDEMPOTENCY_KEY_PARAMETER],
     )
+    @idempotent
     def post(self, request, *args, **kwargs):
         if request.user.role != 'teacher':
-            logger.error(f"User {request.user.id} is not authorized to add grades")
+            logger.error("User %s is not authorized to add grades", request.user.id)
             return Response({"error": "Only teachers can add grades"}, status=403)
 
         logger.info("Adding new grade")
         serializer = self.get_serializer(data=request.data)
         if serializer.is_valid():
             grade = serializer.save(teacher=request.user)
-            notify_student_about_new_grade.delay(
-                grade.student.user.email,
-                grade.course.name,
-                grade.grade
-            )
-            logger.info(f"Grade '{grade.grade}' added for student {grade.student.user.email}")
+            transaction.on_commit(lambda: notify_student_about_new_grade.delay(grade.id))
+            logger.info("Grade '%s' added for student %s", grade.grade, grade.student_id)
             return Response(serializer.data, status=201)
         return Response(serializer.errors, status=400)
 
 
 class GradeDetailView(RetrieveUpdateDestroyAPIView):
-    queryset = Grade.objects.all()
     serializer_class = GradeSerializer
     permission_classes = [IsAuthenticated]
 
+    def get_queryset(self):
+        return Grade.objects.for_user(self.request.user).select_related('student__user', 'teacher')
+
     @swagger_auto_schema(
         operation_summary="Update grade data",
         request_body=GradeSerializer,
@@ -68,11 +96,11 @@ class GradeDetailView(RetrieveUpdateDestroyAPIView):
     )
     def put(self, request, *args, **kwargs):
         if request.user.role != 'teacher':
-            logger.error(f"User {request.user.id} is not authorized to update grades")
+            logger.error("User %s is not authorized to update grades", request.user.id)
             return Response({"error": "Only teachers can update grades"}, status=403)
 
         pk = kwargs.get("pk")
-        logger.info(f"Updating grade {pk}")
+        logger.info("Updating grade %s", pk)
         try:
             grade = self.get_queryset().get(pk=pk)
             serializer = self.get_serializer(grade, data=request.data)
@@ -80,9 +108,20 @@ class GradeDetailView(RetrieveUpdateDestroyAPIView):
                 serializer.save()
                 cache.delete(f'grade_{pk}')
                 cache.set(f'grade_{pk}', serializer.data, timeout=CACHE_TTL)
-                logger.info(f"Grade {pk} updated and cached")
+                logger.info("Grade %s updated and cached", pk)
                 return Response(serializer.data)
             return Response(serializer.errors, status=400)
         except Grade.DoesNotExist:
-            logger.error(f"Grade {pk} not found")
+            logger.error("Grade %s not found", pk)
             return Response({"error": "Grade not found"}, status=404)
+
+    @swagger_auto_schema(
+        operation_summary="Delete a grade",
+        responses={204: "The grade has been successfully deleted"}
+    )
+    def delete(self, request, *args, **kwargs):
+        if request.user.role != 'teacher':
+            logger.error("User %s is not authorized to delete grades", request.user.id)
+            return Response({"error": "Only teachers can delete grades"}, status=403)
+
+        return super().delete(request, *args, **kwargs)
@@ -1,8 +1,23 @@
+"""
+Celery application.
+
+Each queue is served by its own worker pool, sized for its workload:
+
+    celery -A miniproject worker -Q transactional -c 8 -n transactional@%h
+    celery -A miniproject worker -Q bulk -c 2 --prefetch-multiplier 4 -n bulk@%h
+    celery -A miniproject worker -Q maintenance -c 1 -n maintenance@%h
+    celery -A miniproject beat --scheduler django_celery_beat.schedulers:DatabaseScheduler
+
+Routing, priorities, acknowledgement and time limits live in settings (CELERY_TASK_*).
+"""
 from __future__ import absolute_import, unicode_literals
 import os
 from celery import Celery
 
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'miniproject.settings')
+# Django's system checks load the URLconf, and with it every view, drf_yasg and djoser, which workers never
+# use. Web deploys run the checks (manage.py check --deploy); workers skip them.
+os.environ.setdefault('CELERY_SKIP_CHECKS', '1')
 
 app = Celery('miniproject')
 
@@ -11,6 +11,8 @@ https://docs.djangoproject.com/en/5.1/ref/settings/
 """
 
 from pathlib import Path
+from corsheaders.defaults import default_headers
+from kombu import Queue
 
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
 BASE_DIR = Path(__file__).resolve().parent.parent
@@ -31,7 +33,7 @@ ALLOWED_HOSTS = []
 # Application definition
 
 INSTALLED_APPS = [
-    'django.contrib.admin',
+    'django.contrib.admin.apps.SimpleAdminConfig',
     'django.contrib.auth',
     'django.contrib.contenttypes',
     'django.contrib.sessions',
@@ -48,14 +50,24 @@ INSTALLED_APPS = [
     'attendance',
     'notifications',
     'django_celery_beat',
-    'pytest_django',
     'analytics',
+    'core',
 
 ]
 
 AUTH_USER_MODEL = 'users.User'
 
+# Permissions every user of a role has in addition to their own and their groups' permissions.
+ROLE_PERMISSIONS = {
+    'admin': ['students.view_all_students', 'students.view_own_students'],
+    'teacher': ['students.view_all_students'],
+    'student': [],
+}
+ACCESS_CACHE_TTL = 60 * 60
+
 MIDDLEWARE = [
+    'core.middleware.MetricsMiddleware',
+    'analytics.middleware.ProfilingMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'corsheaders.middleware.CorsMiddleware',
@@ -91,14 +103,66 @@ CELERY_BROKER_URL = 'redis://localhost:6379/0'
 CELERY_ACCEPT_CONTENT = ['json']
 CELERY_TASK_SERIALIZER = 'json'
 
+# Three queues so large fan-out jobs never sit in front of single-user alerts:
+#   transactional - one email/notification for one user, latency sensitive
+#   bulk          - course-wide announcements and other fan-out work
+#   maintenance   - periodic rebuilds and cleanups
+# The Redis transport emulates priorities with one list per step; 0 is the highest.
+CELERY_TASK_QUEUES = (
+    Queue('transactional', routing_key='transactional'),
+    Queue('bulk', routing_key='bulk'),
+    Queue('maintenance', routing_key='maintenance'),
+)
+CELERY_TASK_DEFAULT_QUEUE = 'transactional'
+CELERY_TASK_DEFAULT_PRIORITY = 5
+CELERY_BROKER_TRANSPORT_OPTIONS = {
+    'priority_steps': list(range(10)),
+    'sep': ':',
+    'queue_order_strategy': 'priority',
+    'visibility_timeout': 60 * 60,
+}
+CELERY_TASK_ROUTES = {
+    'attendance.tasks.notify_student_about_absence': {'queue': 'transactional', 'priority': 0},
+    'grades.tasks.notify_student_about_new_grade': {'queue': 'transactional', 'priority': 1},
+    'students.tasks.notify_student_profile_update': {'queue': 'transactional', 'priority': 3},
+    'courses.tasks.process_enrollment_queue': {'queue': 'transactional', 'priority': 2},
+    'courses.tasks.notify_students_about_new_course': {'queue': 'bulk', 'priority': 5},
+    'notifications.tasks.create_course_notification': {'queue': 'bulk', 'priority': 5},
+    'analytics.tasks.*': {'queue': 'maintenance', 'priority': 9},
+    'notifications.tasks.cleanup_notifications': {'queue': 'maintenance', 'priority': 9},
+}
+# Each worker process reserves only one message at a time so a long bulk task cannot
+# hold other messages hostage. Time limits stay below the visibility timeout. Tasks
+# are acknowledged on receipt, so a killed worker never re-sends emails or
+# notifications; only tasks that are safe to re-run opt into acks_late.
+CELERY_WORKER_PREFETCH_MULTIPLIER = 1
+CELERY_TASK_SOFT_TIME_LIMIT = 60
+CELERY_TASK_TIME_LIMIT = 90
+CELERY_BEAT_SCHEDULE = {
+    'rebuild-student-course-stats': {
+        'task': 'analytics.tasks.rebuild_student_course_stats',
+        'schedule': 60 * 60 * 24,
+    },
+    # Safety net for queued enrollments whose scheduled drain was lost.
+    'drain-enrollment-queue': {
+        'task': 'courses.tasks.process_enrollment_queue',
+        'schedule': 60,
+    },
+    'cleanup-notifications': {
+        'task': 'notifications.tasks.cleanup_notifications',
+        'schedule': 60 * 60 * 24,
+    },
+}
+
 
 CORS_ALLOW_ALL_ORIGINS = True
+CORS_ALLOW_HEADERS = (*default_headers, 'idempotency-key')
 
 ROOT_URLCONF = 'miniproject.urls'
 
 CACHES = {
     'default': {
-        'BACKEND': 'django_redis.cache.RedisCache',
+        'BACKEND': 'core.cache.InstrumentedRedisCache',
         'LOCATION': 'redis://127.0.0.1:6379/1',
         'OPTIONS': {
             'CLIENT_CLASS': 'django_redis.client.DefaultClient',
@@ -109,6 +173,57 @@ CACHES = {
 
 CACHE_TTL = 60 * 5
 
+NOTIFICATION_STREAM_TIMEOUT = 60 * 5
+NOTIFICATION_STREAM_HEARTBEAT = 15
+# With pub/sub the stream only queries on a message, plus this safety-net re-check.
+NOTIFICATION_STREAM_RECONCILE_INTERVAL = 60 * 2
+NOTIFICATION_STREAM_TOKEN_TTL = 60
+NOTIFICATION_INBOX_SIZE = 100
+NOTIFICATION_MAX_PER_USER = 500
+NOTIFICATION_READ_RETENTION_DAYS = 30
+NOTIFICATION_CLEANUP_BATCH_SIZE = 1000
+
+TIMELINE_PAGE_SIZE = 20
+
+COURSE_SEARCH_PAGE_SIZE = 20
+
+ENROLLMENT_BATCH_LIMIT = 500
+ENROLLMENT_BATCH_SIZE = 500
+ENROLLMENT_QUEUE_ENABLED = False
+ENROLLMENT_QUEUE_BATCH_SIZE = 200
+# Batches one drain handles before scheduling another, so a run stays inside the task time limit.
+ENROLLMENT_QUEUE_MAX_BATCHES = 20
+# Seconds after which a claimed batch that was never finished goes back on the queue.
+ENROLLMENT_QUEUE_VISIBILITY_TIMEOUT = 5 * 60
+ENROLLMENT_QUEUE_DELAY = 1
+ENROLLMENT_TICKET_TTL = 60 * 60
+
+IDEMPOTENCY_TTL = 60 * 60 * 24
+IDEMPOTENCY_LOCK_TTL = 60
+
+PROFILING_ENABLED = False
+PROFILING_SAMPLE_RATE = 0.01
+PROFILING_HEADER = 'X-Profile'
+# Header value that lets a non-staff sender force profiling; None means staff and admins only.
+PROFILING_SECRET = None
+PROFILING_KEEP = 20
+PROFILING_TTL = 60 * 60 * 24
+
+API_DOCS_ENABLED = True
+OPENAPI_SCHEMA_PATH = BASE_DIR / 'openapi.json'
+OPENAPI_CACHE_TTL = 60 * 60
+
+SWAGGER_SETTINGS = {
+    'SPEC_URL': 'schema-json',
+}
+REDOC_SETTINGS = {
+    'SPEC_URL': 'schema-json',
+}
+
+METRICS_FLUSH_INTERVAL = 5
+# Bearer token Prometheus must send to /metrics; without one it is only served while DEBUG is on.
+METRICS_TOKEN = None
+
 TEMPLATES = [
     {
         'BACKEND': 'django.template.backends.django.DjangoTemplates',
@@ -181,51 +296,74 @@ STATIC_URL = 'static/'
 
 DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
 
+LOG_DIR = BASE_DIR / 'logs'
+LOG_DIR.mkdir(exist_ok=True)
+
+# Fraction of custom_logger info lines that are written; warnings and errors are always kept.
+LOG_INFO_SAMPLE_RATE = 0.1
+
 LOGGING = {
     'version': 1,
     'disable_existing_loggers': False,
     'formatters': {
-        'verbose': {
-            'format': '{levelname} {asctime} {module} {message}',
-            'style': '{',
+        'json': {
+            '()': 'core.logging.JSONFormatter',
         },
         'simple': {
             'format': '{levelname} {message}',
             'style': '{',
         },
     },
+    'filters': {
+        'sample_info': {
+            '()': 'core.logging.SamplingFilter',
+            'rate': LOG_INFO_SAMPLE_RATE,
+        },
+    },
     'handlers': {
         'file': {
             'level': 'INFO',
-            'class': 'logging.FileHandler',
-            'filename': 'logs/system.log',
-            'formatter': 'verbose',
+            'class': 'logging.handlers.RotatingFileHandler',
+            'filename': LOG_DIR / 'system.log',
+            'maxBytes': 50 * 1024 * 1024,
+            'backupCount': 5,
+            'delay': True,
+            'formatter': 'json',
         },
         'error_file': {
             'level': 'ERROR',
-            'class': 'logging.FileHandler',
-            'filename': 'logs/errors.log',
-            'formatter': 'verbose',
+            'class': 'logging.handlers.RotatingFileHandler',
+            'filename': LOG_DIR / 'errors.log',
+            'maxBytes': 50 * 1024 * 1024,
+            'backupCount': 5,
+            'delay': True,
+            'formatter': 'json',
         },
         'console': {
             'class': 'logging.StreamHandler',
             'formatter': 'simple',
         },
+        # Writes to the handlers above from a background thread; its name must sort after theirs.
+        'queue': {
+            'class': 'core.logging.BackgroundHandler',
+            'targets': ['cfg://handlers.file', 'cfg://handlers.error_file', 'cfg://handlers.console'],
+        },
     },
     'loggers': {
         'django': {
-            'handlers': ['file', 'console'],
+            'handlers': ['queue'],
             'level': 'INFO',
             'propagate': True,
         },
         'django.request': {
-            'handlers': ['error_file'],
+            'handlers': ['queue'],
             'level': 'ERROR',
             'propagate': False,
         },
         'custom_logger': {
-            'handlers': ['file', 'console'],
+            'handlers': ['queue'],
             'level': 'INFO',
+            'filters': ['sample_info'],
         },
     },
 }
@@ -1,19 +1,13 @@
 from django.contrib import admin
 from django.urls import path, include
-from rest_framework import permissions
-from drf_yasg.views import get_schema_view
-from drf_yasg import openapi
+from django.conf import settings
+from core.openapi import ui_view
+from core.views import MetricsView, OpenAPISchemaView
 
-schema_view = get_schema_view(
-    openapi.Info(
-        title="SMS API",
-        default_version='v1',
-        description="API documentation for SMS",
-        contact=openapi.Contact(email="admin@example.com"),
-    ),
-    public=True,
-    permission_classes=(permissions.AllowAny,),
-)
+DOCS_CACHE_TTL = getattr(settings, 'OPENAPI_CACHE_TTL', 3600)
+
+# The admin app is installed as SimpleAdminConfig so only processes that serve URLs import every admin module.
+admin.autodiscover()
 
 urlpatterns = [
     path('admin/', admin.site.urls),
@@ -26,7 +20,13 @@ urlpatterns = [
 
     path('api/auth/', include('djoser.urls')),
     path('api/auth/', include('djoser.urls.jwt')),
-    path('swagger/', schema_view.with_ui('swagger', cache_timeout=0), name='schema-swagger-ui'),
-    path('redoc/', schema_view.with_ui('redoc', cache_timeout=0), name='schema-redoc'),
     path('api/analytics/', include('analytics.urls')),
+    path('metrics', MetricsView.as_view(), name='metrics'),
 ]
+
+if getattr(settings, 'API_DOCS_ENABLED', True):
+    urlpatterns += [
+        path('openapi.json', OpenAPISchemaView.as_view(), name='schema-json'),
+        path('swagger/', ui_view('swagger', cache_timeout=DOCS_CACHE_TTL), name='schema-swagger-ui'),
+        path('redoc/', ui_view('redoc', cache_timeout=DOCS_CACHE_TTL), name='schema-redoc'),
+    ]
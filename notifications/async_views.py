@@ -0,0 +1,74 @@
+from django.conf import settings
+from django.core.handlers.asgi import ASGIRequest
+from django.http import JsonResponse, StreamingHttpResponse
+from core.async_views import AsyncAPIView
+from core.cache import aget, aset
+from core.logging import logger
+from .models import Notification
+from .serializers import NotificationSerializer
+from .stream import notification_events, read_stream_token
+from users.models import User
+
+CACHE_TTL = getattr(settings, 'CACHE_TTL', 300)
+INBOX_SIZE = getattr(settings, 'NOTIFICATION_INBOX_SIZE', 100)
+
+
+class AsyncNotificationListView(AsyncAPIView):
+    async def get(self, request):
+        logger.info("Fetching notifications for user %s (async)", request.user.id)
+        cache_key = f'notifications_{request.user.id}'
+        cached_notifications = await aget(cache_key)
+        if cached_notifications:
+            logger.info("Notifications fetched from cache")
+            return JsonResponse(cached_notifications, safe=False)
+
+        notifications = [
+            notification async for notification in
+            Notification.objects.filter(user=request.user).order_by('-created_at', '-id')[:INBOX_SIZE]
+        ]
+        data = NotificationSerializer(notifications, many=True).data
+        await aset(cache_key, data, timeout=CACHE_TTL)
+        logger.info("Notifications fetched from database and cached")
+        return JsonResponse(data, safe=False)
+
+
+class NotificationStreamView(AsyncAPIView):
+    """
+    Server-Sent Events stream of the user's notifications. Clients resume with
+    ``?since=<id>`` or the standard ``Last-Event-ID`` header after a reconnect.
+    Browsers authenticate with ``?token=`` from the stream token endpoint, as
+    EventSource cannot send headers; other clients may send their JWT.
+
+    The stream is only served over ASGI: under WSGI Django buffers an async
+    response until it ends, so no event would arrive before the timeout.
+    """
+
+    async def authenticate(self, request):
+        token = request.GET.get('token')
+        if token is None:
+            return await super().authenticate(request)
+        user_id = read_stream_token(token)
+        if user_id is None:
+            return None
+        return await User.objects.filter(pk=user_id, is_active=True).afirst()
+
+    async def dispatch(self, request, *args, **kwargs):
+        if not isinstance(request, ASGIRequest):
+            return JsonResponse({"error": "The notification stream is only served over ASGI."}, status=501)
+        return await super().dispatch(request, *args, **kwargs)
+
+    async def get(self, request):
+        since = request.GET.get('since') or request.headers.get('Last-Event-ID')
+        if since is None:
+            latest = await Notification.objects.filter(user=request.user).order_by('-id').values_list('id', flat=True).afirst()
+            since = latest or 0
+        try:
+            since = int(since)
+        except ValueError:
+            return JsonResponse({"error": "since must be a notification id"}, status=400)
+
+        logger.info("Opening notification stream for user %s since %s", request.user.id, since)
+        response = StreamingHttpResponse(notification_events(request.user.id, since), content_type='text/event-stream')
+        response['Cache-Control'] = 'no-cache'
+        response['X-Accel-Buffering'] = 'no'
+        return response
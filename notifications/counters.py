@@ -0,0 +1,31 @@
+from django.conf import settings
+from django.core.cache import cache
+from .models import Notification
+
+CACHE_TTL = getattr(settings, 'CACHE_TTL', 300)
+
+
+def unread_cache_key(user_id):
+    return f'notifications_unread_{user_id}'
+
+
+def get_unread_count(user_id):
+    """Returns the user's unread notification count, counting in the database only on a cache miss."""
+    count = cache.get(unread_cache_key(user_id))
+    if count is None:
+        count = Notification.objects.filter(user_id=user_id, read=False).count()
+        cache.set(unread_cache_key(user_id), count, timeout=CACHE_TTL)
+    return count
+
+
+def adjust_unread_count(user_id, delta):
+    """
+    Shifts a cached unread count by ``delta``. A missing key is left missing so
+    the next read recounts instead of starting from a wrong baseline.
+    """
+    if not delta:
+        return
+    try:
+        cache.incr(unread_cache_key(user_id), delta)
+    except ValueError:
+        pass
@@ -12,6 +12,12 @@ class Notification(models.Model):
     read = models.BooleanField(default=False)
     notification_type = models.CharField(max_length=20, choices=NOTIFICATION_TYPES, default='general')
 
+    class Meta:
+        indexes = [
+            models.Index(fields=['user', '-created_at'], name='notification_user_created_idx'),
+            models.Index(fields=['read', 'created_at'], name='notification_read_created_idx'),
+        ]
+
     def __str__(self):
         status = "Read" if self.read else "Unread"
         return f"Notification for {self.user.username}: {status}"
@@ -0,0 +1,47 @@
+from datetime import timedelta
+from django.core.cache import cache
+from django.db.models import Count
+from django.utils import timezone
+from .counters import unread_cache_key
+from .models import Notification
+
+
+def delete_in_chunks(queryset, batch_size):
+    """
+    Deletes the rows of ``queryset`` in primary-key batches so a cleanup run
+    never holds a long write lock or builds one huge ``IN`` list. The cached
+    inbox lists of the users a batch touched are dropped with it.
+    """
+    deleted = 0
+    while True:
+        rows = list(queryset.order_by('id').values_list('id', 'user_id')[:batch_size])
+        if not rows:
+            return deleted
+        count, _ = Notification.objects.filter(id__in=[pk for pk, _ in rows]).delete()
+        deleted += count
+        cache.delete_many([f'notifications_{user_id}' for user_id in {user_id for _, user_id in rows}])
+
+
+def expire_read_notifications(days, batch_size):
+    """Deletes read notifications older than ``days``; unread ones are never expired."""
+    cutoff = timezone.now() - timedelta(days=days)
+    return delete_in_chunks(Notification.objects.filter(read=True, created_at__lt=cutoff), batch_size)
+
+
+def trim_inboxes(max_per_user, batch_size):
+    """Keeps only the newest ``max_per_user`` notifications of every user."""
+    deleted = 0
+    oversized = (
+        Notification.objects.order_by().values('user_id')
+        .annotate(total=Count('id')).filter(total__gt=max_per_user)
+        .values_list('user_id', flat=True)
+    )
+    for user_id in oversized.iterator():
+        inbox = Notification.objects.filter(user_id=user_id)
+        oldest_kept = inbox.order_by('-created_at', '-id').values('created_at', 'id')[max_per_user - 1]
+        older = inbox.filter(created_at__lte=oldest_kept['created_at']).exclude(
+            created_at=oldest_kept['created_at'], id__gte=oldest_kept['id']
+        )
+        deleted += delete_in_chunks(older, batch_size)
+        cache.delete(unread_cache_key(user_id))
+    return deleted
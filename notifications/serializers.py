@@ -1,11 +1,21 @@
 from rest_framework import serializers
 from notifications.models import Notification
-from users.serializers import CustomUserSerializer
+
 
 class NotificationSerializer(serializers.ModelSerializer):
-    user = CustomUserSerializer()
+    user = serializers.PrimaryKeyRelatedField(read_only=True)
 
     class Meta:
         model = Notification
         fields = ['id', 'user', 'message', 'created_at', 'read']
         read_only_fields = ['created_at']
+
+
+class NotificationBulkSerializer(serializers.Serializer):
+    ACTIONS = (
+        ('mark_read', 'Mark as read'),
+        ('mark_unread', 'Mark as unread'),
+        ('delete', 'Delete'),
+    )
+    ids = serializers.ListField(child=serializers.IntegerField(), allow_empty=False, max_length=1000)
+    action = serializers.ChoiceField(choices=ACTIONS)
@@ -0,0 +1,22 @@
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models.signals import post_save
+from django.dispatch import receiver
+from .counters import adjust_unread_count
+from .models import Notification
+from .stream import publish_notification
+
+
+@receiver(post_save, sender=Notification)
+def publish_new_notification(sender, instance, created, **kwargs):
+    if created:
+        cache.delete(f'notifications_{instance.user_id}')
+        transaction.on_commit(lambda: announce_notification(instance))
+
+
+def announce_notification(notification):
+    # Counted only once the row is committed, so a rollback cannot leave the
+    # cached unread count one too high.
+    if not notification.read:
+        adjust_unread_count(notification.user_id, 1)
+    publish_notification(notification)
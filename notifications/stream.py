@@ -0,0 +1,127 @@
+import asyncio
+import json
+from django.conf import settings
+from django.core import signing
+from django.core.cache import caches
+from django_redis import get_redis_connection
+from django_redis.cache import RedisCache
+from core.cache import async_redis_client
+from core.logging import logger
+from .models import Notification
+
+
+STREAM_TOKEN_SALT = 'notifications.stream'
+
+
+def channel_name(user_id):
+    return f'notifications:{user_id}'
+
+
+def issue_stream_token(user_id):
+    """
+    A signed token that opens the user's stream for NOTIFICATION_STREAM_TOKEN_TTL
+    seconds. Browsers' EventSource cannot send an Authorization header, so the
+    token travels in the query string; it grants nothing but the stream.
+    """
+    return signing.TimestampSigner(salt=STREAM_TOKEN_SALT).sign(str(user_id))
+
+
+def read_stream_token(token):
+    """Returns the user id of a valid, unexpired stream token, or None."""
+    max_age = getattr(settings, 'NOTIFICATION_STREAM_TOKEN_TTL', 60)
+    try:
+        return int(signing.TimestampSigner(salt=STREAM_TOKEN_SALT).unsign(token, max_age=max_age))
+    except (signing.BadSignature, ValueError):
+        return None
+
+
+def notification_event(notification):
+    return {
+        'id': notification.id,
+        'message': notification.message,
+        'created_at': notification.created_at.isoformat(),
+        'read': notification.read,
+        'notification_type': notification.notification_type,
+    }
+
+
+def publish_notification(notification):
+    """Pushes a new notification to the owner's Redis channel; a no-op without a Redis cache."""
+    publish_notifications([notification])
+
+
+def publish_notifications(notifications):
+    """Publishes a batch of new notifications in one Redis round trip."""
+    if not notifications or not isinstance(caches['default'], RedisCache):
+        return
+    try:
+        pipeline = get_redis_connection('default').pipeline(transaction=False)
+        for notification in notifications:
+            pipeline.publish(channel_name(notification.user_id), json.dumps(notification_event(notification)))
+        pipeline.execute()
+    except Exception as e:
+        logger.error("Error publishing %d notifications: %s", len(notifications), e)
+
+
+def format_event(event):
+    return f"id: {event['id']}\nevent: notification\ndata: {json.dumps(event)}\n\n"
+
+
+async def notification_events(user_id, since):
+    """
+    Yields Server-Sent Events for a user: first every notification newer than
+    ``since``, then new ones as they appear. Published messages only wake the
+    stream up; each wake-up re-queries the rows newer than ``since`` that were
+    not sent yet, so a notification whose transaction commits after a higher id
+    was already sent is still delivered. Heartbeats without a message touch no
+    rows; the database is only reconciled every
+    NOTIFICATION_STREAM_RECONCILE_INTERVAL seconds in case a message was lost.
+    The channel is subscribed before the first query so nothing created in
+    between is lost. Without Redis the database is polled at the heartbeat
+    interval.
+    """
+    timeout = getattr(settings, 'NOTIFICATION_STREAM_TIMEOUT', 300)
+    heartbeat = getattr(settings, 'NOTIFICATION_STREAM_HEARTBEAT', 15)
+    reconcile_interval = getattr(settings, 'NOTIFICATION_STREAM_RECONCILE_INTERVAL', 120)
+    client = async_redis_client()
+    pubsub = None
+    if client is not None:
+        pubsub = client.pubsub()
+        await pubsub.subscribe(channel_name(user_id))
+
+    sent = set()
+
+    async def unsent_events():
+        rows = Notification.objects.filter(user_id=user_id, id__gt=since).exclude(id__in=sent).order_by('id')
+        async for notification in rows:
+            sent.add(notification.id)
+            yield format_event(notification_event(notification))
+
+    try:
+        async for event in unsent_events():
+            yield event
+
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + timeout
+        reconcile_at = loop.time() + reconcile_interval
+        while (remaining := deadline - loop.time()) > 0:
+            wait = min(heartbeat, remaining)
+            if pubsub is None:
+                await asyncio.sleep(wait)
+                query = True
+            else:
+                message = await pubsub.get_message(ignore_subscribe_messages=True, timeout=wait)
+                query = message is not None or loop.time() >= reconcile_at
+            delivered = False
+            if query:
+                if pubsub is not None:
+                    reconcile_at = loop.time() + reconcile_interval
+                async for event in unsent_events():
+                    yield event
+                    delivered = True
+            if not delivered:
+                yield ": keep-alive\n\n"
+    finally:
+        if pubsub is not None:
+            await pubsub.unsubscribe()
+            await pubsub.aclose()
@@ -1,16 +1,65 @@
 from celery import shared_task
+from celery.exceptions import SoftTimeLimitExceeded
+from django.conf import settings
+from django.core.cache import cache
+from .counters import unread_cache_key
 from .models import Notification
+from .retention import expire_read_notifications, trim_inboxes
+from .stream import publish_notifications
 from core.logging import logger
+from courses.cache import get_course
+from students.models import Student
 
-@shared_task
-def create_course_notification(course_name, user_ids):
+USER_BATCH_SIZE = 1000
+
+@shared_task(soft_time_limit=30 * 60, time_limit=35 * 60)
+def create_course_notification(course_id):
+    course = get_course(course_id)
+    if course is None:
+        logger.warning("Course %s no longer exists, skipping notifications", course_id)
+        return
+    course_name = course['name']
+    message = f"A new course '{course_name}' has been added. Check it out!"
+    try:
+        logger.info("Creating notifications for new course: %s", course_name)
+        user_ids = Student.objects.order_by('id').values_list('user_id', flat=True)
+        batch = []
+        for user_id in user_ids.iterator(chunk_size=USER_BATCH_SIZE):
+            batch.append(user_id)
+            if len(batch) == USER_BATCH_SIZE:
+                notify_users(batch, message)
+                batch = []
+        notify_users(batch, message)
+        logger.info("Notifications created for new course: %s", course_name)
+    except SoftTimeLimitExceeded:
+        raise
+    except Exception as e:
+        logger.error("Error creating notifications for new course %s: %s", course_name, e)
+
+
+def notify_users(user_ids, message):
+    """
+    Creates one notification per user with a single INSERT. bulk_create skips
+    post_save, so the inbox caches and unread counts are invalidated and the
+    stream is published here, once per batch.
+    """
+    if not user_ids:
+        return
+    notifications = Notification.objects.bulk_create(
+        [Notification(user_id=user_id, message=message) for user_id in user_ids]
+    )
+    cache.delete_many(
+        [f'notifications_{user_id}' for user_id in user_ids] + [unread_cache_key(user_id) for user_id in user_ids]
+    )
+    publish_notifications(notifications)
+
+@shared_task(soft_time_limit=30 * 60, time_limit=35 * 60, acks_late=True, reject_on_worker_lost=True)
+def cleanup_notifications():
     try:
-        logger.info(f"Creating notifications for new course: {course_name}")
-        for user_id in user_ids:
-            Notification.objects.create(
-                user_id=user_id,
-                message=f"A new course '{course_name}' has been added. Check it out!"
-            )
-        logger.info(f"Notifications created for new course: {course_name}")
+        logger.info("Cleaning up notifications")
+        batch_size = getattr(settings, 'NOTIFICATION_CLEANUP_BATCH_SIZE', 1000)
+        expired = expire_read_notifications(getattr(settings, 'NOTIFICATION_READ_RETENTION_DAYS', 30), batch_size)
+        trimmed = trim_inboxes(getattr(settings, 'NOTIFICATION_MAX_PER_USER', 500), batch_size)
+        logger.info("Notifications cleaned up: %s expired, %s trimmed", expired, trimmed, extra={'sample': False})
     except Exception as e:
-        logger.error(f"Error creating notifications for new course {course_name}: {e}")
+        logger.error("Error cleaning up notifications: %s", e)
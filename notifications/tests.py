@@ -1,9 +1,20 @@
+from datetime import timedelta
 import pytest
+from asgiref.sync import async_to_sync
+from django.core.cache import cache
+from django.test import AsyncClient, Client
+from django.utils import timezone
 from rest_framework.test import APIClient
+from rest_framework_simplejwt.tokens import AccessToken
 from unittest.mock import patch
 from notifications.models import Notification
 from users.models import User
-from notifications.tasks import create_course_notification
+from courses.models import Course
+from students.models import Student
+from notifications.tasks import create_course_notification, cleanup_notifications
+from notifications.stream import notification_events
+from notifications.counters import get_unread_count
+from core.testing import query_budget
 
 
 @pytest.mark.django_db
@@ -58,13 +69,184 @@ def test_delete_notification():
     assert Notification.objects.count() == 0
 
 
-@patch("notifications.tasks.Notification.objects.create")
-def test_create_course_notification_task(mock_create):
+@pytest.mark.django_db
+def test_create_course_notification_task():
+    teacher = User.objects.create_user(username="teacher", email="teacher@example.com", password="password123", role="teacher")
     user1 = User.objects.create_user(username="user1", email="user1@example.com", password="password123")
     user2 = User.objects.create_user(username="user2", email="user2@example.com", password="password456")
+    Student.objects.create(user=user1)
+    Student.objects.create(user=user2)
+    course = Course.objects.create(name="Python Course", description="Intro", instructor=teacher)
+    assert get_unread_count(user1.id) == 0
+
+    with query_budget(3):
+        create_course_notification(course.id)
+
+    notifications = Notification.objects.all()
+    assert {n.user_id for n in notifications} == {user1.id, user2.id}
+    assert all("Python Course" in n.message for n in notifications)
+    assert get_unread_count(user1.id) == 1
+
+
+@pytest.mark.django_db
+def test_async_notification_list():
+    user = User.objects.create_user(username="testuser", email="test@example.com", password="password123")
+    Notification.objects.create(user=user, message="Notification 1")
+    Notification.objects.create(user=user, message="Notification 2")
 
-    user_ids = [user1.id, user2.id]
-    create_course_notification("Python Course", user_ids)
+    client = Client(HTTP_AUTHORIZATION=f"Bearer {AccessToken.for_user(user)}")
+    response = client.get('/api/notifications/async/')
+
+    assert response.status_code == 200
+    data = response.json()
+    assert {n['message'] for n in data} == {"Notification 1", "Notification 2"}
+    assert data[0]['user'] == user.id
+
+
+@pytest.mark.django_db
+def test_notification_stream_catch_up(settings):
+    settings.NOTIFICATION_STREAM_TIMEOUT = 0
+    user = User.objects.create_user(username="testuser", email="test@example.com", password="password123")
+    first = Notification.objects.create(user=user, message="Notification 1")
+    Notification.objects.create(user=user, message="Notification 2")
+
+    headers = {"Authorization": f"Bearer {AccessToken.for_user(user)}"}
+
+    async def read_stream(path, **params):
+        response = await AsyncClient().get(path, params, headers=headers)
+        body = b"".join([chunk async for chunk in response.streaming_content]).decode()
+        return response, body
+
+    response, body = async_to_sync(read_stream)('/api/notifications/stream/', since=first.id)
+    assert response.status_code == 200
+    assert response['Content-Type'] == 'text/event-stream'
+    assert "Notification 2" in body
+    assert "Notification 1" not in body
+
+
+@pytest.mark.django_db
+def test_notification_stream_only_queries_on_messages(settings):
+    fakeredis = pytest.importorskip('fakeredis')
+    settings.NOTIFICATION_STREAM_TIMEOUT = 0.1
+    settings.NOTIFICATION_STREAM_HEARTBEAT = 0.01
+    user = User.objects.create_user(username="testuser", email="test@example.com", password="password123")
+
+    async def read_events():
+        return [event async for event in notification_events(user.id, 0)]
+
+    filter_ = Notification.objects.filter
+    with patch("notifications.stream.async_redis_client", return_value=fakeredis.aioredis.FakeRedis()), \
+            patch.object(Notification.objects, "filter", wraps=filter_) as mock_filter:
+        events = async_to_sync(read_events)()
+
+    assert mock_filter.call_count == 1
+    assert events and all(event == ": keep-alive\n\n" for event in events)
+
+
+@pytest.mark.django_db
+def test_notification_stream_token_and_asgi_only(settings):
+    settings.NOTIFICATION_STREAM_TIMEOUT = 0
+    user = User.objects.create_user(username="testuser", email="test@example.com", password="password123")
+    Notification.objects.create(user=user, message="Notification 1")
+
+    api = APIClient()
+    api.force_authenticate(user=user)
+    token = api.post('/api/notifications/stream/token/').data['token']
+
+    async def read_stream(params):
+        response = await AsyncClient().get('/api/notifications/stream/', params)
+        if response.status_code != 200:
+            return response, None
+        return response, b"".join([chunk async for chunk in response.streaming_content]).decode()
+
+    response, body = async_to_sync(read_stream)({"token": token, "since": 0})
+    assert response.status_code == 200
+    assert "Notification 1" in body
+
+    response, _ = async_to_sync(read_stream)({"token": token + "x"})
+    assert response.status_code == 401
+
+    settings.NOTIFICATION_STREAM_TOKEN_TTL = -1
+    response, _ = async_to_sync(read_stream)({"token": token})
+    assert response.status_code == 401
+
+    response = Client(HTTP_AUTHORIZATION=f"Bearer {AccessToken.for_user(user)}").get('/api/notifications/stream/')
+    assert response.status_code == 501
+
+
+@pytest.mark.django_db
+def test_unread_count_and_bulk_mark_read(django_assert_num_queries, django_capture_on_commit_callbacks):
+    user = User.objects.create_user(username="testuser", email="test@example.com", password="password123")
+    other = User.objects.create_user(username="other", email="other@example.com", password="password123")
+    notifications = [Notification.objects.create(user=user, message=f"Notification {i}") for i in range(3)]
+    foreign = Notification.objects.create(user=other, message="Not yours")
+
+    client = APIClient()
+    client.force_authenticate(user=user)
+    response = client.get('/api/notifications/unread-count/')
+    assert response.data['unread'] == 3
+
+    response = client.post('/api/notifications/bulk/', {
+        "ids": [notifications[0].id, notifications[1].id, foreign.id],
+        "action": "mark_read",
+    }, format='json')
+    assert response.status_code == 200
+    assert response.data['count'] == 2
+    foreign.refresh_from_db()
+    assert foreign.read is False
+
+    with django_capture_on_commit_callbacks(execute=True):
+        Notification.objects.create(user=user, message="Fresh")
+    with django_assert_num_queries(1):
+        response = client.get('/api/notifications/unread-count/')
+    assert response.data['unread'] == 2
+
+    response = client.post('/api/notifications/bulk/', {
+        "ids": [n.id for n in notifications], "action": "delete",
+    }, format='json')
+    assert response.data['count'] == 3
+    response = client.get('/api/notifications/unread-count/')
+    assert response.data['unread'] == 1
+
+
+@pytest.mark.django_db
+def test_cleanup_notifications_task(settings):
+    settings.NOTIFICATION_MAX_PER_USER = 3
+    settings.NOTIFICATION_READ_RETENTION_DAYS = 30
+    settings.NOTIFICATION_CLEANUP_BATCH_SIZE = 2
+    user = User.objects.create_user(username="testuser", email="test@example.com", password="password123")
+    other = User.objects.create_user(username="other", email="other@example.com", password="password123")
+    old_read = Notification.objects.create(user=other, message="Old read", read=True)
+    old_unread = Notification.objects.create(user=other, message="Old unread")
+    Notification.objects.filter(id__in=[old_read.id, old_unread.id]).update(
+        created_at=timezone.now() - timedelta(days=60)
+    )
+    inbox = [Notification.objects.create(user=user, message=f"Notification {i}") for i in range(5)]
+    client = APIClient()
+    for owner in (user, other):
+        client.force_authenticate(user=owner)
+        client.get('/api/notifications/')
+        assert cache.get(f'notifications_{owner.id}') is not None
+
+    cleanup_notifications()
+
+    assert not Notification.objects.filter(id=old_read.id).exists()
+    assert Notification.objects.filter(id=old_unread.id).exists()
+    assert set(Notification.objects.filter(user=user).values_list('id', flat=True)) == {n.id for n in inbox[2:]}
+    assert cache.get(f'notifications_{user.id}') is None
+    assert cache.get(f'notifications_{other.id}') is None
+
+
+@pytest.mark.django_db
+def test_notification_list_is_capped():
+    user = User.objects.create_user(username="testuser", email="test@example.com", password="password123")
+    notifications = [Notification.objects.create(user=user, message=f"Notification {i}") for i in range(5)]
+
+    client = APIClient()
+    client.force_authenticate(user=user)
+    with patch("notifications.views.INBOX_SIZE", 2):
+        response = client.get('/api/notifications/')
+        assert [n['id'] for n in response.json()] == [notifications[4].id, notifications[3].id]
 
-    assert mock_create.call_count == 2
-    assert mock_create.called
+        response = client.get('/api/notifications/', {"before": notifications[3].id})
+        assert [n['id'] for n in response.json()] == [notifications[2].id, notifications[1].id]
@@ -1,6 +1,13 @@
 from django.urls import path
-from .views import NotificationListView
+from .views import NotificationListView, NotificationDetailView, NotificationUnreadCountView, NotificationBulkView, NotificationStreamTokenView
+from .async_views import AsyncNotificationListView, NotificationStreamView
 
 urlpatterns = [
     path('', NotificationListView.as_view(), name='notification-list'),
+    path('<int:pk>/', NotificationDetailView.as_view(), name='notification-detail'),
+    path('unread-count/', NotificationUnreadCountView.as_view(), name='notification-unread-count'),
+    path('bulk/', NotificationBulkView.as_view(), name='notification-bulk'),
+    path('async/', AsyncNotificationListView.as_view(), name='notification-list-async'),
+    path('stream/', NotificationStreamView.as_view(), name='notification-stream'),
+    path('stream/token/', NotificationStreamTokenView.as_view(), name='notification-stream-token'),
 ]
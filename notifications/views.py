@@ -4,11 +4,15 @@ from rest_framework.views import APIView
 from rest_framework.response import Response
 from rest_framework.permissions import IsAuthenticated
 from drf_yasg.utils import swagger_auto_schema
+from drf_yasg import openapi
 from .models import Notification
-from .serializers import NotificationSerializer
+from .serializers import NotificationSerializer, NotificationBulkSerializer
+from .counters import adjust_unread_count, get_unread_count, unread_cache_key
+from .stream import issue_stream_token
 from core.logging import logger
 
 CACHE_TTL = getattr(settings, 'CACHE_TTL', 300)
+INBOX_SIZE = getattr(settings, 'NOTIFICATION_INBOX_SIZE', 100)
 
 
 class NotificationListView(APIView):
@@ -16,23 +20,41 @@ class NotificationListView(APIView):
 
     @swagger_auto_schema(
         operation_summary="Get a list of notifications",
+        operation_description="Returns the newest notifications of the user. Older ones are fetched page by page with the before parameter.",
+        manual_parameters=[
+            openapi.Parameter(
+                'before',
+                openapi.IN_QUERY,
+                description="Return notifications older than this notification ID",
+                type=openapi.TYPE_INTEGER
+            ),
+        ],
         responses={200: NotificationSerializer(many=True)}
     )
     def get(self, request):
+        before = request.query_params.get('before')
+        if before is not None:
+            if not before.isdigit():
+                return Response({"error": "before must be a notification id"}, status=400)
+            logger.info("Fetching notifications for user %s before %s", request.user.id, before)
+            notifications = Notification.objects.filter(
+                user=request.user, id__lt=before
+            ).order_by('-created_at', '-id')[:INBOX_SIZE]
+            return Response(NotificationSerializer(notifications, many=True).data)
         try:
-            logger.info(f"Fetching notifications for user {request.user.id}")
+            logger.info("Fetching notifications for user %s", request.user.id)
             cached_notifications = cache.get(f'notifications_{request.user.id}')
             if cached_notifications:
                 logger.info("Notifications fetched from cache")
                 return Response(cached_notifications)
 
-            notifications = Notification.objects.filter(user=request.user).order_by('-created_at')
+            notifications = Notification.objects.filter(user=request.user).order_by('-created_at', '-id')[:INBOX_SIZE]
             serializer = NotificationSerializer(notifications, many=True)
             cache.set(f'notifications_{request.user.id}', serializer.data, timeout=CACHE_TTL)
             logger.info("Notifications fetched from database and cached")
             return Response(serializer.data)
         except Exception as e:
-            logger.error(f"Error fetching notifications: {e}")
+            logger.error("Error fetching notifications: %s", e)
             return Response({"error": "An error occurred while fetching notifications"}, status=500)
 
     @swagger_auto_schema(
@@ -46,7 +68,7 @@ class NotificationListView(APIView):
         if serializer.is_valid():
             notification = serializer.save(user=request.user)
             cache.delete(f'notifications_{request.user.id}')
-            logger.info(f"Notification created for user {request.user.id}: {notification}")
+            logger.info("Notification created for user %s: %s", request.user.id, notification)
             return Response(serializer.data, status=201)
         logger.error("Invalid notification data")
         return Response(serializer.errors, status=400)
@@ -62,17 +84,19 @@ class NotificationDetailView(APIView):
     )
     def put(self, request, pk):
         try:
-            logger.info(f"Updating notification {pk}")
+            logger.info("Updating notification %s", pk)
             notification = Notification.objects.get(pk=pk, user=request.user)
+            was_read = notification.read
             serializer = NotificationSerializer(notification, data=request.data, partial=True)
             if serializer.is_valid():
                 serializer.save()
+                adjust_unread_count(request.user.id, int(was_read) - int(notification.read))
                 cache.delete(f'notifications_{request.user.id}')
-                logger.info(f"Notification {pk} updated")
+                logger.info("Notification %s updated", pk)
                 return Response(serializer.data)
             return Response(serializer.errors, status=400)
         except Notification.DoesNotExist:
-            logger.error(f"Notification {pk} not found")
+            logger.error("Notification %s not found", pk)
             return Response({"error": "Notification not found"}, status=404)
 
     @swagger_auto_schema(
@@ -81,12 +105,76 @@ class NotificationDetailView(APIView):
     )
     def delete(self, request, pk):
         try:
-            logger.info(f"Deleting notification {pk}")
+            logger.info("Deleting notification %s", pk)
             notification = Notification.objects.get(pk=pk, user=request.user)
             notification.delete()
+            if not notification.read:
+                adjust_unread_count(request.user.id, -1)
             cache.delete(f'notifications_{request.user.id}')
-            logger.info(f"Notification {pk} deleted")
+            logger.info("Notification %s deleted", pk)
             return Response({"message": "Notification deleted successfully"}, status=204)
         except Notification.DoesNotExist:
-            logger.error(f"Notification {pk} not found")
+            logger.error("Notification %s not found", pk)
             return Response({"error": "Notification not found"}, status=404)
+
+
+class NotificationUnreadCountView(APIView):
+    permission_classes = [IsAuthenticated]
+
+    @swagger_auto_schema(
+        operation_summary="Get the number of unread notifications",
+        operation_description="Returns the unread notification count for the badge, served from the cache",
+        responses={200: "Unread notification count"}
+    )
+    def get(self, request):
+        return Response({"unread": get_unread_count(request.user.id)})
+
+
+class NotificationBulkView(APIView):
+    permission_classes = [IsAuthenticated]
+
+    @swagger_auto_schema(
+        operation_summary="Update or delete several notifications",
+        operation_description="Marks the given notifications as read or unread, or deletes them, with a single query",
+        request_body=NotificationBulkSerializer,
+        responses={200: "Number of affected notifications"}
+    )
+    def post(self, request):
+        serializer = NotificationBulkSerializer(data=request.data)
+        if not serializer.is_valid():
+            return Response(serializer.errors, status=400)
+        ids = serializer.validated_data['ids']
+        action = serializer.validated_data['action']
+        logger.info("Applying '%s' to %s notifications of user %s", action, len(ids), request.user.id)
+
+        notifications = Notification.objects.filter(user=request.user, id__in=ids)
+        if action == 'mark_read':
+            count = notifications.filter(read=False).update(read=True)
+            adjust_unread_count(request.user.id, -count)
+        elif action == 'mark_unread':
+            count = notifications.filter(read=True).update(read=False)
+            adjust_unread_count(request.user.id, count)
+        else:
+            count, _ = notifications.delete()
+            cache.delete(unread_cache_key(request.user.id))
+        cache.delete(f'notifications_{request.user.id}')
+        logger.info("'%s' applied to %s notifications of user %s", action, count, request.user.id)
+        return Response({"action": action, "count": count})
+
+
+class NotificationStreamTokenView(APIView):
+    permission_classes = [IsAuthenticated]
+
+    @swagger_auto_schema(
+        operation_summary="Get a notification stream token",
+        operation_description=(
+            "Returns a short-lived token that opens the user's notification stream as "
+            "/api/notifications/stream/?token=<token>, for browser EventSource clients that cannot send headers"
+        ),
+        responses={200: "Stream token and its lifetime in seconds"}
+    )
+    def post(self, request):
+        return Response({
+            'token': issue_stream_token(request.user.id),
+            'expires_in': getattr(settings, 'NOTIFICATION_STREAM_TOKEN_TTL', 60),
+        })
@@ -1,11 +1,32 @@
 from django.db import models
 from users.models import User
+from users.access import get_access
+
+class StudentQuerySet(models.QuerySet):
+    def for_user(self, user):
+        """
+        Students a user may list: administrators see every profile, holders of
+        view_all_students every student, holders of view_own_students those
+        enrolled in their courses, and students only themselves.
+        """
+        access = get_access(user)
+        if access.is_admin:
+            return self.all()
+        if access.has_perm('students.view_all_students'):
+            return self.filter(user__role='student')
+        if access.has_perm('students.view_own_students'):
+            return self.filter(enrollment__course__instructor=user).distinct()
+        if access.is_student:
+            return self.filter(user=user)
+        return self.none()
 
 class Student(models.Model):
     user = models.OneToOneField(User, on_delete=models.CASCADE, related_name='student_profile')
     dob = models.DateField(null=True, blank=True, verbose_name="Date of Birth")
     registration_date = models.DateField(auto_now_add=True)
 
+    objects = StudentQuerySet.as_manager()
+
     def __str__(self):
         return f"{self.user.username} - {self.user.email}"
 
@@ -1,5 +1,6 @@
 from rest_framework.permissions import BasePermission
+from users.access import get_access
 
 class IsAdminOrTeacher(BasePermission):
     def has_permission(self, request, view):
-        return request.user.is_authenticated and request.user.role in ['admin', 'teacher']
+        return get_access(request.user).role in ['admin', 'teacher']
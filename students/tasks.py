@@ -1,11 +1,16 @@
 from celery import shared_task
 from core.logging import logger
 from django.core.mail import send_mail
+from students.models import Student
 
 @shared_task
-def notify_student_profile_update(student_email):
+def notify_student_profile_update(student_id):
+    student_email = Student.objects.filter(pk=student_id).values_list('user__email', flat=True).first()
+    if student_email is None:
+        logger.warning("Student %s no longer exists, skipping notification", student_id)
+        return
     try:
-        logger.info(f"Sending profile update notification to {student_email}")
+        logger.info("Sending profile update notification to %s", student_email)
         send_mail(
             'Profile Updated',
             'Your student profile has been updated.',
@@ -13,6 +18,6 @@ def notify_student_profile_update(student_email):
             [student_email],
             fail_silently=False,
         )
-        logger.info(f"Profile update notification sent to {student_email}")
+        logger.info("Profile update notification sent to %s", student_email)
     except Exception as e:
-        logger.error(f"Error sending profile update notification to {student_email}: {e}")
+        logger.error("Error sending profile update notification to %s: %s", student_email, e)
@@ -4,6 +4,7 @@ from rest_framework.test import APIClient
 from students.tasks import notify_student_profile_update
 from users.models import User
 from students.models import Student
+from core.testing import query_budget
 
 @pytest.mark.django_db
 def test_student_creation():
@@ -40,10 +41,13 @@ def test_student_list_as_teacher():
     data = response.json()
     assert len(data) == 2
 
+@pytest.mark.django_db
 @patch("students.tasks.send_mail")
 def test_notify_student_profile_update(mock_send_mail):
     student_email = "student@example.com"
-    notify_student_profile_update(student_email)
+    user = User.objects.create_user(username="studentuser", email=student_email, password="password123", role="student")
+    student = Student.objects.create(user=user)
+    notify_student_profile_update(student.id)
     mock_send_mail.assert_called_once_with(
         'Profile Updated',
         'Your student profile has been updated.',
@@ -51,3 +55,68 @@ def test_notify_student_profile_update(mock_send_mail):
         [student_email],
         fail_silently=False
     )
+
+
+@pytest.mark.django_db
+def test_student_list_query_budget(seeded_data):
+    client = APIClient()
+    client.force_authenticate(user=User.objects.get(pk=seeded_data['admin']))
+
+    with query_budget(2, max_ms=500, label='/api/students/'):
+        response = client.get('/api/students/')
+
+    assert response.status_code == 200
+    assert len(response.data) == Student.objects.count()
+
+
+@pytest.mark.django_db
+def test_student_timeline_merges_sources_with_cursor(django_assert_max_num_queries):
+    from datetime import date, datetime, timezone
+    from attendance.models import Attendance
+    from courses.models import Course, Enrollment
+    from grades.models import Grade
+    from notifications.models import Notification
+
+    teacher = User.objects.create_user(username="teacher", email="teacher@example.com", password="password123", role="teacher")
+    other_teacher = User.objects.create_user(username="other", email="other@example.com", password="password123", role="teacher")
+    user = User.objects.create_user(username="student", email="student@example.com", password="password123", role="student")
+    student = Student.objects.create(user=user)
+    course = Course.objects.create(name="Math 101", instructor=teacher)
+    other_course = Course.objects.create(name="Art", instructor=other_teacher)
+
+    enrollment = Enrollment.objects.create(student=student, course=course)
+    Enrollment.objects.filter(pk=enrollment.pk).update(enrollment_date=date(2024, 9, 1))
+    first = Grade.objects.create(student=student, course=course, grade="A", teacher=teacher)
+    second = Grade.objects.create(student=student, course=other_course, grade="B", teacher=other_teacher)
+    Grade.objects.filter(pk__in=[first.pk, second.pk]).update(date=date(2024, 9, 3))
+    attendance = Attendance.objects.create(student=student, course=course, status=True)
+    Attendance.objects.filter(pk=attendance.pk).update(date=date(2024, 9, 2))
+    notification = Notification.objects.create(user=user, message="Welcome")
+    Notification.objects.filter(pk=notification.pk).update(created_at=datetime(2024, 9, 2, 12, tzinfo=timezone.utc))
+
+    expected = [
+        ('grade', second.pk), ('grade', first.pk), ('notification', notification.pk),
+        ('attendance', attendance.pk), ('enrollment', enrollment.pk),
+    ]
+    client = APIClient()
+    client.force_authenticate(user=user)
+    seen, cursor = [], None
+    while True:
+        params = {'limit': 2, **({'cursor': cursor} if cursor else {})}
+        with django_assert_max_num_queries(6):
+            response = client.get('/api/students/me/timeline/', params)
+        assert response.status_code == 200
+        assert len(response.data['results']) <= 2
+        seen += [(item['type'], item['id']) for item in response.data['results']]
+        cursor = response.data['next']
+        if cursor is None:
+            break
+    assert seen == expected
+
+    client.force_authenticate(user=teacher)
+    response = client.get(f'/api/students/{student.pk}/timeline/')
+    assert [(item['type'], item['id']) for item in response.data['results']] == [
+        ('grade', first.pk), ('attendance', attendance.pk), ('enrollment', enrollment.pk),
+    ]
+    assert response.data['next'] is None
+    assert client.get(f'/api/students/{student.pk}/timeline/', {'cursor': 'garbage'}).status_code == 400
@@ -0,0 +1,156 @@
+"""
+A student's grades, attendance, enrollments and notifications as one feed,
+newest first. Each source is read with its own indexed query that starts
+after the cursor and stops one row past the page, and the sources are
+k-way merged on ``(at, type, id)``, so a page costs one short query per
+source however long the history is. Date-only rows are placed at midnight
+UTC of their day. The cursor is the key of the last row of the page.
+"""
+import base64
+import heapq
+import json
+from datetime import datetime, time, timezone
+from itertools import islice
+
+from django.db.models import Q
+
+from attendance.models import Attendance
+from courses.models import Enrollment
+from grades.models import Grade
+from notifications.models import Notification
+
+
+class TimelineSource:
+    """One kind of timeline row: ``queryset(viewer, student)`` returns the rows, ordered by ``field`` and id."""
+    name = None
+    field = None
+    is_date = True
+    values = ()
+
+    def queryset(self, viewer, student):
+        raise NotImplementedError
+
+    def at(self, row):
+        value = row[self.field]
+        return datetime.combine(value, time.min, tzinfo=timezone.utc) if self.is_date else value
+
+    def after(self, cursor):
+        """Q matching the rows that come after ``cursor`` in newest-first order, or None if none can."""
+        at, name, pk = cursor
+        if name > self.name:
+            tie = Q()
+        elif name == self.name:
+            tie = Q(id__lt=pk)
+        else:
+            tie = None
+        if self.is_date:
+            day = at.astimezone(timezone.utc).date()
+            if self.at({self.field: day}) != at:
+                # The cursor falls inside the day, so the whole day is older than it.
+                return Q(**{f'{self.field}__lte': day})
+            at = day
+        older = Q(**{f'{self.field}__lt': at})
+        return older if tie is None else older | (Q(**{self.field: at}) & tie)
+
+    def fetch(self, viewer, student, cursor, size):
+        rows = self.queryset(viewer, student)
+        if cursor is not None:
+            rows = rows.filter(self.after(cursor))
+        rows = rows.order_by(f'-{self.field}', '-id').values(*self.values)[:size]
+        return [((self.at(row), self.name, row['id']), self.item(row)) for row in rows]
+
+    def item(self, row):
+        return {
+            'type': self.name,
+            'id': row['id'],
+            'at': self.at(row).isoformat(),
+            'course': {'id': row['course_id'], 'name': row['course__name']},
+        }
+
+
+class GradeSource(TimelineSource):
+    name = 'grade'
+    field = 'date'
+    values = ('id', 'date', 'grade', 'comment', 'course_id', 'course__name')
+
+    def queryset(self, viewer, student):
+        return Grade.objects.for_user(viewer).filter(student=student)
+
+    def item(self, row):
+        return {**super().item(row), 'grade': row['grade'], 'comment': row['comment']}
+
+
+class AttendanceSource(TimelineSource):
+    name = 'attendance'
+    field = 'date'
+    values = ('id', 'date', 'status', 'course_id', 'course__name')
+
+    def queryset(self, viewer, student):
+        return Attendance.objects.for_user(viewer).filter(student=student)
+
+    def item(self, row):
+        return {**super().item(row), 'status': row['status']}
+
+
+class EnrollmentSource(TimelineSource):
+    name = 'enrollment'
+    field = 'enrollment_date'
+    values = ('id', 'enrollment_date', 'course_id', 'course__name')
+
+    def queryset(self, viewer, student):
+        return Enrollment.objects.for_user(viewer).filter(student=student)
+
+
+class NotificationSource(TimelineSource):
+    name = 'notification'
+    field = 'created_at'
+    is_date = False
+    values = ('id', 'created_at', 'message', 'notification_type', 'read')
+
+    def queryset(self, viewer, student):
+        # Notifications are personal; other viewers see the academic record only.
+        if viewer.pk != student.user_id:
+            return Notification.objects.none()
+        return Notification.objects.filter(user_id=student.user_id)
+
+    def item(self, row):
+        return {
+            'type': self.name,
+            'id': row['id'],
+            'at': self.at(row).isoformat(),
+            'message': row['message'],
+            'notification_type': row['notification_type'],
+            'read': row['read'],
+        }
+
+
+SOURCES = [GradeSource(), AttendanceSource(), EnrollmentSource(), NotificationSource()]
+
+
+def encode_cursor(key):
+    at, name, pk = key
+    return base64.urlsafe_b64encode(json.dumps([at.isoformat(), name, pk]).encode()).decode()
+
+
+def decode_cursor(value):
+    """Parses a cursor from ``encode_cursor``; raises ValueError for anything else."""
+    try:
+        at, name, pk = json.loads(base64.urlsafe_b64decode(value.encode()))
+        at = datetime.fromisoformat(at)
+    except (TypeError, ValueError, UnicodeError) as e:
+        raise ValueError("Invalid cursor") from e
+    if at.tzinfo is None or not isinstance(name, str) or not isinstance(pk, int):
+        raise ValueError("Invalid cursor")
+    return at, name, pk
+
+
+def build_timeline(viewer, student, cursor=None, limit=20):
+    """Returns one page of ``student``'s timeline as seen by ``viewer`` and the cursor of the next page."""
+    per_source = [
+        source.fetch(viewer, student, cursor, limit + 1)
+        for source in SOURCES
+    ]
+    merged = list(islice(heapq.merge(*per_source, key=lambda entry: entry[0], reverse=True), limit + 1))
+    page = merged[:limit]
+    next_cursor = encode_cursor(page[-1][0]) if len(merged) > limit else None
+    return [item for _, item in page], next_cursor
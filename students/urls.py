@@ -1,8 +1,10 @@
 from django.urls import path
-from .views import StudentListView, StudentDetailView
+from .views import StudentListView, StudentDetailView, StudentTimelineView
 
 urlpatterns = [
     path('', StudentListView.as_view(), name='student-list'),
     path('<int:pk>/', StudentDetailView.as_view(), name='student-detail'),
+    path('<int:pk>/timeline/', StudentTimelineView.as_view(), name='student-timeline'),
+    path('me/timeline/', StudentTimelineView.as_view(), name='student-timeline-me'),
 ]
 
@@ -1,32 +1,33 @@
 from rest_framework.generics import ListCreateAPIView, RetrieveUpdateDestroyAPIView
+from rest_framework.views import APIView
 from drf_yasg.utils import swagger_auto_schema
+from drf_yasg import openapi
 from django.core.cache import cache
 from django.conf import settings
+from django.db import transaction
 from rest_framework.permissions import IsAuthenticated
 from .models import Student
 from .serializers import StudentSerializer
+from .timeline import build_timeline, decode_cursor
 from students.tasks import notify_student_profile_update
 from core.logging import logger
 from rest_framework.response import Response
 from .permissions import IsAdminOrTeacher
 
 CACHE_TTL = getattr(settings, 'CACHE_TTL', 300)
+TIMELINE_PAGE_SIZE = getattr(settings, 'TIMELINE_PAGE_SIZE', 20)
+TIMELINE_MAX_PAGE_SIZE = 100
 
 class StudentListView(ListCreateAPIView):
     serializer_class = StudentSerializer
     permission_classes = [IsAuthenticated, IsAdminOrTeacher]
 
     def get_queryset(self):
-        user = self.request.user
-        if user.role == 'admin':
-            return Student.objects.all()
-        elif user.role == 'teacher':
-            return Student.objects.filter(user__role='student')
-        return Student.objects.none()
+        return Student.objects.for_user(self.request.user).select_related('user')
 
     @swagger_auto_schema(
         operation_summary="Get a list of students",
-        operation_description="Returns a list of all students. The administrator sees everyone, the teacher sees only the students.",
+        operation_description="Returns a list of students. The administrator sees everyone, a teacher sees all students or, with only the view_own_students permission, the students enrolled in their courses.",
         responses={200: StudentSerializer(many=True)}
     )
     def get(self, request, *args, **kwargs):
@@ -44,7 +45,7 @@ class StudentListView(ListCreateAPIView):
 
 
 class StudentDetailView(RetrieveUpdateDestroyAPIView):
-    queryset = Student.objects.all()
+    queryset = Student.objects.select_related('user')
     serializer_class = StudentSerializer
     permission_classes = [IsAuthenticated, IsAdminOrTeacher]
 
@@ -56,18 +57,56 @@ class StudentDetailView(RetrieveUpdateDestroyAPIView):
     )
     def put(self, request, *args, **kwargs):
         pk = kwargs.get("pk")
-        logger.info(f"Updating student {pk}")
+        logger.info("Updating student %s", pk)
         try:
             student = self.get_queryset().get(pk=pk)
             serializer = self.get_serializer(student, data=request.data)
             if serializer.is_valid():
                 serializer.save()
-                notify_student_profile_update.delay(student.user.email)
+                transaction.on_commit(lambda: notify_student_profile_update.delay(student.id))
                 cache.delete(f'student_{pk}')
                 cache.set(f'student_{pk}', serializer.data, timeout=CACHE_TTL)
-                logger.info(f"Student {pk} updated and cached")
+                logger.info("Student %s updated and cached", pk)
                 return Response(serializer.data)
             return Response(serializer.errors, status=400)
         except Student.DoesNotExist:
-            logger.error(f"Student {pk} not found")
+            logger.error("Student %s not found", pk)
             return Response({"error": "Student not found"}, status=404)
+
+
+class StudentTimelineView(APIView):
+    permission_classes = [IsAuthenticated]
+
+    @swagger_auto_schema(
+        operation_summary="Get a student's timeline",
+        operation_description=(
+            "Returns the student's grades, attendance, enrollments and, for the student themselves, notifications "
+            "as one feed, newest first. Teachers only see rows of their own courses. Pass the returned next cursor "
+            "to get the following page; use `me` instead of an ID for the current student."
+        ),
+        manual_parameters=[
+            openapi.Parameter('cursor', openapi.IN_QUERY, description="Cursor of the page to fetch", type=openapi.TYPE_STRING),
+            openapi.Parameter('limit', openapi.IN_QUERY, description=f"Page size, at most {TIMELINE_MAX_PAGE_SIZE}", type=openapi.TYPE_INTEGER),
+        ],
+        responses={200: "Timeline page with results and next cursor"}
+    )
+    def get(self, request, pk=None):
+        students = Student.objects.filter(user=request.user) if pk is None else Student.objects.for_user(request.user).filter(pk=pk)
+        student = students.first()
+        if student is None:
+            logger.error("Student %s not found for timeline", pk if pk is not None else 'me')
+            return Response({"error": "Student not found"}, status=404)
+
+        limit = request.query_params.get('limit', str(TIMELINE_PAGE_SIZE))
+        if not limit.isdigit() or not 1 <= int(limit) <= TIMELINE_MAX_PAGE_SIZE:
+            return Response({"error": f"limit must be between 1 and {TIMELINE_MAX_PAGE_SIZE}"}, status=400)
+        cursor = request.query_params.get('cursor')
+        if cursor is not None:
+            try:
+                cursor = decode_cursor(cursor)
+            except ValueError:
+                return Response({"error": "Invalid cursor"}, status=400)
+
+        logger.info("Fetching timeline of student %s for %s", student.pk, request.user.username)
+        results, next_cursor = build_timeline(request.user, student, cursor, int(limit))
+        return Response({'results': results, 'next': next_cursor})
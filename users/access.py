@@ -0,0 +1,91 @@
+"""
+Effective role and permission set of a user, resolved once and shared by DRF
+permission classes and queryset scoping. The result is memoised on the user
+object for the rest of the request, and Django permissions are cached across
+requests; signals in users.signals drop a user's cached permissions when their
+groups or permissions change, and bump a global version when a group's do.
+"""
+import uuid
+
+from django.conf import settings
+from django.core.cache import cache
+
+ACCESS_CACHE_TTL = getattr(settings, 'ACCESS_CACHE_TTL', 60 * 60)
+ACCESS_VERSION_KEY = 'access_version'
+
+
+def role_permissions(role):
+    return frozenset(getattr(settings, 'ROLE_PERMISSIONS', {}).get(role, ()))
+
+
+class Access:
+    """
+    A user's effective role, available without a query, and permission set.
+    Permissions granted through Django (user or group permissions) are only
+    loaded when ``has_perm`` asks for one the role does not already grant.
+    """
+    __slots__ = ('user', 'role', '_permissions')
+
+    def __init__(self, user, role):
+        self.user = user
+        self.role = role
+        self._permissions = None
+
+    @property
+    def is_admin(self):
+        return self.role == 'admin'
+
+    @property
+    def is_teacher(self):
+        return self.role == 'teacher'
+
+    @property
+    def is_student(self):
+        return self.role == 'student'
+
+    @property
+    def permissions(self):
+        if self._permissions is None:
+            granted = load_user_permissions(self.user) if self.user is not None else frozenset()
+            self._permissions = role_permissions(self.role) | granted
+        return self._permissions
+
+    def has_perm(self, perm):
+        return self.is_admin or perm in role_permissions(self.role) or perm in self.permissions
+
+
+ANONYMOUS_ACCESS = Access(None, None)
+
+
+def access_cache_key(user_id):
+    return f'access_{user_id}'
+
+
+def load_user_permissions(user):
+    """Returns the user's own and group permissions, cached until they change."""
+    key = access_cache_key(user.pk)
+    cached = cache.get_many([key, ACCESS_VERSION_KEY])
+    version = cached.get(ACCESS_VERSION_KEY)
+    entry = cached.get(key)
+    if entry and entry['version'] == version:
+        return frozenset(entry['permissions'])
+    permissions = frozenset(user.get_all_permissions())
+    cache.set(key, {'version': version, 'permissions': sorted(permissions)}, timeout=ACCESS_CACHE_TTL)
+    return permissions
+
+
+def get_access(user):
+    if not user or not user.is_authenticated:
+        return ANONYMOUS_ACCESS
+    access = user.__dict__.get('_access')
+    if access is None:
+        access = user._access = Access(user, 'admin' if user.is_superuser else user.role)
+    return access
+
+
+def invalidate_access(*user_ids):
+    cache.delete_many([access_cache_key(user_id) for user_id in user_ids])
+
+
+def invalidate_all_access():
+    cache.set(ACCESS_VERSION_KEY, uuid.uuid4().hex, timeout=None)
@@ -0,0 +1,27 @@
+from django.conf import settings
+from django.http import JsonResponse
+from core.async_views import AsyncAPIView
+from core.cache import aget, aset
+from core.logging import logger
+from .models import User
+from .serializers import CustomUserSerializer
+
+CACHE_TTL = getattr(settings, 'CACHE_TTL', 300)
+
+
+class AsyncUserDetailView(AsyncAPIView):
+    async def get(self, request, pk):
+        logger.info("Fetching user %s (async)", pk)
+        cached_user = await aget(f'user_{pk}')
+        if cached_user:
+            logger.info("User fetched from cache")
+            return JsonResponse(cached_user)
+        try:
+            user = await User.objects.aget(pk=pk)
+        except User.DoesNotExist:
+            logger.error("User %s not found", pk)
+            return JsonResponse({"error": "User not found"}, status=404)
+        data = CustomUserSerializer(user).data
+        await aset(f'user_{pk}', data, timeout=CACHE_TTL)
+        logger.info("User fetched from database and cached")
+        return JsonResponse(data)
@@ -1,9 +1,10 @@
 from rest_framework.permissions import BasePermission
+from users.access import get_access
 
 class IsAdmin(BasePermission):
     def has_permission(self, request, view):
-        return request.user.is_authenticated and request.user.role == 'admin'
+        return get_access(request.user).is_admin
 
 class IsTeacher(BasePermission):
     def has_permission(self, request, view):
-        return request.user.is_authenticated and request.user.role == 'teacher'
+        return get_access(request.user).is_teacher
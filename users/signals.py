@@ -0,0 +1,41 @@
+from django.contrib.auth.models import Group, Permission
+from django.db.models.signals import m2m_changed, post_delete, post_save
+from django.dispatch import receiver
+
+from users.access import invalidate_access, invalidate_all_access
+from users.models import User
+
+
+@receiver(post_save, sender=User)
+@receiver(post_delete, sender=User)
+def invalidate_user_access(sender, instance, **kwargs):
+    # Also drop ModelBackend's per-object caches so the next lookup sees the change.
+    for attribute in ('_access', '_perm_cache', '_user_perm_cache', '_group_perm_cache'):
+        instance.__dict__.pop(attribute, None)
+    invalidate_access(instance.pk)
+
+
+@receiver(m2m_changed, sender=User.groups.through)
+@receiver(m2m_changed, sender=User.user_permissions.through)
+def invalidate_membership_access(sender, instance, action, reverse, pk_set, **kwargs):
+    if not action.startswith('post_'):
+        return
+    if not reverse:
+        invalidate_user_access(User, instance)
+    elif pk_set:
+        invalidate_access(*pk_set)
+    else:
+        # A reverse clear() does not say which users were affected.
+        invalidate_all_access()
+
+
+@receiver(m2m_changed, sender=Group.permissions.through)
+def invalidate_group_access(sender, action, **kwargs):
+    if action.startswith('post_'):
+        invalidate_all_access()
+
+
+@receiver(post_delete, sender=Group)
+@receiver(post_delete, sender=Permission)
+def invalidate_access_on_delete(sender, **kwargs):
+    invalidate_all_access()
@@ -1,6 +1,10 @@
 import pytest
+from django.test import Client
 from users.models import User
 from rest_framework.test import APIClient
+from rest_framework_simplejwt.tokens import AccessToken
+from django.contrib.auth.models import Group, Permission
+from users.access import get_access
 
 @pytest.mark.django_db
 def test_user_creation():
@@ -182,3 +186,68 @@ def test_user_delete_as_teacher():
     response = client.delete(f'/api/users/{student.id}/')
 
     assert response.status_code == 403
+
+
+@pytest.mark.django_db
+def test_async_user_detail():
+    admin = User.objects.create_user(username="admin", email="admin@example.com", password="adminpass", role="admin")
+    student = User.objects.create_user(username="student1", email="student1@example.com", password="password123",
+                                       role="student")
+
+    response = Client().get(f'/api/users/{student.id}/async/')
+    assert response.status_code == 401
+
+    client = Client(HTTP_AUTHORIZATION=f"Bearer {AccessToken.for_user(admin)}")
+    response = client.get(f'/api/users/{student.id}/async/')
+    assert response.status_code == 200
+    assert response.json()['username'] == "student1"
+
+    response = client.get('/api/users/999999/async/')
+    assert response.status_code == 404
+
+
+@pytest.mark.django_db
+def test_access_permissions_are_cached_and_invalidated(settings, django_assert_num_queries):
+    settings.ROLE_PERMISSIONS = {'teacher': []}
+    teacher = User.objects.create_user(username="teacher", email="teacher@example.com", password="password123", role="teacher")
+    permission = Permission.objects.get(codename='view_own_students')
+    group = Group.objects.create(name="mentors")
+    group.permissions.add(permission)
+
+    assert not get_access(teacher).has_perm('students.view_own_students')
+    fresh = User.objects.get(pk=teacher.pk)
+    with django_assert_num_queries(0):
+        assert not get_access(fresh).has_perm('students.view_own_students')
+
+    teacher.groups.add(group)
+    assert get_access(User.objects.get(pk=teacher.pk)).has_perm('students.view_own_students')
+
+    group.permissions.remove(permission)
+    assert not get_access(User.objects.get(pk=teacher.pk)).has_perm('students.view_own_students')
+
+
+@pytest.mark.django_db
+def test_superuser_resolves_as_admin():
+    user = User.objects.create_superuser(username="root", email="root@example.com", password="password123")
+    user.role = 'student'
+    assert get_access(user).is_admin
+
+
+@pytest.mark.django_db
+def test_view_own_students_limits_student_list(settings):
+    from courses.models import Course, Enrollment
+    from students.models import Student
+
+    settings.ROLE_PERMISSIONS = {'teacher': []}
+    teacher = User.objects.create_user(username="teacher", email="teacher@example.com", password="password123", role="teacher")
+    teacher.user_permissions.add(Permission.objects.get(codename='view_own_students'))
+    course = Course.objects.create(name="Math", instructor=teacher)
+    enrolled = Student.objects.create(user=User.objects.create_user(username="s1", email="s1@example.com", role="student"))
+    Student.objects.create(user=User.objects.create_user(username="s2", email="s2@example.com", role="student"))
+    Enrollment.objects.create(student=enrolled, course=course)
+
+    client = APIClient()
+    client.force_authenticate(user=User.objects.get(pk=teacher.pk))
+    response = client.get('/api/students/')
+
+    assert [student['id'] for student in response.data] == [enrolled.id]
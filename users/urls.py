@@ -1,7 +1,9 @@
 from django.urls import path
 from .views import UserListView, UserDetailView
+from .async_views import AsyncUserDetailView
 
 urlpatterns = [
     path('', UserListView.as_view(), name='user-list'),
     path('<int:pk>/', UserDetailView.as_view(), name='user-detail'),
+    path('<int:pk>/async/', AsyncUserDetailView.as_view(), name='user-detail-async'),
 ]
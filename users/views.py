@@ -60,7 +60,7 @@ class UserDetailView(RetrieveUpdateDestroyAPIView):
     )
     def retrieve(self, request, *args, **kwargs):
         pk = kwargs.get("pk")
-        logger.info(f"Fetching user {pk}")
+        logger.info("Fetching user %s", pk)
         cached_user = cache.get(f'user_{pk}')
         if cached_user:
             logger.info("User fetched from cache")
@@ -72,7 +72,7 @@ class UserDetailView(RetrieveUpdateDestroyAPIView):
             logger.info("User fetched from database and cached")
             return Response(serializer.data)
         except User.DoesNotExist:
-            logger.error(f"User {pk} not found")
+            logger.error("User %s not found", pk)
             return Response({"error": "User not found"}, status=404)
 
     @swagger_auto_schema(
@@ -83,7 +83,7 @@ class UserDetailView(RetrieveUpdateDestroyAPIView):
     )
     def update(self, request, *args, **kwargs):
         pk = kwargs.get("pk")
-        logger.info(f"Updating user {pk}")
+        logger.info("Updating user %s", pk)
         try:
             user = self.get_queryset().get(pk=pk)
             serializer = self.get_serializer(user, data=request.data)
@@ -91,11 +91,11 @@ class UserDetailView(RetrieveUpdateDestroyAPIView):
                 serializer.save()
                 cache.delete(f'user_{pk}')
                 cache.set(f'user_{pk}', serializer.data, timeout=CACHE_TTL)
-                logger.info(f"User {pk} updated and cached")
+                logger.info("User %s updated and cached", pk)
                 return Response(serializer.data)
             return Response(serializer.errors, status=400)
         except User.DoesNotExist:
-            logger.error(f"User {pk} not found")
+            logger.error("User %s not found", pk)
             return Response({"error": "User not found"}, status=404)
 
     @swagger_auto_schema(
@@ -105,14 +105,14 @@ class UserDetailView(RetrieveUpdateDestroyAPIView):
     )
     def destroy(self, request, *args, **kwargs):
         pk = kwargs.get("pk")
-        logger.info(f"Deleting user {pk}")
+        logger.info("Deleting user %s", pk)
         try:
             user = self.get_queryset().get(pk=pk)
             user.delete()
             cache.delete(f'user_{pk}')
             cache.delete('user_list')
-            logger.info(f"User {pk} deleted")
+            logger.info("User %s deleted", pk)
             return Response({"message": "User deleted successfully"}, status=204)
         except User.DoesNotExist:
-            logger.error(f"User {pk} not found")
+            logger.error("User %s not found", pk)
             return Response({"error": "User not found"}, status=404)